@@ -0,0 +1,148 @@
+import re
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Tuple
+
+from app.analysis.sentences import split_sentences
+from app.common.fingerprint import MinHashLSH, normalize_text, word_shingles
+
+_WORD = re.compile(r"[A-Za-z][A-Za-z'-]*|\d[\d,.]*%?")
+_NUMBER = re.compile(r"\d")
+_QUANTITY = re.compile(r"\d[\d,.]*\s*(%|percent|million|billion|thousand|bn|m\b)|[$€£]\s?\d", re.IGNORECASE)
+_YEAR = re.compile(r"\b(19|20)\d{2}\b")
+
+ASSERTIVE_VERBS = frozenset(
+    "is are was were has have had will shows show showed demonstrates demonstrated found finds "
+    "increased decreased rose fell grew declined reached exceeded caused causes reduced reduces "
+    "improved improves announced reported reports confirmed estimated accounted remained totaled "
+    "totalled represents represented leads led results resulted contains requires".split()
+)
+CAUSAL_MARKERS = ("because", "due to", "as a result", "resulted in", "led to", "leads to", "caused", "therefore")
+COMPARATIVE_MARKERS = ("more than", "less than", "compared", "higher than", "lower than", "than the", "versus")
+ATTRIBUTION_MARKERS = ("according to", "reported", "stated", "announced", "disclosed", "concluded")
+HEDGES = frozenset("may might could perhaps possibly maybe probably seems seem appears appear likely unclear".split())
+OPINION_MARKERS = ("i think", "i believe", "we believe", "we think", "in my opinion", "in our opinion", "i feel")
+
+MIN_WORDS = 5
+MAX_WORDS = 80
+
+
+@dataclass
+class Claim:
+    """A candidate claim sentence with its score and character offsets in the document."""
+    text: str
+    score: float
+    start: int
+    end: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def score_sentence(sentence: str) -> float:
+    """Score how much a sentence reads like a checkable factual claim, from 0 to 1.
+
+    Specific, declarative sentences with quantities, entities, causal or comparative
+    language and attribution score high; questions, hedged statements and opinions
+    score low.
+    """
+    words = _WORD.findall(sentence)
+    if len(words) < MIN_WORDS or len(words) > MAX_WORDS or sentence.rstrip().endswith("?"):
+        return 0.0
+    lowered = sentence.lower()
+    tokens = [word.lower() for word in words]
+
+    score = 0.2
+    if any(token in ASSERTIVE_VERBS for token in tokens):
+        score += 0.2
+    if _QUANTITY.search(sentence):
+        score += 0.25
+    elif _NUMBER.search(sentence):
+        score += 0.15
+    if _YEAR.search(sentence):
+        score += 0.05
+    # Capitalised words after the first one hint at named entities.
+    if any(word[0].isupper() for word in words[1:]):
+        score += 0.1
+    if any(marker in lowered for marker in CAUSAL_MARKERS):
+        score += 0.1
+    if any(marker in lowered for marker in COMPARATIVE_MARKERS):
+        score += 0.1
+    if any(marker in lowered for marker in ATTRIBUTION_MARKERS):
+        score += 0.05
+    if 8 <= len(words) <= 40:
+        score += 0.05
+
+    score -= 0.15 * sum(1 for token in tokens if token in HEDGES)
+    if any(marker in lowered for marker in OPINION_MARKERS):
+        score -= 0.3
+    if sentence.rstrip().endswith("!"):
+        score -= 0.1
+    return round(min(max(score, 0.0), 1.0), 4)
+
+
+def extract_candidates(text: str, offset: int = 0, min_score: float = 0.5) -> List[Claim]:
+    """Segment `text` and return scored candidate claims in document order.
+
+    `offset` is the position of `text` in the whole document, so chunks processed
+    independently report document-level offsets. This is a module-level function so
+    it can be shipped to worker processes.
+    """
+    candidates = []
+    for sentence in split_sentences(text, offset):
+        claim_text = " ".join(sentence.text.split())
+        score = score_sentence(claim_text)
+        if score >= min_score:
+            candidates.append(Claim(text=claim_text, score=score, start=sentence.start, end=sentence.end))
+    return candidates
+
+
+def merge_claims(candidates: Iterable[Claim], max_claims: int, threshold: float = 0.8) -> List[Claim]:
+    """Deduplicate near-identical claims and keep the `max_claims` best ones.
+
+    Claims whose word sets have a Jaccard similarity of at least `threshold` are
+    near-duplicates. Candidates are visited in document order so the result does not
+    depend on how the document was chunked or in which order chunks finished. Among
+    near-duplicates the highest scoring claim wins (the earliest one on ties); the
+    result is ordered by score, then by position.
+    """
+    exact: Dict[str, int] = {}
+    near: MinHashLSH[int] = MinHashLSH(threshold)
+    kept: List[Claim] = []
+    for claim in sorted(candidates, key=lambda candidate: (candidate.start, candidate.end)):
+        key = normalize_text(claim.text)
+        index = exact.get(key)
+        if index is None:
+            matches = near.query_or_add(len(kept), word_shingles(claim.text))
+            if matches:
+                index = matches[0][0]
+            else:
+                index = len(kept)
+                kept.append(claim)
+            exact[key] = index
+        if claim.score > kept[index].score:
+            kept[index] = claim
+    return sorted(kept, key=lambda claim: (-claim.score, claim.start))[:max_claims]
+
+
+def extract_claims(text: str, max_claims: int = 50, min_score: float = 0.5) -> List[Claim]:
+    """Extract, deduplicate and rank claims from a whole document in the calling thread."""
+    return merge_claims(extract_candidates(text, 0, min_score), max_claims)
+
+
+def chunk_spans(text: str, chunk_chars: int) -> List[Tuple[int, str]]:
+    """Split a large document into (offset, text) pieces at paragraph or sentence breaks."""
+    spans = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_chars, len(text))
+        if end < len(text):
+            # Prefer a paragraph break, then a line break, then a sentence end in the second half.
+            floor = start + chunk_chars // 2
+            for separator in ("\n\n", "\n", ". "):
+                split = text.rfind(separator, floor, end)
+                if split != -1:
+                    end = split + len(separator)
+                    break
+        spans.append((start, text[start:end]))
+        start = end
+    return spans
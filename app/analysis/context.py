@@ -0,0 +1,128 @@
+import math
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.analysis.evidence import evidence_spans
+from app.common.tokens import count_tokens
+from app.search.embedding import Embedder
+
+# The knapsack works on token counts rounded up to units of budget / resolution.
+KNAPSACK_RESOLUTION = 1024
+# Only the best scoring candidates enter the knapsack, which is O(items * resolution).
+KNAPSACK_MAX_ITEMS = 2000
+
+
+class PackingMethod(str, Enum):
+    """How passages are selected to fill a token budget."""
+    GREEDY = "greedy"
+    KNAPSACK = "knapsack"
+
+
+@dataclass
+class Passage:
+    """A candidate piece of prompt context with its value and estimated size."""
+    text: str
+    score: float
+    source: str
+    position: int
+    tokens: int = 0
+
+
+@dataclass
+class PackedContext:
+    """Passages selected for a prompt, in their original order."""
+    passages: List[Passage]
+    tokens: int
+    budget: int
+    candidates: int
+
+    def render(self, separator: str = "\n\n") -> str:
+        return separator.join(passage.text for passage in self.passages)
+
+
+def build_passages(
+    content: Optional[str],
+    search_results: Sequence[Dict[str, Any]],
+    query: Optional[str],
+    embedder: Embedder,
+    span_chars: int,
+) -> List[Passage]:
+    """Turn the request content and retrieved corpus passages into scored candidates.
+
+    Content spans are scored by their similarity to `query`, or by position (earlier
+    first) without a query. Corpus passages keep their retrieval score, scaled to 0-1.
+    """
+    passages: List[Passage] = []
+    spans = list(evidence_spans(content, span_chars)) if content else []
+    if spans:
+        if query:
+            vectors = embedder.embed([span.text for span in spans])
+            scores = (vectors @ embedder.embed([query])[0]).clip(min=0).tolist()
+        else:
+            scores = [1.0 - index / len(spans) for index in range(len(spans))]
+        passages.extend(Passage(span.text, float(score), "content", index) for index, (span, score) in enumerate(zip(spans, scores)))
+
+    top_score = max((result.get("score", 0.0) for result in search_results), default=0.0) or 1.0
+    passages.extend(
+        Passage(result["text"], result.get("score", 0.0) / top_score, "corpus", len(passages) + index)
+        for index, result in enumerate(search_results)
+        if result.get("text")
+    )
+    return passages
+
+
+def pack_context(passages: Sequence[Passage], budget: int, method: PackingMethod = PackingMethod.GREEDY) -> PackedContext:
+    """Select the passages of highest total score whose token counts fit in `budget`."""
+    for passage in passages:
+        passage.tokens = count_tokens(passage.text)
+    candidates = [passage for passage in passages if 0 < passage.tokens <= budget]
+    if method == PackingMethod.KNAPSACK:
+        selected = _knapsack(candidates, budget)
+    else:
+        selected = _greedy(candidates, budget)
+    selected.sort(key=lambda passage: passage.position)
+    return PackedContext(
+        passages=selected,
+        tokens=sum(passage.tokens for passage in selected),
+        budget=budget,
+        candidates=len(passages),
+    )
+
+
+def _greedy(candidates: List[Passage], budget: int) -> List[Passage]:
+    selected = []
+    remaining = budget
+    for passage in sorted(candidates, key=lambda passage: (-passage.score, passage.position)):
+        if passage.tokens <= remaining:
+            selected.append(passage)
+            remaining -= passage.tokens
+    return selected
+
+
+def _knapsack(candidates: List[Passage], budget: int) -> List[Passage]:
+    if len(candidates) > KNAPSACK_MAX_ITEMS:
+        candidates = sorted(candidates, key=lambda passage: (-passage.score, passage.position))[:KNAPSACK_MAX_ITEMS]
+    unit = max(1, math.ceil(budget / KNAPSACK_RESOLUTION))
+    capacity = budget // unit
+    # Rounding weights up keeps every solution within the real budget.
+    weights = [math.ceil(passage.tokens / unit) for passage in candidates]
+    best = np.zeros(capacity + 1)
+    taken = np.zeros((len(candidates), capacity + 1), dtype=bool)
+    for index, (passage, weight) in enumerate(zip(candidates, weights)):
+        if weight > capacity:
+            continue
+        with_item = best[:capacity + 1 - weight] + passage.score
+        improved = with_item > best[weight:]
+        taken[index, weight:] = improved
+        best[weight:] = np.where(improved, with_item, best[weight:])
+
+    selected = []
+    remaining = capacity
+    for index in range(len(candidates) - 1, -1, -1):
+        if taken[index, remaining]:
+            selected.append(candidates[index])
+            remaining -= weights[index]
+    return selected
@@ -0,0 +1,128 @@
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.analysis.sentences import split_sentences
+from app.common.chunking import TextChunk
+from app.search.embedding import Embedder
+from app.search.vector import VectorIndex
+
+
+@dataclass
+class Evidence:
+    """A passage of the document supporting (or refuting) a claim, with its offsets."""
+    claim_index: int
+    claim: str
+    text: str
+    start: int
+    end: int
+    score: float
+
+
+def evidence_spans(text: str, max_chars: int) -> Iterator[TextChunk]:
+    """Group consecutive sentences of a paragraph into spans of at most `max_chars` characters.
+
+    A single sentence longer than `max_chars` becomes a span of its own. Span text is
+    the exact slice of the document between the span offsets.
+    """
+    start = end = None
+    for sentence in split_sentences(text):
+        if start is not None and ("\n\n" in text[end:sentence.start] or sentence.end - start > max_chars):
+            yield TextChunk(start=start, end=end, text=text[start:end])
+            start = None
+        if start is None:
+            start = sentence.start
+        end = sentence.end
+    if start is not None:
+        yield TextChunk(start=start, end=end, text=text[start:end])
+
+
+@dataclass
+class SpanIndex:
+    """The spans of a document and their embeddings; row `i` of `vectors` embeds `spans[i]`."""
+    spans: List[TextChunk]
+    vectors: VectorIndex
+
+
+def index_spans(text: str, embedder: Embedder, max_chars: int) -> SpanIndex:
+    """Split a document into evidence spans and embed them into a transient vector index."""
+    return _index(list(evidence_spans(text, max_chars)), embedder)
+
+
+def index_regions(regions: Sequence[Tuple[int, str]], embedder: Embedder, max_chars: int) -> SpanIndex:
+    """Like `index_spans` for some (offset, text) regions of a document; spans keep document offsets."""
+    spans = [
+        TextChunk(start=offset + span.start, end=offset + span.end, text=span.text)
+        for offset, text in regions
+        for span in evidence_spans(text, max_chars)
+    ]
+    return _index(spans, embedder)
+
+
+def _index(spans: List[TextChunk], embedder: Embedder) -> SpanIndex:
+    vectors = VectorIndex(embedder.dim, initial_capacity=max(len(spans), 1))
+    if spans:
+        vectors.add(list(range(len(spans))), embedder.embed([span.text for span in spans]))
+    return SpanIndex(spans=spans, vectors=vectors)
+
+
+def rank_evidence(
+    claims: Sequence[str],
+    index: SpanIndex,
+    embedder: Embedder,
+    top_k: int,
+    allowed: Optional[np.ndarray] = None,
+) -> List[List[Evidence]]:
+    """Score every claim against the indexed spans in a single matrix product.
+
+    Returns the `top_k` spans with a positive similarity for each claim, best first;
+    `allowed` optionally masks out spans.
+    """
+    spans = index.spans
+    if not spans or not claims:
+        return [[] for _ in claims]
+    hits = index.vectors.search(embedder.embed(list(claims)), top_k, allowed=allowed)
+    return [
+        [
+            Evidence(
+                claim_index=claim_index,
+                claim=claim,
+                text=spans[span_id].text,
+                start=spans[span_id].start,
+                end=spans[span_id].end,
+                score=round(score, 6),
+            )
+            for span_id, score in claim_hits
+            if score > 0
+        ]
+        for claim_index, (claim, claim_hits) in enumerate(zip(claims, hits))
+    ]
+
+
+def merge_evidence(rankings: Sequence[List[List[Evidence]]], top_k: int) -> List[List[Evidence]]:
+    """Combine rankings of the same claims over different spans, keeping the `top_k` best spans per claim."""
+    merged = []
+    for claim_rankings in zip(*rankings):
+        best = {}
+        for item in sorted((item for ranking in claim_rankings for item in ranking), key=lambda item: -item.score):
+            best.setdefault((item.start, item.end), item)
+        merged.append(list(best.values())[:top_k])
+    return merged
+
+
+def find_evidence(
+    claims: Sequence[str],
+    text: str,
+    embedder: Embedder,
+    top_k: int,
+    max_chars: int,
+) -> List[List[Evidence]]:
+    """Rank the spans of `text` against every claim.
+
+    The document is split and embedded once into a transient vector index; all claims
+    are then scored in a single matrix product.
+    """
+    if not claims:
+        return []
+    return rank_evidence(claims, index_spans(text, embedder, max_chars), embedder, top_k)
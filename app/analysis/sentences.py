@@ -0,0 +1,40 @@
+import re
+from typing import Iterator
+
+from app.common.chunking import TextChunk
+
+ABBREVIATIONS = frozenset(
+    "mr mrs ms dr prof sr jr st no nos vs etc inc ltd co corp fig figs eq al approx dept est "
+    "jan feb mar apr jun jul aug sep sept oct nov dec e.g i.e u.s u.k a.m p.m".split()
+)
+
+# A terminator, optional closing quotes/brackets, whitespace, then the start of a new sentence.
+_BOUNDARY = re.compile(r"[.!?]+[\"'”’)\]]*\s+(?=[\"'“‘(\[]?[A-Z0-9])|\n\s*\n")
+_LAST_WORD = re.compile(r"(\S+)\s*$")
+
+
+def split_sentences(text: str, offset: int = 0) -> Iterator[TextChunk]:
+    """Split text into sentences with character offsets (shifted by `offset`).
+
+    Boundaries are sentence terminators followed by an upper-case or numeric start,
+    and blank lines. Common abbreviations and single-letter initials do not end a
+    sentence.
+    """
+    start = 0
+    for match in _BOUNDARY.finditer(text):
+        if match.group().startswith("."):
+            word = _LAST_WORD.search(text, start, match.start())
+            token = word.group(1).lower().rstrip(".") if word else ""
+            if token in ABBREVIATIONS or (len(token) == 1 and token.isalpha()):
+                continue
+        yield from _sentence(text, start, match.end(), offset)
+        start = match.end()
+    yield from _sentence(text, start, len(text), offset)
+
+
+def _sentence(text: str, start: int, end: int, offset: int) -> Iterator[TextChunk]:
+    piece = text[start:end]
+    stripped = piece.strip()
+    if stripped:
+        begin = start + len(piece) - len(piece.lstrip())
+        yield TextChunk(start=offset + begin, end=offset + begin + len(stripped), text=stripped)
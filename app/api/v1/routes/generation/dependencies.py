@@ -1,5 +1,78 @@
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import Header, Request
+
+from app.common.deadline import Deadline
+from app.common.profiling import should_profile
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.services.cache import get_response_cache
+from app.services.admission import AdmissionController, tenant_id, trusted_proxy
 from app.services.generation import GenerationService
+from app.services.jobs import JobBackend, LocalJobBackend
+from app.services.store import get_result_store
+from app.strategies.registry import get_strategy_registry
 
 
+@lru_cache()
 def get_generation_service() -> GenerationService:
-    return GenerationService() 
\ No newline at end of file
+    return GenerationService(
+        registry=get_strategy_registry(),
+        cache=get_response_cache() if settings.CACHE_ENABLED else None,
+        store=get_result_store(),
+    )
+
+
+@lru_cache()
+def get_job_backend() -> JobBackend:
+    return LocalJobBackend(get_generation_service())
+
+
+@lru_cache()
+def get_admission_controller() -> AdmissionController:
+    return AdmissionController()
+
+
+def get_tenant(
+    request: Request, x_tenant_id: Optional[str] = Header(None), x_api_key: Optional[str] = Header(None)
+) -> str:
+    """Identify the tenant a request is accounted to for admission control."""
+    host = request.client.host if request.client is not None else None
+    return tenant_id(x_tenant_id, x_api_key, trusted=trusted_proxy(host))
+
+
+def use_response_cache(cache_control: Optional[str] = Header(None)) -> bool:
+    """Honour `Cache-Control: no-cache` / `no-store` as a per-request cache bypass."""
+    if not cache_control:
+        return True
+    directives = {directive.strip().lower() for directive in cache_control.split(",")}
+    return not directives & {"no-cache", "no-store"}
+
+
+def profile_requested(x_profile_token: Optional[str] = Header(None)) -> bool:
+    """Profile a request carrying the privileged profiling token, or one drawn by sampling."""
+    return should_profile(x_profile_token)
+
+
+def get_deadline(
+    x_request_timeout: Optional[str] = Header(None), x_allow_partial: Optional[str] = Header(None)
+) -> Optional[Deadline]:
+    """Deadline of a request: `X-Request-Timeout` seconds from now, else `REQUEST_TIMEOUT_SECONDS`.
+
+    Timeouts are capped by `REQUEST_TIMEOUT_MAX_SECONDS`; 0 means no deadline.
+    `X-Allow-Partial: true` lets a request cut short by its deadline return a partial result.
+    """
+    seconds = settings.REQUEST_TIMEOUT_SECONDS
+    if x_request_timeout is not None:
+        try:
+            seconds = float(x_request_timeout)
+        except ValueError:
+            raise ValidationError("X-Request-Timeout must be a number of seconds")
+        if not seconds > 0:
+            raise ValidationError("X-Request-Timeout must be positive")
+    if seconds <= 0:
+        return None
+    if settings.REQUEST_TIMEOUT_MAX_SECONDS > 0:
+        seconds = min(seconds, settings.REQUEST_TIMEOUT_MAX_SECONDS)
+    return Deadline(seconds, allow_partial=(x_allow_partial or "").strip().lower() == "true")
@@ -1,28 +1,258 @@
-from fastapi import APIRouter, Depends, HTTPException
-from app.api.v1.routes.generation.schemas import GenerationRequest, GenerationResponse
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel
+from app.api.v1.routes.generation.schemas import (
+    BatchGenerationRequest,
+    BatchGenerationResponse,
+    CacheStatsResponse,
+    GenerationRequest,
+    GenerationResponse,
+    GenerationJob,
+    GenerationStreamEvent,
+    JobPriority,
+    JobStatsResponse,
+    StreamEventType,
+    StreamFormat,
+)
 from app.services.generation import GenerationService
-from app.core.exceptions import GenerationError, ValidationError
-from app.api.v1.routes.generation.dependencies import get_generation_service
+from app.core.exceptions import ClientDisconnectedError, GenerationError, ValidationError
+from app.api.v1.routes.generation.dependencies import (
+    get_admission_controller,
+    get_deadline,
+    get_generation_service,
+    get_job_backend,
+    get_tenant,
+    profile_requested,
+    use_response_cache,
+)
+from app.common.deadline import Deadline
+from app.common.profiling import profile_request
+from app.core.config import settings
+from app.services.admission import AdmissionController
+from app.services.cache import get_response_cache
+from app.services.jobs import JobBackend
 
 router = APIRouter()
 
-def validate_output_schema(request: GenerationRequest) -> None:
-    if request.output_type == "json":
-        if not request.output_schema or not isinstance(request.output_schema, dict):
-            raise HTTPException(status_code=422, detail="output_schema must be a non-empty dictionary when output_type is JSON")
-    elif request.output_schema is not None:
-        raise HTTPException(status_code=422, detail="output_schema should not be provided when output_type is not JSON")
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+STREAM_MEDIA_TYPES = {
+    StreamFormat.SSE: "text/event-stream",
+    StreamFormat.NDJSON: "application/x-ndjson",
+}
+
+T = TypeVar("T")
+
+
+def json_response(model: BaseModel, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Serialize a response model once with pydantic's native encoder.
+
+    Returning a `Response` skips FastAPI's `response_model` handling, which would
+    validate the already trusted model again and encode it through `jsonable_encoder`.
+    """
+    content = model.json_bytes() if isinstance(model, GenerationResponse) else model.model_dump_json()
+    return Response(content, media_type="application/json", headers=headers)
+
+
+async def cancel_on_disconnect(http_request: Request, work: Awaitable[T]) -> T:
+    """Await `work`, cancelling it if the client disconnects first.
+
+    Streaming responses are cancelled by Starlette itself when their client goes away;
+    regular responses only notice when writing, after all the work was done.
+    """
+    task = asyncio.ensure_future(work)
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(http_request))
+    try:
+        await asyncio.wait({task, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+        if not task.done():
+            raise ClientDisconnectedError("The client disconnected")
+        return task.result()
+    finally:
+        disconnected.cancel()
+        task.cancel()
+
+
+async def _wait_for_disconnect(http_request: Request) -> None:
+    # The body has been read, so the next message is the disconnect.
+    while (await http_request.receive())["type"] != "http.disconnect":
+        pass
+
 
 @router.post("/generate", response_model=GenerationResponse)
 async def generate_content(
     request: GenerationRequest,
-    generation_service: GenerationService = Depends(get_generation_service)
+    response: Response,
+    http_request: Request,
+    generation_service: GenerationService = Depends(get_generation_service),
+    use_cache: bool = Depends(use_response_cache),
+    tenant: str = Depends(get_tenant),
+    admission: AdmissionController = Depends(get_admission_controller),
+    profile: bool = Depends(profile_requested),
+    deadline: Optional[Deadline] = Depends(get_deadline)
 ) -> GenerationResponse:
     """Generate content based on the request."""
-    validate_output_schema(request)
+    headers = {}
     try:
-        return await generation_service.generate_content(request)
-    except ValidationError as e:
+        async with admission.admit(tenant, request.generation_type):
+            async with profile_request(profile) as profile_id:
+                if profile_id is not None:
+                    headers[PROFILE_ID_HEADER] = profile_id
+                # A profiled request bypasses the cache so the profile shows the actual work.
+                result = await cancel_on_disconnect(
+                    http_request, generation_service.generate_content(request, use_cache and profile_id is None, deadline)
+                )
+    except HTTPException as e:
         raise e
     except Exception as e:
-        raise GenerationError(f"Failed to generate content: {str(e)}") 
\ No newline at end of file
+        raise GenerationError(f"Failed to generate content: {str(e)}")
+    if settings.RESPONSE_FAST_PATH:
+        return json_response(result, headers)
+    response.headers.update(headers)
+    return result
+
+
+@router.post("/generate/batch", response_model=BatchGenerationResponse)
+async def generate_content_batch(
+    request: BatchGenerationRequest,
+    http_request: Request,
+    generation_service: GenerationService = Depends(get_generation_service),
+    use_cache: bool = Depends(use_response_cache),
+    tenant: str = Depends(get_tenant),
+    admission: AdmissionController = Depends(get_admission_controller),
+    deadline: Optional[Deadline] = Depends(get_deadline)
+) -> BatchGenerationResponse:
+    """Generate content for a batch of requests, returning per-item results in input order."""
+    if len(request.items) > settings.BATCH_MAX_ITEMS:
+        raise ValidationError(f"Batch size {len(request.items)} exceeds the limit of {settings.BATCH_MAX_ITEMS} items")
+    # Every item is charged against its own generation type's rate limits up front, and holds
+    # a concurrency slot of that type while it runs; the batch itself holds no slot.
+    admission.check_batch_rate(tenant, [item_generation_type(item) for item in request.items])
+    results = await cancel_on_disconnect(
+        http_request,
+        generation_service.generate_batch(
+            request.items,
+            request.max_concurrency,
+            use_cache,
+            deadline,
+            admit=lambda item: admission.admit(tenant, item.generation_type, charge=False),
+        ),
+    )
+    batch = BatchGenerationResponse(results=results)
+    return json_response(batch) if settings.RESPONSE_FAST_PATH else batch
+
+
+def item_generation_type(item: Dict[str, Any]) -> str:
+    """Generation type of a raw batch item, empty when the item does not name one."""
+    generation_type = item.get("generation_type")
+    return generation_type if isinstance(generation_type, str) else ""
+
+
+def encode_stream_event(event: GenerationStreamEvent, stream_format: StreamFormat) -> str:
+    """Encode a stream event for the requested wire format."""
+    if stream_format == StreamFormat.SSE:
+        return f"event: {event.event.value}\ndata: {event.model_dump_json()}\n\n"
+    return event.model_dump_json() + "\n"
+
+
+async def encode_stream(events: AsyncIterator[GenerationStreamEvent], stream_format: StreamFormat) -> AsyncIterator[str]:
+    """Encode stream events, turning failures into a terminal error event."""
+    try:
+        async for event in events:
+            yield encode_stream_event(event, stream_format)
+    except HTTPException as e:
+        error = GenerationStreamEvent(event=StreamEventType.ERROR, data={"status_code": e.status_code, "detail": e.detail})
+        yield encode_stream_event(error, stream_format)
+    except Exception as e:
+        error = GenerationStreamEvent(
+            event=StreamEventType.ERROR,
+            data={"status_code": 500, "detail": f"Failed to generate content: {str(e)}"},
+        )
+        yield encode_stream_event(error, stream_format)
+
+
+@router.post("/generate/stream")
+async def generate_content_stream(
+    request: GenerationRequest,
+    format: StreamFormat = StreamFormat.SSE,
+    generation_service: GenerationService = Depends(get_generation_service),
+    tenant: str = Depends(get_tenant),
+    admission: AdmissionController = Depends(get_admission_controller),
+    deadline: Optional[Deadline] = Depends(get_deadline)
+) -> StreamingResponse:
+    """Stream generated content as Server-Sent Events or NDJSON."""
+    await admission.acquire(tenant, request.generation_type)
+    release = release_once(admission, tenant, request.generation_type)
+    try:
+        events = generation_service.stream_content(request, deadline)
+    except BaseException:
+        release()
+        raise
+    # The background task releases the slot even when the body is never iterated,
+    # e.g. when the client disconnects before the response starts.
+    return StreamingResponse(
+        release_when_done(encode_stream(events, format), release),
+        media_type=STREAM_MEDIA_TYPES[format],
+        background=BackgroundTask(release),
+    )
+
+
+def release_once(admission: AdmissionController, tenant: str, generation_type: str) -> Callable[[], None]:
+    """Return a function that releases an admission slot on its first call only."""
+    released = False
+
+    def release() -> None:
+        nonlocal released
+        if not released:
+            released = True
+            admission.release(tenant, generation_type)
+
+    return release
+
+
+async def release_when_done(body: AsyncIterator[str], release: Callable[[], None]) -> AsyncIterator[str]:
+    """Hold the admission slot of a stream until it finished or the client went away."""
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        release()
+
+
+@router.post("/jobs", response_model=GenerationJob, status_code=202)
+async def submit_job(
+    request: GenerationRequest,
+    priority: JobPriority = JobPriority.NORMAL,
+    job_backend: JobBackend = Depends(get_job_backend),
+    use_cache: bool = Depends(use_response_cache),
+    tenant: str = Depends(get_tenant),
+    admission: AdmissionController = Depends(get_admission_controller)
+) -> GenerationJob:
+    """Queue a generation request and return its job id without waiting for the result."""
+    # Jobs are rate limited here; their concurrency is bounded by the job worker pool.
+    admission.check_rate(tenant, request.generation_type)
+    return await job_backend.submit(request, priority, use_cache)
+
+
+@router.get("/jobs/stats", response_model=JobStatsResponse)
+async def job_stats(job_backend: JobBackend = Depends(get_job_backend)) -> JobStatsResponse:
+    """Return job queue occupancy and counters."""
+    return JobStatsResponse(**job_backend.stats())
+
+
+@router.get("/jobs/{job_id}", response_model=GenerationJob)
+async def get_job(job_id: str, job_backend: JobBackend = Depends(get_job_backend)) -> GenerationJob:
+    """Return the status of a job and its result once finished."""
+    job = await job_backend.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Generation job not found: {job_id}")
+    return json_response(job) if settings.RESPONSE_FAST_PATH else job
+
+
+@router.get("/cache/stats", response_model=CacheStatsResponse)
+async def cache_stats() -> CacheStatsResponse:
+    """Return response cache hit/miss/eviction counters."""
+    return CacheStatsResponse(enabled=settings.CACHE_ENABLED, **get_response_cache().stats())
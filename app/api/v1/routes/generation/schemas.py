@@ -1,7 +1,9 @@
 from enum import Enum
 from typing import Dict, Any, List, Optional
 
-from pydantic import BaseModel, Field, model_validator, field_validator
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+
+from app.common.schema import check_output_schema
 
 
 class GenerationType(str, Enum):
@@ -23,18 +25,42 @@ class SearchType(str, Enum):
     GLOBAL = "global"
 
 
+class StreamFormat(str, Enum):
+    """Wire formats for streamed generation responses."""
+    SSE = "sse"
+    NDJSON = "ndjson"
+
+
+class StreamEventType(str, Enum):
+    """Types of events emitted while streaming a generation."""
+    SEARCH_RESULTS = "search_results"
+    CONTENT = "content"
+    FIELD = "field"
+    METADATA = "metadata"
+    ERROR = "error"
+
+
+class JobPriority(str, Enum):
+    """Scheduling priority of an asynchronous generation job."""
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
+class JobStatus(str, Enum):
+    """Lifecycle states of an asynchronous generation job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
 class BaseResponseModel(BaseModel):
     """Base model for all responses that require output schema validation."""
     output_schema: Optional[Dict[str, Any]] = Field(
         None, description="Schema defining the expected structure of the response"
     )
 
-    @field_validator("output_schema")
-    def validate_output_schema(cls, v):
-        if v is not None and not isinstance(v, dict):
-            raise ValueError("output_schema must be a dictionary when provided")
-        return v
-
 
 class GenerationRequest(BaseModel):
     """Request model for content generation."""
@@ -57,15 +83,7 @@ class GenerationRequest(BaseModel):
 
     @model_validator(mode="after")
     def check_output_schema_required_for_json(self):
-        if self.output_type == OutputType.JSON:
-            if not self.output_schema or not isinstance(self.output_schema, dict):
-                raise ValueError(
-                    "output_schema must be a non-empty dictionary when output_type is JSON"
-                )
-        elif self.output_schema is not None:
-            raise ValueError(
-                "output_schema should not be provided when output_type is not JSON"
-            )
+        check_output_schema(self.output_type == OutputType.JSON, self.output_schema)
         return self
 
 
@@ -79,3 +97,97 @@ class GenerationResponse(BaseResponseModel):
     generation_parameters: Dict[str, Any] = Field(
         ..., description="Parameters used for generation"
     )
+    _json: Optional[bytes] = PrivateAttr(None)
+
+    def json_bytes(self) -> bytes:
+        """Serialized JSON of the response, encoded once; responses must not change after they are built."""
+        if self._json is None:
+            self._json = self.model_dump_json().encode("utf-8")
+        return self._json
+
+    @classmethod
+    def from_json_bytes(cls, data: bytes) -> "GenerationResponse":
+        """Parse a response serialized by `json_bytes`, keeping the bytes for re-serialization."""
+        response = cls.model_validate_json(data)
+        response._json = data
+        return response
+
+
+class BatchGenerationRequest(BaseModel):
+    """Request model for batch content generation."""
+    # Items are validated one by one, so an invalid item fails in its own result slot.
+    items: List[Dict[str, Any]] = Field(
+        ..., min_length=1, description="Generation requests to run"
+    )
+    max_concurrency: Optional[int] = Field(
+        None, ge=1, description="Maximum number of items generated concurrently"
+    )
+
+
+class BatchItemError(BaseModel):
+    """Error raised while generating a single batch item."""
+    status_code: int = Field(..., description="HTTP status code of the failure")
+    detail: str = Field(..., description="Error description")
+
+
+class BatchItemResult(BaseModel):
+    """Outcome of a single batch item."""
+    index: int = Field(..., description="Position of the item in the batch request")
+    response: Optional[GenerationResponse] = Field(
+        None, description="Generated response when the item succeeded"
+    )
+    error: Optional[BatchItemError] = Field(
+        None, description="Error when the item failed"
+    )
+
+
+class BatchGenerationResponse(BaseModel):
+    """Response model for batch content generation."""
+    results: List[BatchItemResult] = Field(
+        ..., description="Per-item results in request order"
+    )
+
+
+class GenerationStreamEvent(BaseModel):
+    """Single event of a streamed generation response."""
+    event: StreamEventType = Field(..., description="Type of the event")
+    data: Any = Field(..., description="Event payload")
+
+
+class CacheStatsResponse(BaseModel):
+    """Response cache counters and occupancy."""
+    enabled: bool = Field(..., description="Whether the response cache is enabled")
+    hits: int = Field(..., description="Requests served from the cache")
+    misses: int = Field(..., description="Requests that executed a strategy")
+    evictions: int = Field(..., description="Entries evicted to respect the size bounds")
+    expirations: int = Field(..., description="Entries dropped after their TTL elapsed")
+    coalesced: int = Field(..., description="Requests that joined an identical in-flight request")
+    entries: int = Field(..., description="Entries currently cached")
+    bytes: int = Field(..., description="Approximate size of the cached responses in bytes")
+    in_flight: int = Field(..., description="Distinct requests currently being generated")
+
+
+class GenerationJob(BaseModel):
+    """State and, once finished, outcome of an asynchronous generation job."""
+    job_id: str = Field(..., description="Job identifier")
+    status: JobStatus = Field(..., description="Current state of the job")
+    priority: JobPriority = Field(..., description="Scheduling priority of the job")
+    created_at: float = Field(..., description="Submission time (Unix seconds)")
+    started_at: Optional[float] = Field(None, description="Time a worker picked the job up")
+    finished_at: Optional[float] = Field(None, description="Time the job completed or failed")
+    expires_at: Optional[float] = Field(None, description="Time after which the result is discarded")
+    response: Optional[GenerationResponse] = Field(None, description="Generated response when the job completed")
+    error: Optional[BatchItemError] = Field(None, description="Error when the job failed")
+
+
+class JobStatsResponse(BaseModel):
+    """Job queue occupancy and counters."""
+    queued: int = Field(..., description="Jobs waiting for a worker")
+    running: int = Field(..., description="Jobs being generated")
+    workers: int = Field(..., description="Size of the worker pool")
+    queue_size: int = Field(..., description="Maximum number of queued jobs")
+    submitted: int = Field(..., description="Jobs accepted since startup")
+    rejected: int = Field(..., description="Jobs rejected because the queue was full")
+    completed: int = Field(..., description="Jobs that completed")
+    failed: int = Field(..., description="Jobs that failed")
+    retained: int = Field(..., description="Finished jobs whose results are still available")
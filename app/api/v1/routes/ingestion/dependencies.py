@@ -0,0 +1,9 @@
+from functools import lru_cache
+
+from app.services.ingestion import IngestionService
+from app.services.search import get_search_service
+
+
+@lru_cache()
+def get_ingestion_service() -> IngestionService:
+    return IngestionService(search_service=get_search_service())
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import tempfile
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from app.api.v1.routes.ingestion.dependencies import get_ingestion_service
+from app.api.v1.routes.ingestion.schemas import (
+    FileRemovalResponse,
+    IngestionJob,
+    IngestionStatsResponse,
+    IngestionStatus,
+)
+from app.core.exceptions import GenerationError, ReadOnlyIndexError
+from app.services.ingestion import IngestionService
+
+router = APIRouter()
+
+
+@router.put("/files/{file_id:path}", response_model=IngestionJob)
+async def ingest_file(
+    file_id: str,
+    request: Request,
+    ingestion_service: IngestionService = Depends(get_ingestion_service)
+) -> IngestionJob:
+    """Ingest a UTF-8 document sent as the raw request body, replacing any previous version.
+
+    The body is streamed to a temporary file and indexed from there, so large uploads
+    are never held in memory. Only chunks that changed since the previous version are
+    re-indexed.
+    """
+    if ingestion_service.search_service.read_only:
+        raise ReadOnlyIndexError("The corpus is served from a read-only snapshot")
+    job = ingestion_service.create_job(file_id, int(request.headers.get("content-length") or 0))
+    fd, path = tempfile.mkstemp(prefix="ingest-")
+    try:
+        received = 0
+        with os.fdopen(fd, "wb") as f:
+            async for block in request.stream():
+                f.write(block)
+                received += len(block)
+                ingestion_service.record_upload(job, received)
+        return await asyncio.to_thread(ingestion_service.ingest_file, file_id, path, job)
+    except Exception as e:
+        if job.status != IngestionStatus.FAILED:
+            ingestion_service.fail_job(job, str(e))
+        raise GenerationError(f"Failed to ingest file: {str(e)}")
+    finally:
+        os.unlink(path)
+
+
+@router.delete("/files/{file_id:path}", response_model=FileRemovalResponse)
+async def remove_file(
+    file_id: str,
+    ingestion_service: IngestionService = Depends(get_ingestion_service)
+) -> FileRemovalResponse:
+    """Remove a file from the searchable corpus."""
+    removed = await asyncio.to_thread(ingestion_service.remove_file, file_id)
+    if not removed:
+        raise HTTPException(status_code=404, detail=f"File not found: {file_id}")
+    return FileRemovalResponse(file_id=file_id, chunks_removed=removed)
+
+
+@router.get("/jobs/{job_id}", response_model=IngestionJob)
+async def get_job(
+    job_id: str,
+    ingestion_service: IngestionService = Depends(get_ingestion_service)
+) -> IngestionJob:
+    """Return the progress of an ingestion job."""
+    job = ingestion_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Ingestion job not found: {job_id}")
+    return job
+
+
+@router.get("/stats", response_model=IngestionStatsResponse)
+async def ingestion_stats(
+    ingestion_service: IngestionService = Depends(get_ingestion_service)
+) -> IngestionStatsResponse:
+    """Return corpus contents and running/recent ingestion jobs."""
+    search_service = ingestion_service.search_service
+    return IngestionStatsResponse(
+        files=search_service.files(),
+        passages=len(search_service.index),
+        jobs=ingestion_service.jobs(),
+    )
@@ -0,0 +1,41 @@
+from enum import Enum
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class IngestionStatus(str, Enum):
+    """Lifecycle states of an ingestion job."""
+    UPLOADING = "uploading"
+    INDEXING = "indexing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class IngestionJob(BaseModel):
+    """Progress and outcome of ingesting a single file."""
+    job_id: str = Field(..., description="Ingestion job identifier")
+    file_id: str = Field(..., description="Identifier of the ingested file")
+    status: IngestionStatus = Field(..., description="Current state of the job")
+    bytes_total: int = Field(0, description="Size of the file in bytes")
+    bytes_read: int = Field(0, description="Bytes received or read so far")
+    chunks: int = Field(0, description="Chunks produced so far")
+    chunks_added: int = Field(0, description="Chunks that were new or changed and got indexed")
+    chunks_unchanged: int = Field(0, description="Chunks that were already indexed")
+    chunks_removed: int = Field(0, description="Previously indexed chunks that no longer exist")
+    elapsed_seconds: float = Field(0.0, description="Time spent on the job")
+    throughput_bytes_per_second: float = Field(0.0, description="Bytes processed per second")
+    error: Optional[str] = Field(None, description="Failure reason when the job failed")
+
+
+class IngestionStatsResponse(BaseModel):
+    """Corpus contents and recent ingestion jobs."""
+    files: Dict[str, int] = Field(..., description="Number of indexed chunks per file")
+    passages: int = Field(..., description="Number of searchable passages")
+    jobs: List[IngestionJob] = Field(..., description="Running and recent ingestion jobs, newest last")
+
+
+class FileRemovalResponse(BaseModel):
+    """Result of removing a file from the corpus."""
+    file_id: str = Field(..., description="Identifier of the removed file")
+    chunks_removed: int = Field(..., description="Number of chunks removed from the index")
@@ -0,0 +1,62 @@
+from typing import Dict, Iterable, List
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.api.v1.routes.generation.dependencies import get_admission_controller, get_job_backend
+from app.common.metrics import Counter, Gauge, Metric, registry
+from app.core.config import settings
+from app.services.cache import get_response_cache
+from app.services.dedup import get_document_cache
+from app.services.store import get_result_store
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _stats_metrics(prefix: str, description: str, stats: Dict[str, int], counters: Iterable[str]) -> List[Metric]:
+    """Expose a `stats()` dict as one counter labelled by event plus one gauge per remaining value."""
+    counters = set(counters)
+    events = Counter(f"{prefix}_events", f"{description} events", ("event",))
+    metrics: List[Metric] = [events]
+    for name, value in stats.items():
+        if name in counters:
+            events.inc(name, amount=value)
+        else:
+            gauge = Gauge(f"{prefix}_{name}", f"{description} {name.replace('_', ' ')}")
+            gauge.set(value)
+            metrics.append(gauge)
+    return metrics
+
+
+def collect_service_metrics() -> List[Metric]:
+    """Snapshot the caches, result store, job queue and admission controller."""
+    metrics = _stats_metrics(
+        "job_queue", "Generation job queue", get_job_backend().stats(), ("submitted", "rejected", "completed", "failed")
+    )
+    metrics.extend(_stats_metrics(
+        "admission", "Admission control", get_admission_controller().stats(), ("admitted", "queued", "rate_limited", "shed")
+    ))
+    if settings.CACHE_ENABLED:
+        metrics.extend(_stats_metrics(
+            "response_cache", "Response cache", get_response_cache().stats(),
+            ("hits", "misses", "evictions", "expirations", "coalesced"),
+        ))
+    if settings.DEDUP_ENABLED:
+        metrics.extend(_stats_metrics(
+            "document_cache", "Document cache", get_document_cache().stats(), ("exact_hits", "near_hits", "misses")
+        ))
+    store = get_result_store()
+    if store is not None:
+        metrics.extend(_stats_metrics("result_store", "Result store", store.stats(), ("hits", "misses", "evictions")))
+    return metrics
+
+
+registry.add_collector(collect_service_metrics)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Expose request counts, latency histograms and service gauges in the Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
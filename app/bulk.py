@@ -0,0 +1,316 @@
+"""Command line runner that executes a JSONL file of generation requests without HTTP.
+
+Each input line is a `GenerationRequest`; each output line is a `BatchItemResult` whose
+`index` is the zero-based input line number. Progress is checkpointed so an interrupted
+run continues where it stopped with `--resume`.
+
+Usage:
+    python -m app.bulk requests.jsonl results.jsonl --concurrency 64 --processes 4 --resume
+"""
+import argparse
+import asyncio
+import heapq
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError as PydanticValidationError
+
+from app.api.v1.routes.generation.schemas import BatchItemError, BatchItemResult, GenerationRequest
+from app.core.config import settings
+from app.services.cache import get_response_cache
+from app.services.generation import GenerationService
+from app.services.store import get_result_store
+from app.strategies.registry import StrategyRegistry
+
+# How many lines may be in flight or waiting to be written, per unit of concurrency.
+WINDOW_FACTOR = 4
+
+
+@dataclass
+class BulkStats:
+    """Outcome of a bulk run."""
+    processed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def lines_per_second(self) -> float:
+        return self.processed / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    def add(self, other: "BulkStats") -> None:
+        self.processed += other.processed
+        self.succeeded += other.succeeded
+        self.failed += other.failed
+
+
+@dataclass
+class Checkpoint:
+    """Resumable progress of a run writing to one output file.
+
+    Every input line before `next_line` (of this shard) and every line in `done` has
+    been written to the first `output_bytes` bytes of the output file.
+    """
+    next_line: int = 0
+    output_bytes: int = 0
+    done: List[int] = field(default_factory=list)
+    complete: bool = False
+
+    @classmethod
+    def load(cls, path: str) -> "Checkpoint":
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+    def save(self, path: str) -> None:
+        # Write then rename, so a crash never leaves a truncated checkpoint behind.
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f)
+        os.replace(temp_path, path)
+
+
+def iter_lines(path: str, shard: int = 0, shards: int = 1) -> Iterator[Tuple[int, bytes]]:
+    """Stream (line number, line) pairs of the non-blank lines belonging to a shard."""
+    with open(path, "rb") as f:
+        for number, line in enumerate(f):
+            if number % shards == shard and line.strip():
+                yield number, line
+
+
+async def process_line(service: GenerationService, number: int, line: bytes, use_cache: bool) -> BatchItemResult:
+    """Parse one input line and generate its result, capturing failures as item errors."""
+    try:
+        request = GenerationRequest.model_validate_json(line)
+    except PydanticValidationError as e:
+        return BatchItemResult(index=number, error=BatchItemError(status_code=422, detail=str(e)))
+    return await service.generate_item(number, request, use_cache)
+
+
+async def run_bulk(
+    service: GenerationService,
+    input_path: str,
+    output_path: str,
+    concurrency: Optional[int] = None,
+    ordered: bool = True,
+    resume: bool = False,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_interval: Optional[int] = None,
+    use_cache: bool = True,
+    shard: int = 0,
+    shards: int = 1,
+) -> BulkStats:
+    """Run the requests of a JSONL file through `service` and write results as JSONL.
+
+    At most `concurrency` requests run at once and at most `WINDOW_FACTOR` times as many
+    lines are read ahead of the output, so memory stays bounded for any input size.
+    With `ordered=False` results are written as they finish instead of in input order.
+    `concurrency` and `checkpoint_interval` default to `BULK_CONCURRENCY` and `BULK_CHECKPOINT_INTERVAL`.
+    """
+    concurrency = concurrency or settings.BULK_CONCURRENCY
+    checkpoint_interval = checkpoint_interval or settings.BULK_CHECKPOINT_INTERVAL
+    checkpoint_path = checkpoint_path or f"{output_path}.checkpoint"
+    checkpoint = Checkpoint.load(checkpoint_path) if resume else Checkpoint()
+    stats = BulkStats()
+    if checkpoint.complete:
+        return stats
+
+    skip = set(checkpoint.done)
+    lines = (
+        (number, line)
+        for number, line in iter_lines(input_path, shard, shards)
+        if number >= checkpoint.next_line and number not in skip
+    )
+    window = asyncio.Semaphore(max(concurrency, 1) * WINDOW_FACTOR)
+    issued: Deque[int] = deque()
+    # Finished lines that are not yet at the front of `issued`: their encoded result when
+    # still waiting to be written (ordered mode), None when already written.
+    finished: Dict[int, Optional[bytes]] = {}
+
+    mode = "r+b" if resume and os.path.exists(output_path) else "wb"
+    started = time.perf_counter()
+    with open(output_path, mode) as output:
+        output.truncate(checkpoint.output_bytes)
+        output.seek(checkpoint.output_bytes)
+
+        def save_checkpoint() -> None:
+            output.flush()
+            checkpoint.output_bytes = output.tell()
+            written = [number for number, data in finished.items() if data is None]
+            checkpoint.done = sorted(written + [number for number in skip if number >= checkpoint.next_line])
+            checkpoint.save(checkpoint_path)
+
+        def complete(number: int, result: BatchItemResult) -> None:
+            data = result.model_dump_json().encode("utf-8") + b"\n"
+            if ordered:
+                finished[number] = data
+            else:
+                output.write(data)
+                finished[number] = None
+            while issued and issued[0] in finished:
+                front = issued.popleft()
+                pending = finished.pop(front)
+                if pending is not None:
+                    output.write(pending)
+                checkpoint.next_line = front + 1
+                window.release()
+            stats.processed += 1
+            if result.error is None:
+                stats.succeeded += 1
+            else:
+                stats.failed += 1
+            if stats.processed % checkpoint_interval == 0:
+                save_checkpoint()
+
+        async def worker() -> None:
+            while True:
+                await window.acquire()
+                item = next(lines, None)
+                if item is None:
+                    window.release()
+                    return
+                number, line = item
+                issued.append(number)
+                complete(number, await process_line(service, number, line, use_cache))
+
+        workers = [asyncio.create_task(worker()) for _ in range(max(concurrency, 1))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # On failure, stop the other workers before recording what was written.
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            save_checkpoint()
+        checkpoint.complete = True
+        checkpoint.save(checkpoint_path)
+    stats.elapsed_seconds = time.perf_counter() - started
+    return stats
+
+
+async def run_with_service(**kwargs) -> BulkStats:
+    """Build a generation service for this process, run the bulk job and shut the service down again."""
+    registry = StrategyRegistry()
+    service = GenerationService(
+        registry=registry,
+        cache=get_response_cache() if settings.CACHE_ENABLED else None,
+        store=get_result_store(),
+    )
+    await registry.startup()
+    try:
+        return await run_bulk(service, **kwargs)
+    finally:
+        await registry.shutdown()
+
+
+def _run_shard(kwargs: Dict) -> BulkStats:
+    return asyncio.run(run_with_service(**kwargs))
+
+
+def shard_path(output_path: str, shard: int) -> str:
+    return f"{output_path}.shard{shard}"
+
+
+def _result_index(line: bytes) -> int:
+    return json.loads(line)["index"]
+
+
+def merge_shards(output_path: str, shards: int, ordered: bool) -> None:
+    """Combine shard outputs into the final output file and remove them."""
+    paths = [shard_path(output_path, shard) for shard in range(shards)]
+    files = [open(path, "rb") for path in paths]
+    try:
+        with open(output_path, "wb") as output:
+            if ordered:
+                output.writelines(heapq.merge(*files, key=_result_index))
+            else:
+                for f in files:
+                    while block := f.read(1 << 20):
+                        output.write(block)
+    finally:
+        for f in files:
+            f.close()
+    for path in paths:
+        os.remove(path)
+        os.remove(f"{path}.checkpoint")
+
+
+def run_sharded(
+    input_path: str,
+    output_path: str,
+    processes: int,
+    ordered: bool = True,
+    resume: bool = False,
+    **kwargs,
+) -> BulkStats:
+    """Split the input round-robin across `processes` worker processes and merge their outputs."""
+    checkpoint_path = f"{output_path}.checkpoint"
+    if resume and Checkpoint.load(checkpoint_path).complete:
+        return BulkStats()
+
+    started = time.perf_counter()
+    stats = BulkStats()
+    jobs = [
+        dict(
+            input_path=input_path,
+            output_path=shard_path(output_path, shard),
+            ordered=ordered,
+            resume=resume,
+            shard=shard,
+            shards=processes,
+            **kwargs,
+        )
+        for shard in range(processes)
+    ]
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for shard_stats in pool.map(_run_shard, jobs):
+            stats.add(shard_stats)
+    merge_shards(output_path, processes, ordered)
+    Checkpoint(complete=True).save(checkpoint_path)
+    stats.elapsed_seconds = time.perf_counter() - started
+    return stats
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run a JSONL file of generation requests")
+    parser.add_argument("input", help="JSONL file with one GenerationRequest per line")
+    parser.add_argument("output", help="JSONL file receiving one BatchItemResult per input line")
+    parser.add_argument("--concurrency", type=int, default=settings.BULK_CONCURRENCY, help="Requests in flight per process")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes, each handling a shard of the input")
+    parser.add_argument("--unordered", action="store_true", help="Write results as they finish instead of in input order")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run from its checkpoint")
+    parser.add_argument("--checkpoint-interval", type=int, default=settings.BULK_CHECKPOINT_INTERVAL, help="Lines between checkpoints")
+    parser.add_argument("--no-cache", action="store_true", help="Do not reuse responses of identical requests")
+    args = parser.parse_args(argv)
+
+    options = dict(
+        input_path=args.input,
+        output_path=args.output,
+        concurrency=args.concurrency,
+        ordered=not args.unordered,
+        resume=args.resume,
+        checkpoint_interval=args.checkpoint_interval,
+        use_cache=not args.no_cache,
+    )
+    if args.processes > 1:
+        stats = run_sharded(processes=args.processes, **options)
+    else:
+        stats = asyncio.run(run_with_service(**options))
+
+    print(
+        f"Processed {stats.processed} lines ({stats.succeeded} succeeded, {stats.failed} failed) "
+        f"in {stats.elapsed_seconds:.2f}s, {stats.lines_per_second:.1f} lines/s"
+    )
+    return 1 if stats.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import codecs
+import hashlib
+import mmap
+import os
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional
+
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t\r\f\v]*\n\s*")
+
+
+@dataclass
+class TextChunk:
+    """A span of text with its character offsets in the source document."""
+    start: int
+    end: int
+    text: str
+
+    @property
+    def digest(self) -> str:
+        """Content hash of the chunk text."""
+        return content_hash(self.text)
+
+
+def content_hash(text: str) -> str:
+    """Return a short, stable content hash of a text."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def iter_file_text(
+    path: str,
+    block_size: int = 1 << 20,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> Iterator[str]:
+    """Decode a UTF-8 file block by block through a memory map.
+
+    Only one block of decoded text is held at a time; multi-byte characters split
+    across blocks are handled by an incremental decoder. `on_progress` receives the
+    number of bytes read so far after each block.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            for offset in range(0, size, block_size):
+                end = min(offset + block_size, size)
+                text = decoder.decode(mapped[offset:end], final=end == size)
+                if on_progress is not None:
+                    on_progress(end)
+                if text:
+                    yield text
+
+
+def iter_paragraphs(blocks: Iterable[str], max_chars: int) -> Iterator[TextChunk]:
+    """Split a stream of text blocks into paragraphs with document offsets.
+
+    Paragraphs are separated by blank lines; paragraphs longer than `max_chars` are
+    split at whitespace. Offsets index the concatenation of all blocks.
+    """
+    buffer = ""
+    buffer_start = 0
+    for block in blocks:
+        buffer += block
+        position = 0
+        for match in _PARAGRAPH_BREAK.finditer(buffer):
+            if match.end() == len(buffer):
+                # The break may continue in the next block.
+                break
+            yield from _split_paragraph(buffer[position:match.start()], buffer_start + position, max_chars)
+            position = match.end()
+        while len(buffer) - position > max_chars:
+            # Flush the complete pieces of an overlong paragraph, keep the tail pending.
+            cut = _split_point(buffer, position, position + max_chars)
+            yield from _split_paragraph(buffer[position:cut], buffer_start + position, max_chars)
+            position = cut
+        buffer = buffer[position:]
+        buffer_start += position
+    yield from _split_paragraph(buffer, buffer_start, max_chars)
+
+
+def chunk_paragraphs(paragraphs: Iterable[TextChunk], min_chars: int, max_chars: int) -> Iterator[TextChunk]:
+    """Group paragraphs into chunks with content-defined boundaries.
+
+    A chunk ends after a paragraph once it holds at least `min_chars` and the
+    paragraph's hash selects it as a boundary, or before a paragraph that would push
+    it past `max_chars`. Because boundaries depend on local content rather than
+    absolute positions, an edit only changes the chunks around it, which keeps
+    re-ingestion incremental.
+    """
+    group: List[TextChunk] = []
+    length = 0
+    for paragraph in paragraphs:
+        if group and length + len(paragraph.text) > max_chars:
+            yield _merge(group)
+            group = []
+            length = 0
+        group.append(paragraph)
+        length += len(paragraph.text)
+        if length >= min_chars and zlib.crc32(paragraph.text.encode("utf-8")) % 2 == 0:
+            yield _merge(group)
+            group = []
+            length = 0
+    if group:
+        yield _merge(group)
+
+
+def chunk_text(text: str, min_chars: int, max_chars: int) -> Iterator[TextChunk]:
+    """Chunk an in-memory document."""
+    return chunk_paragraphs(iter_paragraphs([text], max_chars), min_chars, max_chars)
+
+
+def chunk_file(
+    path: str,
+    min_chars: int,
+    max_chars: int,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> Iterator[TextChunk]:
+    """Chunk a file without loading it into memory."""
+    return chunk_paragraphs(iter_paragraphs(iter_file_text(path, on_progress=on_progress), max_chars), min_chars, max_chars)
+
+
+def _split_paragraph(text: str, start: int, max_chars: int) -> Iterator[TextChunk]:
+    position = 0
+    while position < len(text):
+        end = len(text) if len(text) - position <= max_chars else _split_point(text, position, position + max_chars)
+        piece = text[position:end]
+        stripped = piece.strip()
+        if stripped:
+            offset = start + position + (len(piece) - len(piece.lstrip()))
+            yield TextChunk(start=offset, end=offset + len(stripped), text=stripped)
+        position = end
+
+
+def _split_point(text: str, start: int, limit: int) -> int:
+    """Return the last whitespace position in (start, limit], or `limit` if there is none."""
+    cut = max(text.rfind(" ", start + 1, limit + 1), text.rfind("\n", start + 1, limit + 1))
+    return cut if cut > start else limit
+
+
+def _merge(group: List[TextChunk]) -> TextChunk:
+    if len(group) == 1:
+        return group[0]
+    return TextChunk(start=group[0].start, end=group[-1].end, text="\n\n".join(chunk.text for chunk in group))
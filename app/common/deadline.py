@@ -0,0 +1,135 @@
+"""Per-request deadlines shared by everything working on a request.
+
+The deadline of the request being served is held in a context variable, so it follows
+the request through `await`s, tasks and `asyncio.to_thread` without being passed
+around: the generation service bounds the request by it, strategies and the search
+service check it between units of work, and backend calls cap their timeouts by it.
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+from app.core.exceptions import ClientDisconnectedError, DeadlineExceededError
+
+# Carries the seconds left to a request's deadline, from clients and on to backends.
+TIMEOUT_HEADER = "X-Request-Timeout"
+
+_current: ContextVar[Optional["Deadline"]] = ContextVar("deadline", default=None)
+
+
+class Deadline:
+    """Point in time by which a request must be answered, or be abandoned.
+
+    A deadline is also cancelled when its client disconnects. With `allow_partial`,
+    work cut short by the deadline may be answered with the partial result a strategy
+    reported through `report_partial`.
+    """
+
+    def __init__(
+        self,
+        seconds: float,
+        allow_partial: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+        parent: Optional["Deadline"] = None,
+    ):
+        self.seconds = seconds
+        self.allow_partial = allow_partial
+        self._clock = clock
+        self.expires_at = parent.expires_at if parent is not None else clock() + seconds
+        self._parent = parent
+        self._cancelled = False
+        self._partial: Optional[Callable[[], Any]] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled or (self._parent is not None and self._parent.cancelled)
+
+    @property
+    def expired(self) -> bool:
+        return self.cancelled or self._clock() >= self.expires_at
+
+    def fork(self) -> "Deadline":
+        """A deadline expiring and cancelled with this one, with its own partial result (one per batch item)."""
+        return Deadline(self.seconds, self.allow_partial, self._clock, parent=self)
+
+    def remaining(self) -> float:
+        """Seconds left, 0 once the deadline has passed or been cancelled."""
+        return 0.0 if self.cancelled else max(0.0, self.expires_at - self._clock())
+
+    def cancel(self) -> None:
+        """Abandon the request, e.g. because its client disconnected."""
+        self._cancelled = True
+
+    def check(self) -> None:
+        """Raise if the request should stop: its client is gone or its deadline passed."""
+        if self.expired:
+            raise self.error()
+
+    def error(self) -> Exception:
+        """The error a request abandoned because of this deadline fails with."""
+        if self.cancelled:
+            return ClientDisconnectedError("The client disconnected")
+        return DeadlineExceededError(f"Request deadline of {self.seconds:g}s exceeded")
+
+    def timeout(self) -> asyncio.Timeout:
+        """Async context manager cancelling the block when the deadline passes."""
+        return asyncio.timeout(self.remaining())
+
+    def report_partial(self, build: Callable[[], Any]) -> None:
+        """Register how to build the best result available so far, replacing the previous one."""
+        self._partial = build
+
+    def partial_result(self) -> Optional[Any]:
+        """The latest reported partial result, if partial results are allowed and the client is still there."""
+        if not self.allow_partial or self._partial is None or self.cancelled:
+            return None
+        return self._partial()
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """Make `deadline` the current deadline within the block; None keeps the current one."""
+    if deadline is None:
+        yield _current.get()
+        return
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def no_deadline() -> Iterator[None]:
+    """Run the block without a current deadline, e.g. work shared by several requests."""
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def check_deadline() -> None:
+    """Raise if the current request should stop; a cheap no-op without a deadline."""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check()
+
+
+def remaining_seconds(limit: float) -> float:
+    """`limit`, capped by the time left to the current deadline."""
+    deadline = _current.get()
+    return limit if deadline is None else min(limit, deadline.remaining())
+
+
+def report_partial(build: Callable[[], Any]) -> None:
+    """Report how to build a partial result of the current request, if it has a deadline."""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.report_partial(build)
@@ -0,0 +1,130 @@
+import heapq
+import re
+import zlib
+from typing import Dict, FrozenSet, Generic, Hashable, List, Tuple, TypeVar
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+# Mersenne prime modulus of the MinHash permutations.
+_PRIME = (1 << 61) - 1
+
+K = TypeVar("K", bound=Hashable)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase text and collapse everything but words to single spaces."""
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def word_shingles(text: str, size: int = 1) -> FrozenSet[str]:
+    """Return the set of `size`-word shingles of the normalised text."""
+    words = normalize_text(text).split()
+    if len(words) <= size:
+        return frozenset([" ".join(words)]) if words else frozenset()
+    return frozenset(" ".join(words[index:index + size]) for index in range(len(words) - size + 1))
+
+
+def sketch(shingles: FrozenSet[str], size: int) -> FrozenSet[str]:
+    """Keep the `size` shingles with the smallest hashes (a bottom-k sketch).
+
+    Sketches of similar sets share most of their shingles, so their Jaccard
+    similarity estimates that of the full sets at a bounded size.
+    """
+    if len(shingles) <= size:
+        return shingles
+    return frozenset(heapq.nsmallest(size, shingles, key=lambda shingle: zlib.crc32(shingle.encode("utf-8"))))
+
+
+def jaccard(left: FrozenSet[str], right: FrozenSet[str]) -> float:
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
+
+
+class MinHashLSH(Generic[K]):
+    """Finds sets whose Jaccard similarity reaches `threshold`.
+
+    Each set is summarised by a MinHash signature of `bands * rows` values; sets that
+    agree on all rows of any band become candidates and are confirmed with the exact
+    Jaccard similarity, so there are no false positives.
+    """
+
+    def __init__(self, threshold: float = 0.8, bands: int = 16, rows: int = 8, seed: int = 0):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=bands * rows, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=bands * rows, dtype=np.uint64)
+        self._buckets: Dict[Tuple[int, bytes], List[K]] = {}
+        self._sets: Dict[K, FrozenSet[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._sets)
+
+    def signature(self, shingles: FrozenSet[str]) -> np.ndarray:
+        """MinHash signature of a shingle set."""
+        if not shingles:
+            return np.zeros(self.bands * self.rows, dtype=np.uint64)
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64, count=len(shingles)
+        )
+        # Products of 61-bit and 32-bit values can overflow 64 bits; wrap-around keeps them well mixed.
+        permuted = (np.outer(hashes, self._a) + self._b) % _PRIME
+        return permuted.min(axis=0)
+
+    def query(self, shingles: FrozenSet[str]) -> List[Tuple[K, float]]:
+        """Return the keys of stored sets similar to `shingles` with their similarity, best first."""
+        return self._query(shingles, self._band_keys(self.signature(shingles)))
+
+    def add(self, key: K, shingles: FrozenSet[str]) -> None:
+        self._insert(key, shingles, self._band_keys(self.signature(shingles)))
+
+    def remove(self, key: K) -> None:
+        """Forget a stored set."""
+        shingles = self._sets.pop(key, None)
+        if shingles is None:
+            return
+        for band_key in self._band_keys(self.signature(shingles)):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None and key in bucket:
+                bucket.remove(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def query_or_add(self, key: K, shingles: FrozenSet[str]) -> List[Tuple[K, float]]:
+        """Return similar stored sets, or store `shingles` under `key` when there are none."""
+        band_keys = self._band_keys(self.signature(shingles))
+        matches = self._query(shingles, band_keys)
+        if not matches:
+            self._insert(key, shingles, band_keys)
+        return matches
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        data = signature.tobytes()
+        width = self.rows * signature.itemsize
+        return [(band, data[band * width:(band + 1) * width]) for band in range(self.bands)]
+
+    def _query(self, shingles: FrozenSet[str], band_keys: List[Tuple[int, bytes]]) -> List[Tuple[K, float]]:
+        seen = set()
+        matches = []
+        for band_key in band_keys:
+            for key in self._buckets.get(band_key, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                stored = self._sets[key]
+                # The size ratio bounds the similarity from above.
+                if min(len(stored), len(shingles)) < self.threshold * max(len(stored), len(shingles)):
+                    continue
+                similarity = jaccard(shingles, stored)
+                if similarity >= self.threshold:
+                    matches.append((key, similarity))
+        matches.sort(key=lambda match: -match[1])
+        return matches
+
+    def _insert(self, key: K, shingles: FrozenSet[str], band_keys: List[Tuple[int, bytes]]) -> None:
+        self._sets[key] = shingles
+        for band_key in band_keys:
+            self._buckets.setdefault(band_key, []).append(key)
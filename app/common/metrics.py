@@ -0,0 +1,256 @@
+"""Low-overhead in-process metrics rendered in the Prometheus text exposition format.
+
+Metrics are registered once at import time; recording a value is a dict lookup and a
+few additions under a lock. Gauges that mirror state owned elsewhere (cache, job queue,
+admission control) are produced by collectors that run when `/metrics` is scraped.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from enum import Enum
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+# Latency buckets in seconds, from sub-millisecond cache hits to minute-long generations.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+class Stage(str, Enum):
+    """Stages of a generation request timed inside the strategies."""
+    VALIDATION = "validation"
+    SEARCH = "search"
+    GENERATION = "generation"
+    SERIALIZATION = "serialization"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """Base class of labelled metrics."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Tuple[str, ...]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+        return tuple(str(getattr(label, "value", label)) for label in labels)
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for name, labels, value in self.samples())
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}_total", dict(zip(self.labelnames, key)), value
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram(Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def count(self, *labels: str) -> int:
+        counts = self._values.get(self._key(labels))
+        return int(sum(counts[:-1])) if counts else 0
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            items = [(key, list(counts)) for key, counts in self._values.items()]
+        for key, counts in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_count", labels, cumulative
+            yield f"{self.name}_sum", labels, counts[-1]
+
+
+class MetricsRegistry:
+    """Holds the metrics of the process and renders them for scraping."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Metric]]) -> None:
+        """Register a callable producing metrics from external state at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for metric in collector():
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_LABELS = ("generation_type", "output_type", "search_type", "outcome")
+
+GENERATION_REQUESTS = registry.counter(
+    "generation_requests", "Generation requests by type and outcome", REQUEST_LABELS
+)
+GENERATION_IN_FLIGHT = registry.gauge(
+    "generation_requests_in_flight", "Generation requests currently being processed", ("generation_type",)
+)
+GENERATION_LATENCY = registry.histogram(
+    "generation_request_duration_seconds", "Latency of generation requests", REQUEST_LABELS
+)
+STAGE_LATENCY = registry.histogram(
+    "generation_stage_duration_seconds", "Latency of generation stages inside strategies", ("generation_type", "stage")
+)
+
+
+def outcome(error: Optional[BaseException] = None) -> str:
+    """Outcome label of a finished request: success, client_error or server_error."""
+    if error is None:
+        return "success"
+    status_code = getattr(error, "status_code", 500)
+    return "client_error" if 400 <= status_code < 500 else "server_error"
+
+
+@contextmanager
+def track_request(generation_type: str, output_type: str, search_type: str) -> Iterator[None]:
+    """Count a generation request and record its latency and outcome."""
+    if not settings.METRICS_ENABLED:
+        yield
+        return
+    GENERATION_IN_FLIGHT.inc(generation_type)
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        labels = (generation_type, output_type, search_type, outcome(error))
+        GENERATION_LATENCY.observe(time.perf_counter() - started, *labels)
+        GENERATION_REQUESTS.inc(*labels)
+        GENERATION_IN_FLIGHT.dec(generation_type)
+
+
+@contextmanager
+def track_stage(generation_type: str, stage: Stage) -> Iterator[None]:
+    """Record the duration of one stage (validation, search, generation, serialization) of a request."""
+    if not settings.METRICS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - started, generation_type, stage)
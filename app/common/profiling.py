@@ -0,0 +1,82 @@
+"""Opt-in profiling of individual requests.
+
+A request is profiled when it carries the `PROFILE_TOKEN` in its `X-Profile-Token`
+header, or when it is drawn by `PROFILE_SAMPLE_RATE`. Its execution is recorded with
+cProfile and written as a pstats file `<artifact id>.prof` to `PROFILE_DIR`, which can
+be inspected with `python -m pstats` or rendered as a flamegraph with tools such as
+snakeviz or flameprof.
+"""
+import asyncio
+import cProfile
+import hmac
+import os
+import random
+import threading
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from app.common.utils import logger
+from app.core.config import settings
+
+ARTIFACT_SUFFIX = ".prof"
+
+# cProfile hooks the whole thread, so only one request is profiled at a time.
+_lock = threading.Lock()
+
+
+def should_profile(token: Optional[str] = None) -> bool:
+    """Decide whether a request is profiled, by its privileged token or by sampling."""
+    if token and settings.PROFILE_TOKEN and hmac.compare_digest(token, settings.PROFILE_TOKEN):
+        return True
+    return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+def artifact_path(artifact_id: str, directory: Optional[str] = None) -> str:
+    return os.path.join(directory or settings.PROFILE_DIR, artifact_id + ARTIFACT_SUFFIX)
+
+
+@asynccontextmanager
+async def profile_request(enabled: bool, directory: Optional[str] = None) -> AsyncIterator[Optional[str]]:
+    """Profile the block and yield the id of the artifact it is written to.
+
+    Yields None when profiling is not enabled or another request is being profiled.
+    The profile covers everything the event loop thread runs meanwhile, including
+    other requests interleaved at await points; work offloaded to threads or
+    processes is not included.
+    """
+    if not enabled or not _lock.acquire(blocking=False):
+        yield None
+        return
+    artifact_id = uuid.uuid4().hex
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        try:
+            yield artifact_id
+        finally:
+            profiler.disable()
+        await asyncio.to_thread(_write_artifact, profiler, artifact_path(artifact_id, directory))
+    finally:
+        _lock.release()
+
+
+def _write_artifact(profiler: cProfile.Profile, path: str) -> None:
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    profiler.dump_stats(path)
+    logger.info(f"Wrote request profile {path}")
+    _prune(directory, settings.PROFILE_MAX_ARTIFACTS)
+
+
+def _prune(directory: str, keep: int) -> None:
+    # Sampled profiling must not fill the disk: keep only the newest artifacts.
+    artifacts = [entry for entry in os.scandir(directory) if entry.name.endswith(ARTIFACT_SUFFIX)]
+    if len(artifacts) <= keep:
+        return
+    artifacts.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in artifacts[:len(artifacts) - keep]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,676 @@
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+# A compiled check appends human readable errors for `value` (located at `path`) to `errors`.
+Check = Callable[[Any, str, List[str]], None]
+Validator = Callable[[Any], List[str]]
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: (isinstance(value, int) and not isinstance(value, bool))
+    or (isinstance(value, float) and value.is_integer()),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+}
+
+
+class SchemaError(ValueError):
+    """Raised when an output_schema cannot be compiled."""
+
+
+class OutputValidationError(ValueError):
+    """Raised when streamed output violates its output_schema."""
+
+
+def schema_hash(schema: Dict[str, Any]) -> str:
+    """Return a stable hash of a schema, independent of dict key order."""
+    encoded = json.dumps(schema, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class _SchemaCompiler:
+    """Compiles a JSON Schema subset into nested closures.
+
+    Supported keywords: type, enum, const, properties, required, additionalProperties,
+    items, minItems, maxItems, minLength, maxLength, pattern, minimum, maximum,
+    exclusiveMinimum, exclusiveMaximum, allOf, anyOf, oneOf, not and local $ref
+    (`#/definitions/...`, `#/$defs/...`). Other keywords are ignored.
+    """
+
+    def __init__(self, root: Dict[str, Any]):
+        self._root = root
+        self._refs: Dict[str, Check] = {}
+
+    def compile(self) -> Validator:
+        check = self._compile(self._root)
+
+        def validate(instance: Any) -> List[str]:
+            errors: List[str] = []
+            check(instance, "$", errors)
+            return errors
+
+        return validate
+
+    def _compile(self, schema: Any) -> Check:
+        if schema is True or schema == {}:
+            return _accept
+        if schema is False:
+            return _reject
+        if not isinstance(schema, dict):
+            raise SchemaError(f"Schema must be an object or boolean, got {type(schema).__name__}")
+
+        checks: List[Check] = []
+        if "$ref" in schema:
+            checks.append(self._compile_ref(schema["$ref"]))
+        if "type" in schema:
+            checks.append(_compile_type(schema["type"]))
+        if "enum" in schema:
+            checks.append(_compile_enum(schema["enum"]))
+        if "const" in schema:
+            checks.append(_compile_const(schema["const"]))
+        if {"properties", "required", "additionalProperties"} & schema.keys():
+            checks.append(self._compile_object(schema))
+        if {"items", "minItems", "maxItems"} & schema.keys():
+            checks.append(self._compile_array(schema))
+        if {"minLength", "maxLength", "pattern"} & schema.keys():
+            checks.append(_compile_string(schema))
+        if {"minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum"} & schema.keys():
+            checks.append(_compile_number(schema))
+        for keyword in ("allOf", "anyOf", "oneOf"):
+            if keyword in schema:
+                checks.append(self._compile_combinator(keyword, schema[keyword]))
+        if "not" in schema:
+            checks.append(self._compile_not(schema["not"]))
+
+        if not checks:
+            return _accept
+        if len(checks) == 1:
+            return checks[0]
+
+        def check_all(value: Any, path: str, errors: List[str]) -> None:
+            for check in checks:
+                check(value, path, errors)
+
+        return check_all
+
+    def _compile_ref(self, ref: Any) -> Check:
+        if not isinstance(ref, str) or not ref.startswith("#/"):
+            raise SchemaError(f"Only local $ref values are supported, got {ref!r}")
+        if ref not in self._refs:
+            # Register a trampoline first so recursive schemas compile.
+            compiled: List[Check] = []
+            self._refs[ref] = lambda value, path, errors: compiled[0](value, path, errors)
+            target: Any = self._root
+            for part in ref[2:].split("/"):
+                if not isinstance(target, dict) or part not in target:
+                    raise SchemaError(f"Unresolvable $ref {ref!r}")
+                target = target[part]
+            compiled.append(self._compile(target))
+        return self._refs[ref]
+
+    def _compile_object(self, schema: Dict[str, Any]) -> Check:
+        properties = schema.get("properties", {})
+        required = schema.get("required", [])
+        additional = schema.get("additionalProperties", True)
+        if not isinstance(properties, dict):
+            raise SchemaError("properties must be an object")
+        if not isinstance(required, list) or not all(isinstance(name, str) for name in required):
+            raise SchemaError("required must be a list of strings")
+
+        property_checks = {name: self._compile(subschema) for name, subschema in properties.items()}
+        additional_check: Optional[Check] = None if additional is True else self._compile(additional)
+
+        def check_object(value: Any, path: str, errors: List[str]) -> None:
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    errors.append(f"{path}: missing required property '{name}'")
+            for name, item in value.items():
+                property_check = property_checks.get(name)
+                if property_check is not None:
+                    property_check(item, f"{path}.{name}", errors)
+                elif additional_check is not None:
+                    additional_check(item, f"{path}.{name}", errors)
+
+        return check_object
+
+    def _compile_array(self, schema: Dict[str, Any]) -> Check:
+        items_check = self._compile(schema["items"]) if "items" in schema else None
+        min_items = schema.get("minItems")
+        max_items = schema.get("maxItems")
+
+        def check_array(value: Any, path: str, errors: List[str]) -> None:
+            if not isinstance(value, list):
+                return
+            if min_items is not None and len(value) < min_items:
+                errors.append(f"{path}: expected at least {min_items} items, got {len(value)}")
+            if max_items is not None and len(value) > max_items:
+                errors.append(f"{path}: expected at most {max_items} items, got {len(value)}")
+            if items_check is not None:
+                for index, item in enumerate(value):
+                    items_check(item, f"{path}[{index}]", errors)
+
+        return check_array
+
+    def _compile_combinator(self, keyword: str, subschemas: Any) -> Check:
+        if not isinstance(subschemas, list) or not subschemas:
+            raise SchemaError(f"{keyword} must be a non-empty list")
+        checks = [self._compile(subschema) for subschema in subschemas]
+
+        def count_matches(value: Any, path: str) -> int:
+            return sum(1 for check in checks if not _run(check, value, path))
+
+        if keyword == "allOf":
+            def check_all_of(value: Any, path: str, errors: List[str]) -> None:
+                for check in checks:
+                    check(value, path, errors)
+            return check_all_of
+
+        if keyword == "anyOf":
+            def check_any_of(value: Any, path: str, errors: List[str]) -> None:
+                if not any(not _run(check, value, path) for check in checks):
+                    errors.append(f"{path}: does not match any of the allowed schemas")
+            return check_any_of
+
+        def check_one_of(value: Any, path: str, errors: List[str]) -> None:
+            matches = count_matches(value, path)
+            if matches != 1:
+                errors.append(f"{path}: must match exactly one schema, matched {matches}")
+        return check_one_of
+
+    def _compile_not(self, subschema: Any) -> Check:
+        check = self._compile(subschema)
+
+        def check_not(value: Any, path: str, errors: List[str]) -> None:
+            if not _run(check, value, path):
+                errors.append(f"{path}: must not match the excluded schema")
+
+        return check_not
+
+
+def _run(check: Check, value: Any, path: str) -> List[str]:
+    errors: List[str] = []
+    check(value, path, errors)
+    return errors
+
+
+def _accept(value: Any, path: str, errors: List[str]) -> None:
+    pass
+
+
+def _reject(value: Any, path: str, errors: List[str]) -> None:
+    errors.append(f"{path}: no value is allowed")
+
+
+def _compile_type(expected: Any) -> Check:
+    names = expected if isinstance(expected, list) else [expected]
+    unknown = [name for name in names if name not in _TYPE_CHECKS]
+    if not names or unknown:
+        raise SchemaError(f"Unsupported type {expected!r}")
+    type_checks = [_TYPE_CHECKS[name] for name in names]
+    description = " or ".join(names)
+
+    def check_type(value: Any, path: str, errors: List[str]) -> None:
+        for type_check in type_checks:
+            if type_check(value):
+                return
+        errors.append(f"{path}: expected {description}, got {_json_type(value)}")
+
+    return check_type
+
+
+def _compile_enum(options: Any) -> Check:
+    if not isinstance(options, list) or not options:
+        raise SchemaError("enum must be a non-empty list")
+
+    def check_enum(value: Any, path: str, errors: List[str]) -> None:
+        if not any(_json_equal(value, option) for option in options):
+            errors.append(f"{path}: {value!r} is not one of {options!r}")
+
+    return check_enum
+
+
+def _compile_const(expected: Any) -> Check:
+    def check_const(value: Any, path: str, errors: List[str]) -> None:
+        if not _json_equal(value, expected):
+            errors.append(f"{path}: expected {expected!r}")
+
+    return check_const
+
+
+def _compile_string(schema: Dict[str, Any]) -> Check:
+    min_length = schema.get("minLength")
+    max_length = schema.get("maxLength")
+    try:
+        pattern = re.compile(schema["pattern"]) if "pattern" in schema else None
+    except (re.error, TypeError) as e:
+        raise SchemaError(f"Invalid pattern: {str(e)}")
+
+    def check_string(value: Any, path: str, errors: List[str]) -> None:
+        if not isinstance(value, str):
+            return
+        if min_length is not None and len(value) < min_length:
+            errors.append(f"{path}: expected at least {min_length} characters")
+        if max_length is not None and len(value) > max_length:
+            errors.append(f"{path}: expected at most {max_length} characters")
+        if pattern is not None and not pattern.search(value):
+            errors.append(f"{path}: does not match pattern {pattern.pattern!r}")
+
+    return check_string
+
+
+def _compile_number(schema: Dict[str, Any]) -> Check:
+    minimum = schema.get("minimum")
+    maximum = schema.get("maximum")
+    exclusive_minimum = schema.get("exclusiveMinimum")
+    exclusive_maximum = schema.get("exclusiveMaximum")
+
+    def check_number(value: Any, path: str, errors: List[str]) -> None:
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return
+        if minimum is not None and value < minimum:
+            errors.append(f"{path}: {value} is less than {minimum}")
+        if maximum is not None and value > maximum:
+            errors.append(f"{path}: {value} is greater than {maximum}")
+        if exclusive_minimum is not None and value <= exclusive_minimum:
+            errors.append(f"{path}: {value} is not greater than {exclusive_minimum}")
+        if exclusive_maximum is not None and value >= exclusive_maximum:
+            errors.append(f"{path}: {value} is not less than {exclusive_maximum}")
+
+    return check_number
+
+
+def _json_type(value: Any) -> str:
+    for name in ("null", "boolean", "integer", "number", "string", "array", "object"):
+        if _TYPE_CHECKS[name](value):
+            return name
+    return type(value).__name__
+
+
+def _json_equal(left: Any, right: Any) -> bool:
+    # Keep JSON semantics: true is not 1.
+    if isinstance(left, bool) or isinstance(right, bool):
+        return isinstance(left, bool) and isinstance(right, bool) and left == right
+    return left == right
+
+
+class SchemaValidatorCache:
+    """Bounded LRU cache of compiled validators keyed by schema hash."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._validators: "OrderedDict[str, Validator]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._validators)
+
+    def get(self, schema: Dict[str, Any]) -> Validator:
+        """Return the compiled validator for a schema, compiling it on first use."""
+        key = schema_hash(schema)
+        validator = self._validators.get(key)
+        if validator is not None:
+            self.hits += 1
+            self._validators.move_to_end(key)
+            return validator
+
+        self.misses += 1
+        validator = _SchemaCompiler(schema).compile()
+        self._validators[key] = validator
+        if len(self._validators) > self.max_size:
+            self._validators.popitem(last=False)
+        return validator
+
+    def clear(self) -> None:
+        self._validators.clear()
+
+
+_validator_cache = SchemaValidatorCache(settings.SCHEMA_CACHE_SIZE)
+
+
+def compile_schema(schema: Dict[str, Any]) -> Validator:
+    """Compile an output_schema into a validator, reusing cached compilations."""
+    if not isinstance(schema, dict):
+        raise SchemaError("output_schema must be a dictionary")
+    return _validator_cache.get(schema)
+
+
+def check_output_schema(is_json: bool, output_schema: Optional[Dict[str, Any]]) -> None:
+    """Check the output_schema contract of a request and make sure the schema compiles."""
+    if is_json:
+        if not output_schema or not isinstance(output_schema, dict):
+            raise ValueError("output_schema must be a non-empty dictionary when output_type is JSON")
+        try:
+            compile_schema(output_schema)
+        except SchemaError as e:
+            raise ValueError(f"Invalid output_schema: {str(e)}")
+    elif output_schema is not None:
+        raise ValueError("output_schema should not be provided when output_type is not JSON")
+
+
+def check_output_shape(output_schema: Dict[str, Any], fields: Dict[str, str]) -> List[str]:
+    """Return why an object with exactly `fields` (name to JSON type) can never match the schema.
+
+    Only the top level of the schema is inspected; constraints on the values themselves
+    are left to the validation of the generated output.
+    """
+    errors: List[str] = []
+    expected = output_schema.get("type")
+    if expected is not None and "object" not in (expected if isinstance(expected, list) else [expected]):
+        errors.append(f"$: output is an object, the schema expects {expected}")
+    properties = output_schema.get("properties") or {}
+    missing = [name for name in output_schema.get("required") or [] if name not in fields]
+    if missing:
+        errors.append(f"$: required properties are not produced: {', '.join(map(str, missing))}")
+    for name, json_type in fields.items():
+        if name not in properties:
+            if output_schema.get("additionalProperties") is False:
+                errors.append(f"$: property '{name}' is produced but not allowed")
+            continue
+        declared = properties[name].get("type") if isinstance(properties[name], dict) else None
+        if declared is not None and json_type not in (declared if isinstance(declared, list) else [declared]):
+            errors.append(f"$.{name}: produced as {json_type}, the schema expects {declared}")
+    return errors
+
+
+def validate_json_output(content: str, output_schema: Dict[str, Any]) -> List[str]:
+    """Validate generated JSON content against an output_schema, returning the errors found."""
+    try:
+        instance = json.loads(content)
+    except json.JSONDecodeError as e:
+        return [f"$: content is not valid JSON ({str(e)})"]
+    return compile_schema(output_schema)(instance)
+
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING_STOP = re.compile(r'["\\]')
+_NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?")
+_NUMBER_PREFIX = re.compile(r"[-+0-9.eE]*")
+_LITERALS = {"t": ("true", True), "f": ("false", False), "n": ("null", None)}
+_VALUE_TYPES = {"{": ("object",), "[": ("array",), '"': ("string",), "t": ("boolean",), "f": ("boolean",), "n": ("null",)}
+_NUMBER_TYPES = ("number", "integer")
+_MISSING = object()
+# Bounds the $ref chains followed to find the schema of a position, in case of cycles.
+_MAX_REF_DEPTH = 32
+
+
+class _Frame:
+    """An open object or array and the schema it is validated against."""
+    __slots__ = ("is_object", "schema", "resolved", "path", "expect", "key", "child", "child_path", "count")
+
+    def __init__(self, is_object: bool, schema: Any, resolved: Optional[Dict[str, Any]], path: str):
+        self.is_object = is_object
+        self.schema = schema
+        self.resolved = resolved
+        self.path = path
+        self.expect = "first"
+        self.key: Optional[str] = None
+        self.child: Any = None
+        self.child_path = path
+        self.count = 0
+
+
+class StreamingValidator:
+    """Validates JSON output against an output_schema while it streams in.
+
+    An incremental parser tracks the position in the document and in the schema. JSON
+    syntax and the `type`, `properties`, `additionalProperties`, `items` and `maxItems`
+    keywords are checked as soon as the text reaching them arrives, and each completed
+    scalar and top-level field is checked against its full subschema, so invalid output
+    is rejected without waiting for the rest of the document. Keywords of the root
+    (`required`, combinators) are left to the validation of the complete output.
+    """
+
+    def __init__(self, schema: Dict[str, Any]):
+        self._root = schema
+        self._compiler = _SchemaCompiler(schema)
+        self._checks: Dict[int, Check] = {}
+        self._text = ""
+        self._pos = 0
+        self._offset = 0
+        self._scan = 0
+        self._stack: List[_Frame] = []
+        self._field_start = -1
+        self._field_parts: List[str] = []
+        self._pending: List[str] = []
+        self._fields: List[Tuple[str, Any]] = []
+        self._closed = False
+        self.complete = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume the next chunk of output and return the top-level fields it completed.
+
+        Raises `OutputValidationError` as soon as the output can no longer match the schema.
+        """
+        if self._scan and not _STRING_STOP.search(chunk) and not self._closed:
+            # Inside a long string: nothing to parse until a quote or escape arrives.
+            self._pending.append(chunk)
+            return []
+        self._text = "".join([self._text, *self._pending, chunk])
+        self._pending.clear()
+        self._parse()
+        # Drop consumed text; the consumed part of the top-level field being parsed is kept aside.
+        if self._pos:
+            if self._field_start >= 0:
+                self._field_parts.append(self._text[self._field_start:self._pos])
+                self._field_start = 0
+            self._text = self._text[self._pos:]
+            self._offset += self._pos
+            self._scan = max(0, self._scan - self._pos)
+            self._pos = 0
+        fields, self._fields = self._fields, []
+        return fields
+
+    def close(self) -> List[Tuple[str, Any]]:
+        """Mark the end of the output, which must complete the document."""
+        self._closed = True
+        fields = self.feed("")
+        if not self.complete:
+            raise OutputValidationError("$: content ended before the JSON document was complete")
+        return fields
+
+    def _parse(self) -> None:
+        text = self._text
+        while True:
+            self._pos = _WHITESPACE.match(text, self._pos).end()
+            if self._pos >= len(text):
+                return
+            if self.complete:
+                self._fail("$", f"unexpected content after the JSON document at character {self._offset + self._pos}")
+            if not self._stack:
+                if not self._value(self._root, "$"):
+                    return
+                continue
+
+            frame = self._stack[-1]
+            char = text[self._pos]
+            if frame.expect == "value":
+                if not self._value(frame.child, frame.child_path):
+                    return
+                frame.expect = "next"
+            elif frame.expect == "colon":
+                if char != ":":
+                    self._unexpected(frame.path)
+                self._pos += 1
+                frame.expect = "value"
+            elif frame.expect == "next":
+                if char == ",":
+                    self._pos += 1
+                    frame.expect = "key"
+                elif char == ("}" if frame.is_object else "]"):
+                    self._close()
+                else:
+                    self._unexpected(frame.path)
+            elif char == ("}" if frame.is_object else "]") and frame.expect == "first":
+                self._close()
+            elif frame.is_object:
+                if char != '"':
+                    self._unexpected(frame.path)
+                if not self._key(frame):
+                    return
+            else:
+                self._item(frame)
+
+    def _value(self, schema: Any, path: str) -> bool:
+        """Parse the value starting at the current position; False if it is still incomplete."""
+        text = self._text
+        char = text[self._pos]
+        types = _VALUE_TYPES.get(char) or (_NUMBER_TYPES if char in "-0123456789" else None)
+        if types is None:
+            self._unexpected(path)
+        resolved = self._resolve(schema)
+        if resolved is False:
+            self._fail(path, "no value is allowed")
+        if resolved is not None and "type" in resolved:
+            names = resolved["type"] if isinstance(resolved["type"], list) else [resolved["type"]]
+            if not any(name in names for name in types):
+                self._fail(path, f"expected {' or '.join(names)}, got {types[0]}")
+
+        if len(self._stack) == 1 and self._stack[0].is_object:
+            self._field_start = self._pos
+        if char in "{[":
+            self._stack.append(_Frame(char == "{", schema, resolved, path))
+            self._pos += 1
+            return True
+
+        if char == '"':
+            end = self._string_end()
+            if end is None:
+                return False
+            value = self._decode(text[self._pos:end], path)
+        elif char in _LITERALS:
+            word, value = _LITERALS[char]
+            received = text[self._pos:self._pos + len(word)]
+            if received != word:
+                if word.startswith(received) and len(received) < len(word) and not self._closed:
+                    return False
+                self._unexpected(path)
+            end = self._pos + len(word)
+        else:
+            # A number may continue in the next chunk until a delimiter follows it.
+            if _NUMBER_PREFIX.fullmatch(text, self._pos) and not self._closed:
+                return False
+            match = _NUMBER.match(text, self._pos)
+            if match is None:
+                self._unexpected(path)
+            end = match.end()
+            value = json.loads(match.group())
+        self._pos = end
+        self._complete(schema, path, value)
+        return True
+
+    def _key(self, frame: _Frame) -> bool:
+        end = self._string_end()
+        if end is None:
+            return False
+        key = self._decode(self._text[self._pos:end], frame.path)
+        self._pos = end
+        frame.key = key
+        frame.child = None
+        frame.child_path = f"{frame.path}.{key}"
+        if frame.resolved is not None:
+            properties = frame.resolved.get("properties", {})
+            additional = frame.resolved.get("additionalProperties", True)
+            if key in properties:
+                frame.child = properties[key]
+            elif additional is False:
+                self._fail(frame.path, f"unexpected property '{key}'")
+            elif additional is not True:
+                frame.child = additional
+        frame.expect = "colon"
+        return True
+
+    def _item(self, frame: _Frame) -> None:
+        index = frame.count
+        frame.count += 1
+        frame.child_path = f"{frame.path}[{index}]"
+        if frame.resolved is not None:
+            max_items = frame.resolved.get("maxItems")
+            if max_items is not None and frame.count > max_items:
+                self._fail(frame.path, f"expected at most {max_items} items")
+            frame.child = frame.resolved.get("items")
+        frame.expect = "value"
+
+    def _close(self) -> None:
+        frame = self._stack.pop()
+        self._pos += 1
+        self._complete(frame.schema, frame.path)
+
+    def _complete(self, schema: Any, path: str, value: Any = _MISSING) -> None:
+        if not self._stack:
+            self.complete = True
+            return
+        if len(self._stack) == 1 and self._stack[0].is_object:
+            if value is _MISSING:
+                self._field_parts.append(self._text[self._field_start:self._pos])
+                value = json.loads("".join(self._field_parts))
+            self._field_parts.clear()
+            self._field_start = -1
+            self._check(schema, value, path)
+            self._fields.append((self._stack[0].key, value))
+        elif value is not _MISSING:
+            self._check(schema, value, path)
+
+    def _check(self, schema: Any, value: Any, path: str) -> None:
+        if schema is None:
+            return
+        check = self._checks.get(id(schema))
+        if check is None:
+            check = self._checks[id(schema)] = self._compiler._compile(schema)
+        errors = _run(check, value, path)
+        if errors:
+            raise OutputValidationError("; ".join(errors[:10]))
+
+    def _resolve(self, schema: Any) -> Any:
+        for _ in range(_MAX_REF_DEPTH):
+            if not isinstance(schema, dict) or "$ref" not in schema:
+                break
+            target: Any = self._root
+            for part in schema["$ref"][2:].split("/"):
+                target = target.get(part) if isinstance(target, dict) else None
+            schema = target
+        if schema is False:
+            return False
+        return schema if isinstance(schema, dict) and schema else None
+
+    def _string_end(self) -> Optional[int]:
+        """Index after the closing quote of the string at the current position, or None if it is incomplete."""
+        text = self._text
+        index = max(self._pos + 1, self._scan)
+        while True:
+            match = _STRING_STOP.search(text, index)
+            if match is None:
+                self._scan = len(text)
+                return None
+            index = match.start()
+            if text[index] == '"':
+                self._scan = 0
+                return index + 1
+            if index + 1 >= len(text):
+                # Resume at the backslash: its escaped character is in the next chunk.
+                self._scan = index
+                return None
+            index += 2
+
+    def _decode(self, raw: str, path: str) -> str:
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            self._fail(path, f"invalid string at character {self._offset + self._pos}")
+
+    def _unexpected(self, path: str) -> None:
+        self._fail(path, f"invalid JSON at character {self._offset + self._pos}")
+
+    def _fail(self, path: str, message: str) -> None:
+        raise OutputValidationError(f"{path}: {message}")
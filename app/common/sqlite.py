@@ -0,0 +1,31 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+def connect(path: str, incremental_vacuum: bool = False) -> sqlite3.Connection:
+    """Open a database shared by several processes: WAL journal, autocommit, usable from any thread.
+
+    Callers serialise access with their own lock and group writes with `transaction`.
+    """
+    db = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+    if incremental_vacuum:
+        # Only takes effect before the first table is created.
+        db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
+
+
+@contextmanager
+def transaction(db: sqlite3.Connection, lock: threading.RLock) -> Iterator[None]:
+    """Run statements in a write transaction, taking the database write lock up front."""
+    with lock:
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
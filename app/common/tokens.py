@@ -0,0 +1,65 @@
+import re
+import threading
+from collections import OrderedDict
+
+from app.common.chunking import content_hash
+from app.core.config import settings
+
+_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+# Texts shorter than this are estimated directly; hashing them would cost as much.
+_MIN_CACHED_CHARS = 256
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens a BPE tokenizer produces for `text`.
+
+    Every punctuation mark counts as one token and every word as one token per six
+    characters, which tracks common subword vocabularies closely enough for budgeting
+    without loading a tokenizer.
+    """
+    return sum(1 + (len(piece) - 1) // 6 for piece in _PIECE_PATTERN.findall(text))
+
+
+class TokenCountCache:
+    """Bounded LRU cache of token counts keyed by content hash."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def count(self, text: str) -> int:
+        """Return the estimated token count of a text, estimating it on first use."""
+        if len(text) < _MIN_CACHED_CHARS:
+            return estimate_tokens(text)
+        key = content_hash(text)
+        with self._lock:
+            count = self._counts.get(key)
+            if count is not None:
+                self.hits += 1
+                self._counts.move_to_end(key)
+                return count
+        count = estimate_tokens(text)
+        with self._lock:
+            self.misses += 1
+            self._counts[key] = count
+            if len(self._counts) > self.max_size:
+                self._counts.popitem(last=False)
+        return count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+_token_cache = TokenCountCache(settings.TOKEN_CACHE_SIZE)
+
+
+def count_tokens(text: str) -> int:
+    """Estimated token count of a text, cached by content hash."""
+    return _token_cache.count(text)
@@ -1,10 +1,22 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 import os
+from typing import Dict
 from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def parse_limits(value: str) -> Dict[str, float]:
+    """Parse `name=number` pairs separated by commas, e.g. `"claim_discovery=8,default=32"`."""
+    limits = {}
+    for item in value.split(","):
+        if item.strip():
+            name, _, number = item.partition("=")
+            limits[name.strip()] = float(number)
+    return limits
+
+
 class Settings(BaseSettings):
     APP_NAME: str = os.getenv("APP_NAME", "content-generation-service")
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
@@ -15,6 +27,111 @@ class Settings(BaseSettings):
     
     STREAMLIT_PORT: int = int(os.getenv("STREAMLIT_PORT", "8501"))
 
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+    BATCH_MAX_CONCURRENCY: int = int(os.getenv("BATCH_MAX_CONCURRENCY", "32"))
+
+    STREAM_CHUNK_SIZE: int = int(os.getenv("STREAM_CHUNK_SIZE", "256"))
+
+    REQUEST_TIMEOUT_SECONDS: float = float(os.getenv("REQUEST_TIMEOUT_SECONDS", "60"))
+    REQUEST_TIMEOUT_MAX_SECONDS: float = float(os.getenv("REQUEST_TIMEOUT_MAX_SECONDS", "300"))
+
+    RESPONSE_FAST_PATH: bool = os.getenv("RESPONSE_FAST_PATH", "True").lower() == "true"
+
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "True").lower() == "true"
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    CACHE_MAX_BYTES: int = int(os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", "600"))
+    CACHE_SHARED_PATH: str = os.getenv("CACHE_SHARED_PATH", "")
+
+    RESULT_STORE_PATH: str = os.getenv("RESULT_STORE_PATH", "")
+    RESULT_STORE_MAX_BYTES: int = int(os.getenv("RESULT_STORE_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+    SCHEMA_CACHE_SIZE: int = int(os.getenv("SCHEMA_CACHE_SIZE", "256"))
+
+    SEARCH_TOP_K: int = int(os.getenv("SEARCH_TOP_K", "10"))
+    SEARCH_MAX_TOP_K: int = int(os.getenv("SEARCH_MAX_TOP_K", "100"))
+    SEARCH_BM25_K1: float = float(os.getenv("SEARCH_BM25_K1", "1.2"))
+    SEARCH_BM25_B: float = float(os.getenv("SEARCH_BM25_B", "0.75"))
+    SEARCH_COMPACT_RATIO: float = float(os.getenv("SEARCH_COMPACT_RATIO", "0.3"))
+    SEARCH_DEFAULT_MODE: str = os.getenv("SEARCH_DEFAULT_MODE", "keyword")
+    SEARCH_SNAPSHOT_PATH: str = os.getenv("SEARCH_SNAPSHOT_PATH", "")
+
+    EMBEDDING_DIM: int = int(os.getenv("EMBEDDING_DIM", "256"))
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+    VECTOR_INDEX_PATH: str = os.getenv("VECTOR_INDEX_PATH", "")
+    VECTOR_IVF_MIN_VECTORS: int = int(os.getenv("VECTOR_IVF_MIN_VECTORS", "100000"))
+    VECTOR_IVF_NPROBE: int = int(os.getenv("VECTOR_IVF_NPROBE", "8"))
+
+    INGESTION_CHUNK_MIN_CHARS: int = int(os.getenv("INGESTION_CHUNK_MIN_CHARS", "500"))
+    INGESTION_CHUNK_MAX_CHARS: int = int(os.getenv("INGESTION_CHUNK_MAX_CHARS", "2000"))
+    INGESTION_JOB_HISTORY: int = int(os.getenv("INGESTION_JOB_HISTORY", "100"))
+
+    CLAIM_MAX_CLAIMS: int = int(os.getenv("CLAIM_MAX_CLAIMS", "50"))
+    CLAIM_MIN_SCORE: float = float(os.getenv("CLAIM_MIN_SCORE", "0.5"))
+    CLAIM_CHUNK_CHARS: int = int(os.getenv("CLAIM_CHUNK_CHARS", "100000"))
+    CLAIM_PARALLEL_MIN_CHARS: int = int(os.getenv("CLAIM_PARALLEL_MIN_CHARS", "400000"))
+    CLAIM_PROCESS_WORKERS: int = int(os.getenv("CLAIM_PROCESS_WORKERS", str(min(os.cpu_count() or 1, 8))))
+
+    EVIDENCE_TOP_K: int = int(os.getenv("EVIDENCE_TOP_K", "5"))
+    EVIDENCE_SPAN_CHARS: int = int(os.getenv("EVIDENCE_SPAN_CHARS", "400"))
+    EVIDENCE_MAX_CLAIMS: int = int(os.getenv("EVIDENCE_MAX_CLAIMS", "100"))
+
+    DEDUP_ENABLED: bool = os.getenv("DEDUP_ENABLED", "True").lower() == "true"
+    DEDUP_THRESHOLD: float = float(os.getenv("DEDUP_THRESHOLD", "0.9"))
+    DEDUP_MAX_DOCUMENTS: int = int(os.getenv("DEDUP_MAX_DOCUMENTS", "256"))
+    DEDUP_SHINGLE_SIZE: int = int(os.getenv("DEDUP_SHINGLE_SIZE", "3"))
+    DEDUP_SKETCH_SIZE: int = int(os.getenv("DEDUP_SKETCH_SIZE", "256"))
+
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "8"))
+    JOB_QUEUE_SIZE: int = int(os.getenv("JOB_QUEUE_SIZE", "1000"))
+    JOB_RESULT_TTL_SECONDS: float = float(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+    JOB_MAX_RETAINED: int = int(os.getenv("JOB_MAX_RETAINED", "10000"))
+
+    BULK_CONCURRENCY: int = int(os.getenv("BULK_CONCURRENCY", "64"))
+    BULK_CHECKPOINT_INTERVAL: int = int(os.getenv("BULK_CHECKPOINT_INTERVAL", "1000"))
+
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "True").lower() == "true"
+    ADMISSION_MAX_CONCURRENCY: int = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "64"))
+    ADMISSION_TENANT_CONCURRENCY: int = int(os.getenv("ADMISSION_TENANT_CONCURRENCY", "16"))
+    ADMISSION_TYPE_CONCURRENCY: str = os.getenv("ADMISSION_TYPE_CONCURRENCY", "")
+    ADMISSION_TENANT_RATE: float = float(os.getenv("ADMISSION_TENANT_RATE", "0"))
+    ADMISSION_TENANT_BURST: float = float(os.getenv("ADMISSION_TENANT_BURST", "100"))
+    ADMISSION_TYPE_RATES: str = os.getenv("ADMISSION_TYPE_RATES", "")
+    ADMISSION_TENANT_WEIGHTS: str = os.getenv("ADMISSION_TENANT_WEIGHTS", "")
+    ADMISSION_MAX_QUEUE_SECONDS: float = float(os.getenv("ADMISSION_MAX_QUEUE_SECONDS", "2"))
+    ADMISSION_MAX_QUEUED: int = int(os.getenv("ADMISSION_MAX_QUEUED", "1000"))
+    # Comma-separated client addresses allowed to set X-Tenant-ID, e.g. an API gateway; "*" trusts all clients.
+    ADMISSION_TRUSTED_PROXIES: str = os.getenv("ADMISSION_TRUSTED_PROXIES", "")
+
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_TOKEN: str = os.getenv("PROFILE_TOKEN", "")
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_MAX_ARTIFACTS: int = int(os.getenv("PROFILE_MAX_ARTIFACTS", "100"))
+
+    BACKEND_URLS: str = os.getenv("BACKEND_URLS", "")
+    BACKEND_API_KEY: str = os.getenv("BACKEND_API_KEY", "")
+    BACKEND_MAX_CONNECTIONS: int = int(os.getenv("BACKEND_MAX_CONNECTIONS", "32"))
+    BACKEND_CONNECTION_LIMITS: str = os.getenv("BACKEND_CONNECTION_LIMITS", "")
+    BACKEND_TIMEOUT_SECONDS: float = float(os.getenv("BACKEND_TIMEOUT_SECONDS", "30"))
+    BACKEND_RETRIES: int = int(os.getenv("BACKEND_RETRIES", "2"))
+    BACKEND_BACKOFF_SECONDS: float = float(os.getenv("BACKEND_BACKOFF_SECONDS", "0.2"))
+    BACKEND_BACKOFF_MAX_SECONDS: float = float(os.getenv("BACKEND_BACKOFF_MAX_SECONDS", "5"))
+    BACKEND_HEDGE_ENABLED: bool = os.getenv("BACKEND_HEDGE_ENABLED", "False").lower() == "true"
+    BACKEND_HEDGE_PERCENTILE: float = float(os.getenv("BACKEND_HEDGE_PERCENTILE", "95"))
+    BACKEND_HEDGE_MIN_SAMPLES: int = int(os.getenv("BACKEND_HEDGE_MIN_SAMPLES", "50"))
+    BACKEND_BATCH_ENABLED: bool = os.getenv("BACKEND_BATCH_ENABLED", "False").lower() == "true"
+    BACKEND_BATCH_MAX_ITEMS: int = int(os.getenv("BACKEND_BATCH_MAX_ITEMS", "16"))
+    BACKEND_BATCH_MAX_WAIT_MS: float = float(os.getenv("BACKEND_BATCH_MAX_WAIT_MS", "5"))
+
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "100000"))
+    CONTEXT_TOKEN_BUDGET: int = int(os.getenv("CONTEXT_TOKEN_BUDGET", "8000"))
+    CONTEXT_TOKEN_BUDGETS: str = os.getenv("CONTEXT_TOKEN_BUDGETS", "")
+    CONTEXT_RESERVED_TOKENS: int = int(os.getenv("CONTEXT_RESERVED_TOKENS", "1024"))
+    CONTEXT_PACKING: str = os.getenv("CONTEXT_PACKING", "greedy")
+    CONTEXT_SPAN_CHARS: int = int(os.getenv("CONTEXT_SPAN_CHARS", "1000"))
+
 @lru_cache()
 def get_settings() -> Settings:
     return Settings()
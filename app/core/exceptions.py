@@ -22,4 +22,63 @@ class SearchError(HTTPException):
         super().__init__(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=detail
-        ) 
\ No newline at end of file
+        )
+
+class ServiceUnavailableError(HTTPException):
+    """Raised when the service is temporarily overloaded; clients should retry later."""
+    def __init__(self, detail: str, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
+        )
+
+class TooManyRequestsError(HTTPException):
+    """Raised when a client exceeds its rate limit; clients should retry later."""
+    def __init__(self, detail: str, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
+        )
+
+class BackendError(HTTPException):
+    """Raised when the generation backend fails or rejects a call."""
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=detail
+        )
+
+class BackendTimeoutError(HTTPException):
+    """Raised when the generation backend does not answer in time."""
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=detail
+        )
+
+class ReadOnlyIndexError(HTTPException):
+    """Raised when modifying a corpus that is served from a read-only snapshot."""
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=detail
+        )
+
+class DeadlineExceededError(HTTPException):
+    """Raised when a request is not answered within its deadline."""
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=detail
+        )
+
+class ClientDisconnectedError(HTTPException):
+    """Raised when work is abandoned because the client disconnected."""
+    def __init__(self, detail: str):
+        super().__init__(
+            # Non-standard "client closed request"; the client never sees it, logs and metrics do.
+            status_code=499,
+            detail=detail
+        )
@@ -0,0 +1,98 @@
+"""Command line client that uploads documents into a running service's searchable corpus.
+
+With `--snapshot`, the documents are indexed locally instead and written as a
+read-only snapshot that every worker of a service can memory-map (`SEARCH_SNAPSHOT_PATH`).
+
+Usage:
+    python -m app.ingest docs/ report.txt --api-url http://localhost:8000/api/v1/ingestion
+    python -m app.ingest docs/ --snapshot /var/lib/corpus
+"""
+import argparse
+import os
+import sys
+from typing import Iterator, List, Tuple
+
+import httpx
+
+API_URL = os.getenv("INGESTION_API_URL", "http://localhost:8000/api/v1/ingestion")
+UPLOAD_BLOCK_SIZE = 1 << 20
+
+
+def iter_upload_blocks(path: str) -> Iterator[bytes]:
+    """Read a file in fixed-size blocks so uploads are streamed rather than buffered."""
+    with open(path, "rb") as f:
+        while block := f.read(UPLOAD_BLOCK_SIZE):
+            yield block
+
+
+def collect_files(paths: List[str]) -> List[Tuple[str, str]]:
+    """Expand directories into (file_id, path) pairs; file ids are paths relative to the argument."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    full_path = os.path.join(root, name)
+                    files.append((os.path.relpath(full_path, path), full_path))
+        else:
+            files.append((os.path.basename(path), path))
+    return files
+
+
+def build_snapshot(files: List[Tuple[str, str]], directory: str) -> int:
+    """Index files into a fresh corpus and write it as a snapshot; returns the number of passages."""
+    from app.services.ingestion import IngestionService
+    from app.services.search import SearchService
+
+    ingestion_service = IngestionService(search_service=SearchService())
+    for file_id, path in files:
+        job = ingestion_service.ingest_file(file_id, path)
+        print(f"{file_id}: {job.chunks} chunks in {job.elapsed_seconds:.2f}s")
+    return ingestion_service.search_service.write_snapshot(directory)["documents"]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ingest documents into the content generation service")
+    parser.add_argument("paths", nargs="+", help="Files or directories to ingest")
+    parser.add_argument("--api-url", default=API_URL, help="Base URL of the ingestion API")
+    parser.add_argument("--prefix", default="", help="Prefix added to every file id")
+    parser.add_argument("--snapshot", help="Index locally and write a read-only snapshot to this directory")
+    args = parser.parse_args(argv)
+
+    if args.snapshot:
+        files = [(f"{args.prefix}{file_id}", path) for file_id, path in collect_files(args.paths)]
+        documents = build_snapshot(files, args.snapshot)
+        print(f"Wrote {documents} passages to {args.snapshot}")
+        return 0
+
+    total_bytes = 0
+    total_seconds = 0.0
+    failures = 0
+    with httpx.Client(base_url=args.api_url, timeout=None) as client:
+        for file_id, path in collect_files(args.paths):
+            file_id = f"{args.prefix}{file_id}"
+            response = client.put(
+                f"/files/{file_id}",
+                content=iter_upload_blocks(path),
+                headers={"Content-Length": str(os.path.getsize(path))},
+            )
+            if response.is_error:
+                failures += 1
+                print(f"{file_id}: failed ({response.status_code}) {response.text}", file=sys.stderr)
+                continue
+            job = response.json()
+            total_bytes += job["bytes_total"]
+            total_seconds += job["elapsed_seconds"]
+            print(
+                f"{file_id}: {job['chunks']} chunks "
+                f"(+{job['chunks_added']} ={job['chunks_unchanged']} -{job['chunks_removed']}) "
+                f"in {job['elapsed_seconds']:.2f}s, {job['throughput_bytes_per_second'] / 1e6:.1f} MB/s"
+            )
+
+    if total_seconds > 0:
+        print(f"Ingested {total_bytes / 1e6:.1f} MB at {total_bytes / total_seconds / 1e6:.1f} MB/s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
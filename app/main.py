@@ -1,14 +1,34 @@
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.v1.routes.generation.dependencies import get_job_backend
 from app.api.v1.routes.generation.router import router as generation_router
 from app.api.v1.routes.health.router import router as health_router
+from app.api.v1.routes.ingestion.router import router as ingestion_router
+from app.api.v1.routes.metrics.router import router as metrics_router
+from app.services.backend import get_backend_pool
+from app.strategies.registry import get_strategy_registry
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build and warm up shared strategies and job workers on startup and release them and backend connections on shutdown."""
+    registry = get_strategy_registry()
+    await registry.startup()
+    await get_job_backend().start()
+    yield
+    await get_job_backend().stop()
+    await registry.shutdown()
+    await get_backend_pool().close()
 
 app = FastAPI(
     title="Content Generation Service",
     description="Service for generating content using Azure AI Search and LangChain",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -22,7 +42,9 @@ app.add_middleware(
 
 # Include routers
 app.include_router(generation_router, prefix="/api/v1/generation", tags=["generation"])
+app.include_router(ingestion_router, prefix="/api/v1/ingestion", tags=["ingestion"])
 app.include_router(health_router, prefix="/api/v1", tags=["health"])
+app.include_router(metrics_router, tags=["metrics"])
 
 @app.get("/")
 async def root():
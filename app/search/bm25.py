@@ -0,0 +1,210 @@
+import math
+import threading
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.search.tokenizer import tokenize
+
+
+class BM25Index:
+    """In-memory inverted index with BM25 ranking.
+
+    Posting lists are stored as pairs of compact `array('I')` buffers (document ids and
+    term frequencies) and scored through zero-copy NumPy views, so a query touches
+    only the posting lists of its terms. Each passage belongs to a file; restricting a
+    search to a set of files uses a per-query bitset over file ids. Removed passages are
+    tombstoned until `compact` drops them from the posting lists; document frequencies
+    count live passages only, so removals never turn a term's IDF negative.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._terms: Dict[str, int] = {}
+        self._posting_docs: List[array] = []
+        self._posting_tfs: List[array] = []
+        self._doc_freqs = array("I")
+        self._doc_lengths = array("I")
+        self._doc_files = array("I")
+        self._alive = bytearray()
+        self._passages: List[Optional[Dict[str, Any]]] = []
+        self._file_ids: Dict[str, int] = {}
+        self._total_length = 0
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._passages) - self._dead
+
+    @property
+    def dead_ratio(self) -> float:
+        return self._dead / len(self._passages) if self._passages else 0.0
+
+    @property
+    def file_count(self) -> int:
+        return len(self._file_ids)
+
+    @property
+    def term_count(self) -> int:
+        return len(self._terms)
+
+    def add(self, file_id: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> int:
+        """Index a passage of a file and return its document id."""
+        term_counts = Counter(tokenize(text))
+        length = sum(term_counts.values())
+        with self._lock:
+            doc_id = len(self._passages)
+            file_index = self._file_ids.setdefault(file_id, len(self._file_ids))
+            for term, count in term_counts.items():
+                term_id = self._terms.get(term)
+                if term_id is None:
+                    term_id = self._terms[term] = len(self._posting_docs)
+                    self._posting_docs.append(array("I"))
+                    self._posting_tfs.append(array("I"))
+                    self._doc_freqs.append(0)
+                self._posting_docs[term_id].append(doc_id)
+                self._doc_freqs[term_id] += 1
+                self._posting_tfs[term_id].append(count)
+            self._doc_lengths.append(length)
+            self._doc_files.append(file_index)
+            self._alive.append(1)
+            self._total_length += length
+            self._passages.append({"id": doc_id, "file_id": file_id, "text": text, **(metadata or {})})
+        return doc_id
+
+    def add_many(self, file_id: str, texts: Iterable[str]) -> List[int]:
+        """Index several passages of the same file."""
+        return [self.add(file_id, text) for text in texts]
+
+    def passage(self, doc_id: int) -> Optional[Dict[str, Any]]:
+        return self._passages[doc_id]
+
+    def file_mask(self, file_ids: Iterable[str]) -> Optional[np.ndarray]:
+        """Return a boolean mask over document ids selecting the passages of the given files.
+
+        Returns None when none of the files is indexed.
+        """
+        with self._lock:
+            selected = [self._file_ids[file_id] for file_id in file_ids if file_id in self._file_ids]
+            if not selected:
+                return None
+            file_filter = np.zeros(len(self._file_ids), dtype=bool)
+            file_filter[selected] = True
+            return file_filter[np.frombuffer(self._doc_files, dtype=np.uint32)]
+
+    def update_metadata(self, doc_id: int, metadata: Dict[str, Any]) -> None:
+        """Update the stored metadata of a live passage."""
+        with self._lock:
+            passage = self._passages[doc_id]
+            if passage is not None:
+                passage.update(metadata)
+
+    def remove(self, doc_ids: Iterable[int]) -> int:
+        """Tombstone passages so they no longer match; returns the number removed."""
+        removed = 0
+        with self._lock:
+            for doc_id in doc_ids:
+                if not self._alive[doc_id]:
+                    continue
+                self._alive[doc_id] = 0
+                for term in set(tokenize(self._passages[doc_id]["text"])):
+                    self._doc_freqs[self._terms[term]] -= 1
+                self._passages[doc_id] = None
+                self._total_length -= self._doc_lengths[doc_id]
+                removed += 1
+            self._dead += removed
+        return removed
+
+    def compact(self) -> np.ndarray:
+        """Drop tombstoned passages from all structures.
+
+        Returns an array mapping old document ids to new ones, with -1 for removed passages.
+        """
+        with self._lock:
+            alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+            remap = np.full(len(self._passages), -1, dtype=np.int64)
+            remap[alive] = np.arange(int(alive.sum()))
+
+            posting_docs: List[array] = []
+            posting_tfs: List[array] = []
+            doc_freqs = array("I")
+            terms: Dict[str, int] = {}
+            for term, term_id in self._terms.items():
+                docs = np.frombuffer(self._posting_docs[term_id], dtype=np.uint32)
+                keep = alive[docs]
+                if not keep.any():
+                    continue
+                terms[term] = len(posting_docs)
+                posting_docs.append(array("I", remap[docs[keep]].astype(np.uint32).tobytes()))
+                posting_tfs.append(array("I", np.frombuffer(self._posting_tfs[term_id], dtype=np.uint32)[keep].tobytes()))
+                doc_freqs.append(self._doc_freqs[term_id])
+
+            self._terms = terms
+            self._posting_docs = posting_docs
+            self._posting_tfs = posting_tfs
+            self._doc_freqs = doc_freqs
+            self._doc_lengths = array("I", np.frombuffer(self._doc_lengths, dtype=np.uint32)[alive].tobytes())
+            self._doc_files = array("I", np.frombuffer(self._doc_files, dtype=np.uint32)[alive].tobytes())
+            passages = [passage for passage in self._passages if passage is not None]
+            for doc_id, passage in enumerate(passages):
+                passage["id"] = doc_id
+            self._passages = passages
+            self._alive = bytearray(b"\x01" * len(passages))
+            self._dead = 0
+            return remap
+
+    def search(self, query: str, top_k: int = 10, file_ids: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Return the `top_k` best matching passages, optionally restricted to some files."""
+        terms = set(tokenize(query))
+        if not terms or top_k <= 0:
+            return []
+
+        with self._lock:
+            doc_count = len(self._passages) - self._dead
+            if not doc_count:
+                return []
+
+            file_filter = None
+            if file_ids is not None:
+                file_filter = np.zeros(len(self._file_ids), dtype=bool)
+                selected = [self._file_ids[file_id] for file_id in file_ids if file_id in self._file_ids]
+                if not selected:
+                    return []
+                file_filter[selected] = True
+
+            doc_lengths = np.frombuffer(self._doc_lengths, dtype=np.uint32)
+            average_length = self._total_length / doc_count or 1.0
+            scores = np.zeros(len(self._passages), dtype=np.float32)
+            for term in terms:
+                term_id = self._terms.get(term)
+                if term_id is None:
+                    continue
+                docs = np.frombuffer(self._posting_docs[term_id], dtype=np.uint32)
+                tfs = np.frombuffer(self._posting_tfs[term_id], dtype=np.uint32).astype(np.float32)
+                doc_freq = self._doc_freqs[term_id]
+                if not doc_freq:
+                    continue
+                idf = math.log(1 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+                length_norm = self.k1 * (1 - self.b + self.b * doc_lengths[docs] / average_length)
+                # Document ids are unique within a posting list, so fancy-index accumulation is safe.
+                scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + length_norm)
+
+            candidates = np.flatnonzero(scores)
+            if self._dead and len(candidates):
+                candidates = candidates[np.frombuffer(self._alive, dtype=np.uint8)[candidates].astype(bool)]
+            if file_filter is not None and len(candidates):
+                doc_files = np.frombuffer(self._doc_files, dtype=np.uint32)
+                candidates = candidates[file_filter[doc_files[candidates]]]
+            top = _top_k(candidates, scores, top_k)
+            return [{**self._passages[doc_id], "score": float(scores[doc_id])} for doc_id in top]
+
+
+def _top_k(candidates: np.ndarray, scores: np.ndarray, k: int) -> np.ndarray:
+    """Select the `k` best scoring candidates, best first, breaking ties by document id."""
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order]
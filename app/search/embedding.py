@@ -0,0 +1,68 @@
+import zlib
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import List, Sequence
+
+import numpy as np
+
+from app.search.tokenizer import tokenize
+
+
+class Embedder(ABC):
+    """Turns batches of texts into L2-normalised float32 vectors."""
+
+    dim: int
+    # Bump when the vectors of the same text change, so persisted embeddings are not reused.
+    version: str = "1"
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the embedding function whose vectors may be reused."""
+        return f"{type(self).__module__}.{type(self).__qualname__}:{self.version}:{self.dim}"
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed a batch of texts into a `(len(texts), dim)` float32 matrix."""
+        pass
+
+
+@lru_cache(maxsize=1 << 16)
+def _feature_hash(feature: str) -> int:
+    return zlib.crc32(feature.encode("utf-8"))
+
+
+class HashingEmbedder(Embedder):
+    """Deterministic, dependency-free embedder based on signed feature hashing.
+
+    Unigrams and bigrams are hashed into `dim` buckets with a hash-derived sign and
+    sublinear term weighting. It needs no model download or network access, which makes
+    it suitable for tests and as a local baseline; real embedders plug in through
+    the `Embedder` interface.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        rows: List[int] = []
+        hashes: List[int] = []
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            features = tokens + [f"{left} {right}" for left, right in zip(tokens, tokens[1:])]
+            rows.extend([row] * len(features))
+            hashes.extend(_feature_hash(feature) for feature in features)
+
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if hashes:
+            hash_array = np.asarray(hashes, dtype=np.uint32)
+            signs = np.where(hash_array >> 31, -1.0, 1.0).astype(np.float32)
+            np.add.at(matrix, (np.asarray(rows), hash_array % self.dim), signs)
+            matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        return normalize_rows(matrix)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalise each row, leaving all-zero rows untouched."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
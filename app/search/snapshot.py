@@ -0,0 +1,191 @@
+import json
+import os
+import shutil
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.exceptions import ReadOnlyIndexError
+from app.search.bm25 import BM25Index
+from app.search.vector import VectorIndex
+
+SNAPSHOT_VERSION = 1
+MANIFEST = "manifest.json"
+
+
+class _Slices:
+    """Sequence of variable-length slices of one flat array, delimited by `offsets`."""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self._data = data
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        return self._data[self._offsets[index]:self._offsets[index + 1]]
+
+
+class _Passages(_Slices):
+    """Passages stored as concatenated UTF-8 JSON, decoded on access."""
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return json.loads(super().__getitem__(index).tobytes())
+
+
+def _read_only(*args: Any, **kwargs: Any) -> None:
+    raise ReadOnlyIndexError("The corpus is served from a read-only snapshot")
+
+
+class MappedBM25Index(BM25Index):
+    """BM25 index over the memory-mapped posting lists of a snapshot.
+
+    Scoring is inherited from `BM25Index`; the arrays are views of the snapshot files,
+    so processes opening the same snapshot share one copy in the page cache.
+    """
+
+    def __init__(self, directory: str, manifest: Dict[str, Any]):
+        self.k1 = manifest["k1"]
+        self.b = manifest["b"]
+        self._lock = threading.RLock()
+        with open(os.path.join(directory, "terms.json"), "r", encoding="utf-8") as f:
+            self._terms = {term: term_id for term_id, term in enumerate(json.load(f))}
+        offsets = _load(directory, "posting_offsets")
+        self._posting_docs = _Slices(_load(directory, "posting_docs"), offsets)
+        self._posting_tfs = _Slices(_load(directory, "posting_tfs"), offsets)
+        # Snapshots are compacted, so every posting counts towards its term's document frequency.
+        self._doc_freqs = np.diff(offsets)
+        self._doc_lengths = _load(directory, "doc_lengths")
+        self._doc_files = _load(directory, "doc_files")
+        self._passages = _Passages(_load(directory, "passages"), _load(directory, "passage_offsets"))
+        self._file_ids = {file_id: index for index, file_id in enumerate(manifest["files"])}
+        self._total_length = manifest["total_length"]
+        self._dead = 0
+
+    add = add_many = update_metadata = remove = compact = _read_only
+
+
+class MappedVectorIndex(VectorIndex):
+    """Vector index searching the memory-mapped embedding matrix of a snapshot."""
+
+    def __init__(self, directory: str, manifest: Dict[str, Any]):
+        self.dim = manifest["dim"]
+        self.path = None
+        self._lock = threading.RLock()
+        self._matrix = _load(directory, "vectors")
+        self._size = len(self._matrix)
+        self._alive = b"\x01" * self._size
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: Sequence = []
+        self._ivf_size = manifest["ivf_size"]
+        if self._ivf_size:
+            self._centroids = _load(directory, "centroids")
+            self._lists = _Slices(_load(directory, "ivf_docs"), _load(directory, "ivf_offsets"))
+
+    add = remove = apply_remap = build_ivf = _read_only
+
+    def flush(self) -> None:
+        pass
+
+
+def write_snapshot(
+    directory: str,
+    index: BM25Index,
+    vectors: VectorIndex,
+    file_chunks: Dict[str, Dict[str, int]],
+    revision: str,
+) -> Dict[str, Any]:
+    """Write a compacted index and its vectors as a snapshot directory and return its manifest.
+
+    The snapshot is built next to `directory` and swapped in when complete, so
+    processes never open a partial snapshot; processes that mapped the previous one
+    keep reading it until they reopen.
+    """
+    if index.dead_ratio:
+        raise ValueError("Compact the index before writing a snapshot")
+    building = f"{directory}.building-{os.getpid()}"
+    shutil.rmtree(building, ignore_errors=True)
+    os.makedirs(building)
+
+    terms = sorted(index._terms, key=index._terms.get)
+    with open(os.path.join(building, "terms.json"), "w", encoding="utf-8") as f:
+        json.dump(terms, f, ensure_ascii=False)
+    postings = [index._terms[term] for term in terms]
+    _save(building, "posting_offsets", _offsets([len(index._posting_docs[term_id]) for term_id in postings]))
+    _save(building, "posting_docs", _concatenate([index._posting_docs[term_id] for term_id in postings]))
+    _save(building, "posting_tfs", _concatenate([index._posting_tfs[term_id] for term_id in postings]))
+    _save(building, "doc_lengths", np.frombuffer(index._doc_lengths, dtype=np.uint32))
+    _save(building, "doc_files", np.frombuffer(index._doc_files, dtype=np.uint32))
+    encoded = [json.dumps(passage, ensure_ascii=False).encode("utf-8") for passage in index._passages]
+    _save(building, "passages", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+    _save(building, "passage_offsets", _offsets([len(passage) for passage in encoded]))
+
+    documents = len(index._passages)
+    matrix = np.zeros((documents, vectors.dim), dtype=np.float32)
+    stored = min(documents, len(vectors))
+    matrix[:stored] = vectors._matrix[:stored]
+    _save(building, "vectors", matrix)
+    ivf_size = vectors.ivf_size if vectors.is_ivf else 0
+    if ivf_size:
+        _save(building, "centroids", vectors._centroids)
+        _save(building, "ivf_offsets", _offsets([len(members) for members in vectors._lists]))
+        _save(building, "ivf_docs", _concatenate(vectors._lists))
+
+    with open(os.path.join(building, "files.json"), "w", encoding="utf-8") as f:
+        json.dump(file_chunks, f, ensure_ascii=False)
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "documents": documents,
+        "dim": vectors.dim,
+        "k1": index.k1,
+        "b": index.b,
+        "total_length": index._total_length,
+        "files": sorted(index._file_ids, key=index._file_ids.get),
+        "ivf_size": ivf_size,
+        "revision": revision,
+    }
+    with open(os.path.join(building, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+    previous = f"{directory}.previous-{os.getpid()}"
+    if os.path.exists(directory):
+        os.rename(directory, previous)
+    os.rename(building, directory)
+    shutil.rmtree(previous, ignore_errors=True)
+    return manifest
+
+
+def read_manifest(directory: str) -> Dict[str, Any]:
+    with open(os.path.join(directory, MANIFEST), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {manifest.get('version')} in {directory}")
+    return manifest
+
+
+def read_file_chunks(directory: str) -> Dict[str, Dict[str, int]]:
+    with open(os.path.join(directory, "files.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _offsets(lengths: List[int]) -> np.ndarray:
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+def _concatenate(buffers: Sequence) -> np.ndarray:
+    if not buffers:
+        return np.zeros(0, dtype=np.uint32)
+    return np.concatenate([np.frombuffer(buffer, dtype=np.uint32) for buffer in buffers])
+
+
+def _save(directory: str, name: str, array: np.ndarray) -> None:
+    np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(array))
+
+
+def _load(directory: str, name: str) -> np.ndarray:
+    # Read-only maps: pages are shared between processes and never copied on write.
+    return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
@@ -0,0 +1,15 @@
+import re
+from typing import List
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be been but by for from had has have he her his if in into is it its "
+    "not of on or she so such that the their them then there these they this to was were which "
+    "will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric terms, dropping common stopwords."""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
@@ -0,0 +1,198 @@
+import os
+import threading
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.search.embedding import normalize_rows
+
+
+class VectorIndex:
+    """Dense vector index over a contiguous float32 matrix.
+
+    Row `i` holds the vector of document `i`, so document ids are shared with the
+    keyword index. The matrix lives in memory or, when `path` is given, in a
+    memory-mapped file. Search is an exact matrix product with `argpartition` top-k;
+    once `build_ivf` has clustered the vectors, queries only scan the `nprobe` closest
+    clusters (IVF).
+    """
+
+    def __init__(self, dim: int, path: Optional[str] = None, initial_capacity: int = 1024):
+        self.dim = dim
+        self.path = path
+        self._lock = threading.RLock()
+        self._size = 0
+        self._alive = bytearray()
+        self._matrix = self._allocate(max(initial_capacity, 1))
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[array] = []
+        self._ivf_size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def is_ivf(self) -> bool:
+        return self._centroids is not None
+
+    @property
+    def ivf_size(self) -> int:
+        """Number of vectors the IVF clustering was built on."""
+        return self._ivf_size
+
+    def add(self, doc_ids: Sequence[int], vectors: np.ndarray) -> None:
+        """Store vectors (normalised on the way in) for the given document ids."""
+        if not len(doc_ids):
+            return
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float32))
+        ids = np.asarray(doc_ids, dtype=np.int64)
+        with self._lock:
+            size = max(self._size, int(ids.max()) + 1)
+            self._ensure_capacity(size)
+            self._matrix[ids] = vectors
+            if size > self._size:
+                self._alive.extend(b"\x00" * (size - self._size))
+                self._size = size
+            for doc_id in doc_ids:
+                self._alive[doc_id] = 1
+            if self._centroids is not None:
+                for doc_id, cluster in zip(doc_ids, np.argmax(vectors @ self._centroids.T, axis=1)):
+                    self._lists[cluster].append(doc_id)
+
+    def remove(self, doc_ids: Sequence[int]) -> None:
+        """Exclude documents from search results."""
+        with self._lock:
+            for doc_id in doc_ids:
+                if doc_id < self._size:
+                    self._alive[doc_id] = 0
+
+    def apply_remap(self, remap: np.ndarray) -> None:
+        """Renumber documents after the keyword index compacted its ids (-1 drops a document)."""
+        with self._lock:
+            old_ids = np.flatnonzero(remap[:self._size] >= 0)
+            new_ids = remap[old_ids]
+            size = int(new_ids.max()) + 1 if len(new_ids) else 0
+            alive = np.zeros(size, dtype=np.uint8)
+            alive[new_ids] = np.frombuffer(self._alive, dtype=np.uint8)[old_ids]
+            self._matrix[new_ids] = self._matrix[old_ids]
+            self._alive = bytearray(alive.tobytes())
+            self._size = size
+            if self._centroids is not None:
+                lists = []
+                for members in self._lists:
+                    ids = np.frombuffer(members, dtype=np.uint32)
+                    ids = remap[ids[ids < len(remap)]]
+                    lists.append(array("I", ids[ids >= 0].astype(np.uint32).tobytes()))
+                self._lists = lists
+
+    def build_ivf(self, nlist: int, iterations: int = 10, sample_size: int = 100_000, seed: int = 0) -> None:
+        """Cluster the stored vectors with spherical k-means and build inverted lists."""
+        with self._lock:
+            live = np.flatnonzero(np.frombuffer(self._alive, dtype=np.uint8))
+            if len(live) < nlist:
+                return
+            rng = np.random.default_rng(seed)
+            sample = self._matrix[rng.choice(live, size=min(sample_size, len(live)), replace=False)]
+            centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+            for _ in range(iterations):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, sample)
+                empty = ~np.bincount(assignment, minlength=nlist).astype(bool)
+                sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+                centroids = normalize_rows(sums)
+
+            assignment = np.concatenate([
+                np.argmax(self._matrix[batch] @ centroids.T, axis=1)
+                for batch in np.array_split(live, max(1, len(live) // 65536))
+            ])
+            order = np.argsort(assignment, kind="stable")
+            bounds = np.searchsorted(assignment[order], np.arange(nlist + 1))
+            self._lists = [
+                array("I", live[order[bounds[cluster]:bounds[cluster + 1]]].astype(np.uint32).tobytes())
+                for cluster in range(nlist)
+            ]
+            self._centroids = centroids
+            self._ivf_size = len(live)
+
+    def search(
+        self,
+        queries: np.ndarray,
+        top_k: int,
+        allowed: Optional[np.ndarray] = None,
+        nprobe: int = 8,
+    ) -> List[List[Tuple[int, float]]]:
+        """Return the `top_k` (doc_id, cosine similarity) pairs for each query row.
+
+        `allowed` is an optional boolean mask over document ids restricting the results.
+        """
+        queries = normalize_rows(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        with self._lock:
+            if not self._size or top_k <= 0:
+                return [[] for _ in range(len(queries))]
+            alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+            if allowed is not None:
+                alive &= allowed[:self._size] if len(allowed) >= self._size else np.pad(allowed, (0, self._size - len(allowed)))
+            if self._centroids is None:
+                return self._exact_search(queries, top_k, alive)
+            return [self._ivf_search(query, top_k, alive, nprobe) for query in queries]
+
+    def flush(self) -> None:
+        if isinstance(self._matrix, np.memmap):
+            self._matrix.flush()
+
+    def _exact_search(self, queries: np.ndarray, top_k: int, alive: np.ndarray) -> List[List[Tuple[int, float]]]:
+        candidates = np.flatnonzero(alive)
+        if not len(candidates):
+            return [[] for _ in range(len(queries))]
+        if len(candidates) == self._size:
+            scores = queries @ self._matrix[:self._size].T
+        elif len(candidates) > self._size // 2:
+            # Scoring the whole matrix view is cheaper than gathering most of its rows.
+            scores = (queries @ self._matrix[:self._size].T)[:, candidates]
+        else:
+            scores = queries @ self._matrix[candidates].T
+        return [_top_k(candidates, row, top_k) for row in scores]
+
+    def _ivf_search(self, query: np.ndarray, top_k: int, alive: np.ndarray, nprobe: int) -> List[Tuple[int, float]]:
+        probes = np.argsort(-(self._centroids @ query))[:nprobe]
+        candidates = np.concatenate([np.frombuffer(self._lists[cluster], dtype=np.uint32) for cluster in probes])
+        candidates = candidates[alive[candidates]]
+        if not len(candidates):
+            return []
+        return _top_k(candidates, self._matrix[candidates] @ query, top_k)
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        if self.path is None:
+            return np.zeros((capacity, self.dim), dtype=np.float32)
+        needed = capacity * self.dim * 4
+        mode = "r+" if os.path.exists(self.path) else "w+"
+        if mode == "r+" and os.path.getsize(self.path) < needed:
+            os.truncate(self.path, needed)
+        return np.memmap(self.path, dtype=np.float32, mode=mode, shape=(capacity, self.dim))
+
+    def _ensure_capacity(self, size: int) -> None:
+        capacity = len(self._matrix)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        if self.path is None:
+            matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+            matrix[:self._size] = self._matrix[:self._size]
+            self._matrix = matrix
+        else:
+            # Growing the backing file keeps existing rows; remap with the larger shape.
+            self._matrix.flush()
+            del self._matrix
+            self._matrix = self._allocate(capacity)
+
+
+def _top_k(candidates: np.ndarray, scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+    if len(candidates) > k:
+        best = np.argpartition(-scores, k - 1)[:k]
+    else:
+        best = np.arange(len(candidates))
+    best = best[np.lexsort((candidates[best], -scores[best]))]
+    return [(int(candidates[index]), float(scores[index])) for index in best]
@@ -0,0 +1,304 @@
+import asyncio
+import hashlib
+import math
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import parse_limits, settings
+from app.core.exceptions import ServiceUnavailableError, TooManyRequestsError, ValidationError
+
+ANONYMOUS_TENANT = "anonymous"
+# Idle tenant state is pruned once this many tenants are tracked.
+MAX_IDLE_TENANTS = 10000
+
+
+def trusted_proxy(host: Optional[str]) -> bool:
+    """Whether a client is a proxy listed in `ADMISSION_TRUSTED_PROXIES` (`*` trusts every client)."""
+    proxies = {proxy.strip() for proxy in settings.ADMISSION_TRUSTED_PROXIES.split(",") if proxy.strip()}
+    return "*" in proxies or (host is not None and host in proxies)
+
+
+def tenant_id(tenant_header: Optional[str], api_key: Optional[str], trusted: bool = False) -> str:
+    """Identify the tenant of a request by a digest of its API key.
+
+    The tenant header is only honoured when set by a `trusted` proxy; otherwise clients
+    could pick a fresh tenant, and with it fresh limits, for every request.
+    """
+    if tenant_header and trusted:
+        return tenant_header
+    if api_key:
+        return "key:" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+    return ANONYMOUS_TENANT
+
+
+class TokenBucket:
+    """Allows `rate` operations per second on average with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float]):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+
+    @property
+    def full(self) -> bool:
+        self._refill()
+        return self._tokens >= self.burst
+
+    def take(self, cost: float = 1.0) -> float:
+        """Take `cost` tokens; returns 0 on success, else the seconds until they are available."""
+        self._refill()
+        if self._tokens >= cost:
+            self._tokens -= cost
+            return 0.0
+        return (cost - self._tokens) / self.rate
+
+    def refund(self, cost: float = 1.0) -> None:
+        """Return the tokens of a request that was not admitted after all."""
+        self._refill()
+        self._tokens = min(self.burst, self._tokens + cost)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+@dataclass
+class _Waiter:
+    tenant: str
+    generation_type: str
+    tag: float
+    future: asyncio.Future
+
+
+@dataclass
+class _Tenant:
+    weight: float
+    bucket: Optional[TokenBucket]
+    active: int = 0
+    last_tag: float = 0.0
+    waiters: Deque[_Waiter] = field(default_factory=deque)
+
+
+class AdmissionController:
+    """Admission control and weighted fair queuing in front of the generation service.
+
+    Requests are first charged against token buckets of their tenant and generation
+    type; an exhausted bucket rejects immediately with 429. Admitted requests then need
+    a concurrency slot: globally (`max_concurrency`), per tenant and per generation type.
+    When no slot is free they wait in per-tenant queues that are served by weighted
+    fair queuing, so a tenant flooding the service only delays its own requests. A
+    request that would wait longer than `max_queue_seconds` is rejected with 503.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        tenant_concurrency: Optional[int] = None,
+        type_concurrency: Optional[Dict[str, float]] = None,
+        tenant_rate: Optional[float] = None,
+        tenant_burst: Optional[float] = None,
+        type_rates: Optional[Dict[str, float]] = None,
+        tenant_weights: Optional[Dict[str, float]] = None,
+        max_queue_seconds: Optional[float] = None,
+        max_queued: Optional[int] = None,
+        enabled: Optional[bool] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.enabled = settings.ADMISSION_ENABLED if enabled is None else enabled
+        self.max_concurrency = max_concurrency or settings.ADMISSION_MAX_CONCURRENCY
+        self.tenant_concurrency = tenant_concurrency or settings.ADMISSION_TENANT_CONCURRENCY
+        self.type_concurrency = (
+            type_concurrency if type_concurrency is not None else parse_limits(settings.ADMISSION_TYPE_CONCURRENCY)
+        )
+        self.tenant_rate = tenant_rate if tenant_rate is not None else settings.ADMISSION_TENANT_RATE
+        self.tenant_burst = tenant_burst or settings.ADMISSION_TENANT_BURST
+        type_rates = type_rates if type_rates is not None else parse_limits(settings.ADMISSION_TYPE_RATES)
+        self.tenant_weights = tenant_weights if tenant_weights is not None else parse_limits(settings.ADMISSION_TENANT_WEIGHTS)
+        if any(weight <= 0 for weight in self.tenant_weights.values()):
+            raise ValueError("Tenant weights must be positive")
+        self.max_queue_seconds = max_queue_seconds if max_queue_seconds is not None else settings.ADMISSION_MAX_QUEUE_SECONDS
+        self.max_queued = max_queued or settings.ADMISSION_MAX_QUEUED
+        self._clock = clock
+        self._tenants: Dict[str, _Tenant] = {}
+        self._type_buckets = {name: TokenBucket(rate, 2 * rate, clock) for name, rate in type_rates.items() if rate > 0}
+        self._type_active: Dict[str, int] = {}
+        self._active = 0
+        self._queued = 0
+        self._virtual_time = 0.0
+        self._average_seconds = 0.0
+        self._counters = {"admitted": 0, "queued": 0, "rate_limited": 0, "shed": 0}
+
+    @asynccontextmanager
+    async def admit(self, tenant: str, generation_type: str, charge: bool = True) -> AsyncIterator[None]:
+        """Hold a concurrency slot for the duration of the block."""
+        await self.acquire(tenant, generation_type, charge)
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self.release(tenant, generation_type, self._clock() - started)
+
+    def check_rate(self, tenant: str, generation_type: str, cost: float = 1.0) -> None:
+        """Charge the token buckets of a request; raises `TooManyRequestsError` when exhausted."""
+        if self.enabled:
+            self._charge(tenant, {generation_type: cost})
+
+    def check_batch_rate(self, tenant: str, generation_types: Sequence[str]) -> None:
+        """Charge one token per item of a batch against the tenant and each item's generation type.
+
+        All items are charged or none. A batch larger than a bucket's burst could never
+        be admitted, so it is rejected with 400 instead of 429.
+        """
+        if self.enabled:
+            self._charge(tenant, dict(Counter(generation_types)))
+
+    async def acquire(self, tenant: str, generation_type: str, charge: bool = True) -> None:
+        """Charge the rate limits and wait for a concurrency slot; the tokens are refunded if the request is shed.
+
+        With `charge=False` only a slot is acquired, for requests whose rate was charged by `check_batch_rate`.
+        """
+        if not self.enabled:
+            return
+        charges = self._charge(tenant, {generation_type: 1.0}) if charge else []
+        try:
+            await self._acquire_slot(tenant, generation_type)
+        except ServiceUnavailableError:
+            self._refund(charges)
+            raise
+
+    async def _acquire_slot(self, tenant: str, generation_type: str) -> None:
+        state = self._tenant(tenant)
+        if not self._queued and self._can_run(state, generation_type):
+            self._start(state, generation_type)
+            return
+
+        estimate = self._estimated_wait()
+        if self._queued >= self.max_queued or estimate > self.max_queue_seconds:
+            self._shed(estimate)
+
+        # Start-time fair queuing: each request advances its tenant's virtual clock by 1 / weight.
+        tag = max(self._virtual_time, state.last_tag) + 1.0 / state.weight
+        state.last_tag = tag
+        waiter = _Waiter(tenant, generation_type, tag, asyncio.get_running_loop().create_future())
+        state.waiters.append(waiter)
+        self._queued += 1
+        self._counters["queued"] += 1
+        # Slots may be free for this tenant even though other tenants' requests are queued.
+        self._dispatch()
+        if waiter.future.done():
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.max_queue_seconds)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was granted just as the wait ended; hand it back.
+                self.release(tenant, generation_type)
+            else:
+                waiter.future.cancel()
+                state.waiters.remove(waiter)
+                self._queued -= 1
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._shed(self._estimated_wait())
+
+    def _charge(self, tenant: str, costs: Dict[str, float]) -> List[Tuple[TokenBucket, float]]:
+        # Takes from the tenant bucket and the type buckets; a rejected request keeps no tokens.
+        buckets = [(self._tenant(tenant).bucket, sum(costs.values()))]
+        buckets.extend((self._type_buckets.get(generation_type), cost) for generation_type, cost in costs.items())
+        buckets = [(bucket, cost) for bucket, cost in buckets if bucket is not None]
+        for bucket, cost in buckets:
+            if cost > bucket.burst:
+                raise ValidationError(f"{cost:g} requests exceed the rate limit burst of {bucket.burst:g}")
+        charges: List[Tuple[TokenBucket, float]] = []
+        for bucket, cost in buckets:
+            wait = bucket.take(cost)
+            if wait:
+                self._refund(charges)
+                self._counters["rate_limited"] += 1
+                raise TooManyRequestsError(
+                    f"Rate limit exceeded for tenant {tenant} and generation type {', '.join(map(str, costs))}",
+                    retry_after=math.ceil(wait),
+                )
+            charges.append((bucket, cost))
+        return charges
+
+    @staticmethod
+    def _refund(charges: List[Tuple[TokenBucket, float]]) -> None:
+        for bucket, cost in charges:
+            bucket.refund(cost)
+
+    def release(self, tenant: str, generation_type: str, held_seconds: Optional[float] = None) -> None:
+        """Return a concurrency slot and hand it to the next waiting request."""
+        if not self.enabled:
+            return
+        state = self._tenants[tenant]
+        state.active -= 1
+        self._type_active[generation_type] -= 1
+        self._active -= 1
+        if held_seconds is not None:
+            self._average_seconds = 0.9 * self._average_seconds + 0.1 * held_seconds
+        self._dispatch()
+        if len(self._tenants) > MAX_IDLE_TENANTS:
+            self._prune()
+
+    def stats(self) -> Dict[str, int]:
+        return {"active": self._active, "waiting": self._queued, "tenants": len(self._tenants), **self._counters}
+
+    def _tenant(self, tenant: str) -> _Tenant:
+        state = self._tenants.get(tenant)
+        if state is None:
+            bucket = TokenBucket(self.tenant_rate, self.tenant_burst, self._clock) if self.tenant_rate > 0 else None
+            state = self._tenants[tenant] = _Tenant(weight=self.tenant_weights.get(tenant, 1.0), bucket=bucket)
+        return state
+
+    def _can_run(self, state: _Tenant, generation_type: str) -> bool:
+        type_limit = self.type_concurrency.get(generation_type)
+        return (
+            self._active < self.max_concurrency
+            and state.active < self.tenant_concurrency
+            and (type_limit is None or self._type_active.get(generation_type, 0) < type_limit)
+        )
+
+    def _start(self, state: _Tenant, generation_type: str) -> None:
+        state.active += 1
+        self._type_active[generation_type] = self._type_active.get(generation_type, 0) + 1
+        self._active += 1
+        self._counters["admitted"] += 1
+
+    def _dispatch(self) -> None:
+        # Grant free slots to the eligible queue heads with the smallest virtual start tags.
+        while self._queued and self._active < self.max_concurrency:
+            best: Optional[_Tenant] = None
+            for state in self._tenants.values():
+                if state.waiters and self._can_run(state, state.waiters[0].generation_type):
+                    if best is None or state.waiters[0].tag < best.waiters[0].tag:
+                        best = state
+            if best is None:
+                return
+            waiter = best.waiters.popleft()
+            self._queued -= 1
+            self._virtual_time = max(self._virtual_time, waiter.tag - 1.0 / best.weight)
+            self._start(best, waiter.generation_type)
+            waiter.future.set_result(None)
+
+    def _estimated_wait(self) -> float:
+        return (self._queued + 1) * self._average_seconds / self.max_concurrency
+
+    def _shed(self, estimate: float) -> None:
+        self._counters["shed"] += 1
+        raise ServiceUnavailableError(
+            "Service is overloaded, retry later", retry_after=max(1, math.ceil(estimate))
+        )
+
+    def _prune(self) -> None:
+        for name in [
+            name for name, state in self._tenants.items()
+            if not state.active and not state.waiters and (state.bucket is None or state.bucket.full)
+        ]:
+            del self._tenants[name]
@@ -0,0 +1,287 @@
+import asyncio
+import random
+import time
+from collections import Counter, deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional
+
+import httpx
+
+from app.common.deadline import TIMEOUT_HEADER, check_deadline, current_deadline, no_deadline, remaining_seconds
+from app.core.config import parse_limits, settings
+from app.core.exceptions import BackendError, BackendTimeoutError, GenerationError
+from app.services.batching import MicroBatcher
+
+COMPLETIONS_PATH = "/v1/completions"
+BATCH_COMPLETIONS_PATH = "/v1/completions/batch"
+DEFAULT_BACKEND = "default"
+# Recent call latencies the hedging delay is derived from, and how often it is recomputed.
+LATENCY_WINDOW = 512
+HEDGE_REFRESH = 16
+
+
+class _RetryableError(Exception):
+    def __init__(self, detail: str, retry_after: Optional[float] = None, timeout: bool = False):
+        super().__init__(detail)
+        self.retry_after = retry_after
+        self.timeout = timeout
+
+
+def parse_backends(value: str) -> Dict[str, str]:
+    """Parse `name=url` pairs separated by commas, e.g. `"default=http://llm:8000"`."""
+    backends = {}
+    for item in value.split(","):
+        if item.strip():
+            name, _, url = item.partition("=")
+            backends[name.strip()] = url.strip()
+    return backends
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+class BackendClient:
+    """Async client of one generation backend, shared by all requests.
+
+    Calls reuse keep-alive connections from a pool of `max_connections`, and at most
+    `max_concurrency` calls are in flight. Failed calls (connection errors, timeouts,
+    429 and 5xx responses) are retried with jittered exponential backoff. With hedging
+    enabled, a call still unanswered after the `hedge_percentile` latency of recent
+    calls is sent a second time and the first response to arrive is used. Within a
+    request deadline, calls and retries stop when it passes and the time left is sent
+    to the backend in `X-Request-Timeout`. With batching
+    enabled, concurrent completions with equal parameters are collected for up to
+    `batch_max_wait` seconds or `batch_max_items` prompts and sent as one batched call.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        name: str = DEFAULT_BACKEND,
+        api_key: Optional[str] = None,
+        max_connections: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+        hedge: Optional[bool] = None,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: Optional[int] = None,
+        batch: Optional[bool] = None,
+        batch_max_items: Optional[int] = None,
+        batch_max_wait: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.name = name
+        self.max_connections = max_connections or settings.BACKEND_MAX_CONNECTIONS
+        self.timeout = timeout or settings.BACKEND_TIMEOUT_SECONDS
+        self.retries = retries if retries is not None else settings.BACKEND_RETRIES
+        self.backoff = backoff if backoff is not None else settings.BACKEND_BACKOFF_SECONDS
+        self.backoff_max = backoff_max if backoff_max is not None else settings.BACKEND_BACKOFF_MAX_SECONDS
+        self.hedge = settings.BACKEND_HEDGE_ENABLED if hedge is None else hedge
+        self.hedge_percentile = hedge_percentile or settings.BACKEND_HEDGE_PERCENTILE
+        self.hedge_min_samples = hedge_min_samples or settings.BACKEND_HEDGE_MIN_SAMPLES
+        api_key = api_key if api_key is not None else settings.BACKEND_API_KEY
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Authorization": f"Bearer {api_key}"} if api_key else None,
+            limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+            timeout=httpx.Timeout(self.timeout),
+            transport=transport,
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency or self.max_connections)
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._recorded = 0
+        self._hedge_delay: Optional[float] = None
+        self._counters: Counter = Counter()
+        self._batcher: Optional[MicroBatcher] = None
+        if settings.BACKEND_BATCH_ENABLED if batch is None else batch:
+            self._batcher = MicroBatcher(
+                self._complete_shared,
+                batch_max_items or settings.BACKEND_BATCH_MAX_ITEMS,
+                batch_max_wait if batch_max_wait is not None else settings.BACKEND_BATCH_MAX_WAIT_MS / 1000,
+            )
+
+    async def complete(self, prompt: str, **parameters: Any) -> str:
+        """Return the backend's completion of `prompt`, batched with concurrent calls if enabled."""
+        if self._batcher is not None:
+            return await self._batcher.submit(prompt, parameters)
+        data = await self.post_json(COMPLETIONS_PATH, {"prompt": prompt, **parameters})
+        return data["text"]
+
+    async def complete_many(self, prompts: List[str], **parameters: Any) -> List[str]:
+        """Return the completions of `prompts` from one batched call."""
+        return await self._complete_batch(prompts, parameters)
+
+    async def post_json(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a JSON payload and return the decoded response, retrying transient failures."""
+        for attempt in range(self.retries + 1):
+            check_deadline()
+            try:
+                return await self._hedged(path, payload)
+            except _RetryableError as e:
+                if attempt == self.retries:
+                    self._counters["failures"] += 1
+                    message = f"Backend {self.name} failed after {attempt + 1} attempts: {e}"
+                    raise (BackendTimeoutError if e.timeout else BackendError)(message) from e
+                self._counters["retries"] += 1
+                await asyncio.sleep(remaining_seconds(self._backoff_delay(attempt, e.retry_after)))
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a call is hedged, or None while hedging is off or warming up."""
+        if not self.hedge or len(self._latencies) < self.hedge_min_samples:
+            return None
+        if self._hedge_delay is None:
+            ordered = sorted(self._latencies)
+            index = min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile / 100))
+            self._hedge_delay = ordered[index]
+        return self._hedge_delay
+
+    def stats(self) -> Dict[str, int]:
+        stats = {
+            "calls": self._counters["calls"],
+            "retries": self._counters["retries"],
+            "failures": self._counters["failures"],
+            "hedged": self._counters["hedged"],
+            "hedge_wins": self._counters["hedge_wins"],
+        }
+        if self._batcher is not None:
+            stats.update(self._batcher.stats())
+        return stats
+
+    async def close(self) -> None:
+        if self._batcher is not None:
+            await self._batcher.close()
+        await self._client.aclose()
+
+    async def _complete_shared(self, prompts: List[str], parameters: Dict[str, Any]) -> List[str]:
+        # A batch serves requests with different deadlines: each caller stops waiting at its
+        # own, and the batcher cancels the batch once all of them have.
+        with no_deadline():
+            return await self._complete_batch(prompts, parameters)
+
+    async def _complete_batch(self, prompts: List[str], parameters: Dict[str, Any]) -> List[str]:
+        if len(prompts) == 1:
+            data = await self.post_json(COMPLETIONS_PATH, {"prompt": prompts[0], **parameters})
+            return [data["text"]]
+        data = await self.post_json(BATCH_COMPLETIONS_PATH, {"prompts": prompts, **parameters})
+        texts = data.get("texts")
+        if not isinstance(texts, list) or len(texts) != len(prompts):
+            raise BackendError(f"Backend {self.name} returned {len(texts or ())} completions for {len(prompts)} prompts")
+        return texts
+
+    async def _hedged(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._send(path, payload)
+
+        primary = asyncio.ensure_future(self._send(path, payload))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            # Hedges only use spare capacity, so they cannot amplify an overload.
+            if not done and not self._semaphore.locked():
+                self._counters["hedged"] += 1
+                tasks.add(asyncio.ensure_future(self._send(path, payload)))
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._counters["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _send(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        async with self._semaphore:
+            self._counters["calls"] += 1
+            timeout = remaining_seconds(self.timeout)
+            headers = {TIMEOUT_HEADER: f"{timeout:.3f}"} if current_deadline() is not None else None
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(self._client.post(path, json=payload, headers=headers), timeout)
+            except asyncio.TimeoutError as e:
+                raise _RetryableError(f"no response within {timeout:.3f}s", timeout=True) from e
+            except httpx.TimeoutException as e:
+                raise _RetryableError(f"{type(e).__name__}", timeout=True) from e
+            except httpx.TransportError as e:
+                raise _RetryableError(f"{type(e).__name__}: {e}") from e
+        if response.status_code == 429 or response.status_code >= 500:
+            raise _RetryableError(f"status {response.status_code}", retry_after=_retry_after(response))
+        if response.status_code >= 400:
+            raise BackendError(f"Backend {self.name} rejected the call with status {response.status_code}: {response.text[:200]}")
+        self._record(time.perf_counter() - started)
+        return response.json()
+
+    def _record(self, seconds: float) -> None:
+        self._latencies.append(seconds)
+        self._recorded += 1
+        if self._recorded % HEDGE_REFRESH == 0:
+            self._hedge_delay = None
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        # Full jitter spreads the retries of concurrent callers over the whole backoff window.
+        delay = random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+        return max(delay, min(retry_after, self.backoff_max)) if retry_after else delay
+
+
+class BackendPool:
+    """Application-scoped set of backend clients, one per backend configured in `BACKEND_URLS`.
+
+    Connection pools are sized per backend by `BACKEND_CONNECTION_LIMITS` (e.g.
+    `default=64,summarizer=8`), falling back to `BACKEND_MAX_CONNECTIONS`.
+    """
+
+    def __init__(
+        self,
+        urls: Optional[Dict[str, str]] = None,
+        connection_limits: Optional[Dict[str, float]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self._urls = urls if urls is not None else parse_backends(settings.BACKEND_URLS)
+        self._connection_limits = (
+            connection_limits if connection_limits is not None else parse_limits(settings.BACKEND_CONNECTION_LIMITS)
+        )
+        self._transport = transport
+        self._clients: Dict[str, BackendClient] = {}
+
+    def configured(self, name: str = DEFAULT_BACKEND) -> bool:
+        """Whether a backend of this name is configured."""
+        return name in self._urls
+
+    def get(self, name: str = DEFAULT_BACKEND) -> BackendClient:
+        """Return the shared client of a backend, creating it on first use."""
+        client = self._clients.get(name)
+        if client is not None:
+            return client
+        if name not in self._urls:
+            raise GenerationError(f"No backend configured with name {name}")
+        limit = self._connection_limits.get(name)
+        client = self._clients[name] = BackendClient(
+            self._urls[name], name=name, max_connections=int(limit) if limit else None, transport=self._transport
+        )
+        return client
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: client.stats() for name, client in self._clients.items()}
+
+    async def close(self) -> None:
+        """Close the connection pools of all clients."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        await asyncio.gather(*(client.close() for client in clients))
+
+
+@lru_cache()
+def get_backend_pool() -> BackendPool:
+    return BackendPool()
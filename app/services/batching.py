@@ -0,0 +1,100 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+# Sends the items of one batch, all with the same parameters, and returns one result per item.
+BatchSender = Callable[[List[Any], Dict[str, Any]], Awaitable[List[Any]]]
+
+
+class _Batch:
+    def __init__(self, parameters: Dict[str, Any]):
+        self.parameters = parameters
+        self.entries: List[Tuple[Any, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class MicroBatcher:
+    """Collects concurrent calls into batches dispatched with one `send`.
+
+    Calls with equal parameters join the open batch for those parameters, which is sent
+    when it holds `max_items` calls or `max_wait` seconds after its first call. Results
+    are handed back to the callers in order. A caller cancelled before dispatch is left
+    out of its batch; a dispatched batch is cancelled once all of its callers are.
+    """
+
+    def __init__(self, send: BatchSender, max_items: int, max_wait: float):
+        self.max_items = max(1, max_items)
+        self.max_wait = max_wait
+        self._send = send
+        self._open: Dict[str, _Batch] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.batched = 0
+        self.abandoned = 0
+
+    async def submit(self, item: Any, parameters: Dict[str, Any]) -> Any:
+        """Add `item` to the open batch for `parameters` and wait for its result."""
+        loop = asyncio.get_running_loop()
+        key = json.dumps(parameters, sort_keys=True, default=str)
+        batch = self._open.get(key)
+        if batch is None:
+            batch = self._open[key] = _Batch(parameters)
+            batch.timer = loop.call_later(self.max_wait, self._dispatch, key)
+        future = loop.create_future()
+        batch.entries.append((item, future))
+        if len(batch.entries) >= self.max_items:
+            self._dispatch(key)
+        return await future
+
+    def stats(self) -> Dict[str, int]:
+        return {"batches": self.batches, "batched": self.batched, "abandoned": self.abandoned, "in_flight": len(self._tasks)}
+
+    async def close(self) -> None:
+        """Cancel open and in-flight batches."""
+        for key in list(self._open):
+            batch = self._open.pop(key)
+            batch.timer.cancel()
+            for _, future in batch.entries:
+                future.cancel()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _dispatch(self, key: str) -> None:
+        batch = self._open.pop(key, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+        entries = [(item, future) for item, future in batch.entries if not future.done()]
+        self.abandoned += len(batch.entries) - len(entries)
+        if not entries:
+            return
+        self.batches += 1
+        self.batched += len(entries)
+        task = asyncio.ensure_future(self._run(batch.parameters, entries))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        futures = [future for _, future in entries]
+        for future in futures:
+            future.add_done_callback(lambda _: self._abandon(task, futures))
+
+    def _abandon(self, task: asyncio.Task, futures: List[asyncio.Future]) -> None:
+        if all(future.cancelled() for future in futures):
+            task.cancel()
+
+    async def _run(self, parameters: Dict[str, Any], entries: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = await self._send([item for item, _ in entries], parameters)
+        except asyncio.CancelledError:
+            for _, future in entries:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in entries:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(entries, results):
+            if not future.done():
+                future.set_result(result)
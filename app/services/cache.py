@@ -0,0 +1,317 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from app.api.v1.routes.generation.schemas import GenerationRequest, GenerationResponse
+from app.common.sqlite import connect, transaction
+from app.core.config import settings
+from app.core.exceptions import ClientDisconnectedError, DeadlineExceededError
+
+
+def canonical_request_key(request: GenerationRequest) -> str:
+    """Build a cache key from the fields that determine a generation result.
+
+    Dict keys are sorted at every nesting level, so requests that differ only in
+    key order share the same key.
+    """
+    payload = {
+        "generation_type": request.generation_type.value,
+        "output_type": request.output_type.value,
+        "search_type": request.search_type.value,
+        "parameters": request.parameters,
+        "output_schema": request.output_schema,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class _CacheEntry:
+    response: GenerationResponse
+    size: int
+    expires_at: float
+
+
+class ResponseCache:
+    """LRU + TTL cache of generation responses with single-flight deduplication.
+
+    Cached responses are shared between callers and must be treated as immutable.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[GenerationResponse]:
+        """Return a cached response, counting the lookup as a hit or miss."""
+        response = self._lookup(key)
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+    def put(self, key: str, response: GenerationResponse) -> None:
+        """Store a response, evicting least recently used entries to respect the bounds."""
+        size = len(response.json_bytes())
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        self._remove(key)
+        self._entries[key] = _CacheEntry(response=response, size=size, expires_at=self._clock() + self.ttl_seconds)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[GenerationResponse]]
+    ) -> GenerationResponse:
+        """Return the cached response for `key`, computing it at most once across concurrent callers."""
+        while True:
+            response = await self._fetch(key)
+            if response is not None:
+                self.hits += 1
+                return response
+
+            future = self._in_flight.get(key)
+            if future is None:
+                break
+
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leading caller was cancelled; let one of the waiters take over.
+                if future.cancelled():
+                    continue
+                raise
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            response = await compute()
+        except (asyncio.CancelledError, DeadlineExceededError, ClientDisconnectedError):
+            # The leading caller gave up; waiters with time left take over.
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved; waiters (if any) re-raise it themselves.
+            future.exception()
+            raise
+        else:
+            future.set_result(response)
+            await self._store(key, response)
+            return response
+        finally:
+            self._in_flight.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return cache counters and current occupancy."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "coalesced": self.coalesced,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "in_flight": len(self._in_flight),
+        }
+
+    async def _fetch(self, key: str) -> Optional[GenerationResponse]:
+        # Lookup and store as seen from the event loop; the in-memory cache answers inline.
+        return self._lookup(key)
+
+    async def _store(self, key: str, response: GenerationResponse) -> None:
+        self.put(key, response)
+
+    def _lookup(self, key: str) -> Optional[GenerationResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= self._clock():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry.response
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+
+# Eviction frees entries and bytes down to this fraction of the bounds, so it runs once per many writes.
+_LOW_WATERMARK = 0.9
+# A hit rewrites its entry's access time only when it is older than this, so reads rarely write.
+_TOUCH_SECONDS = 60.0
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS responses ("
+    " key TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL,"
+    " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)",
+    "CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), entries INTEGER NOT NULL, bytes INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO totals VALUES (0, 0, 0)",
+    "CREATE TRIGGER IF NOT EXISTS responses_added AFTER INSERT ON responses"
+    " BEGIN UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.size; END",
+    "CREATE TRIGGER IF NOT EXISTS responses_removed AFTER DELETE ON responses"
+    " BEGIN UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size; END",
+)
+
+
+class SharedResponseCache(ResponseCache):
+    """Response cache stored in a local SQLite database shared by all worker processes.
+
+    Entries hold the serialized response, so a hit costs one indexed read and the
+    bytes are served without re-encoding. Bounds and TTL apply across processes
+    (the clock must be shared too, hence wall-clock time); single-flight
+    deduplication and the hit/miss counters stay per process. SQLite is only
+    called from worker threads when used through `get_or_compute`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int,
+        max_bytes: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.time,
+        touch_seconds: float = _TOUCH_SECONDS,
+    ):
+        super().__init__(max_entries, max_bytes, ttl_seconds, clock)
+        self.path = path
+        self.touch_seconds = touch_seconds
+        self._lock = threading.RLock()
+        self._db = connect(path)
+        with transaction(self._db, self._lock):
+            for statement in _SCHEMA:
+                self._db.execute(statement)
+
+    def __len__(self) -> int:
+        return self._totals()[0]
+
+    def put(self, key: str, response: GenerationResponse) -> None:
+        body = response.json_bytes()
+        if len(body) > self.max_bytes or self.max_entries <= 0:
+            return
+        now = self._clock()
+        with transaction(self._db, self._lock):
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.execute(
+                "INSERT INTO responses VALUES (?, ?, ?, ?, ?)", (key, body, len(body), now + self.ttl_seconds, now)
+            )
+            self._evict(now, key)
+
+    def clear(self) -> None:
+        with transaction(self._db, self._lock):
+            self._db.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, int]:
+        entries, size = self._totals()
+        return {**super().stats(), "entries": entries, "bytes": size}
+
+    def close(self) -> None:
+        self._db.close()
+
+    async def _fetch(self, key: str) -> Optional[GenerationResponse]:
+        return await asyncio.to_thread(self._lookup, key)
+
+    async def _store(self, key: str, response: GenerationResponse) -> None:
+        await asyncio.to_thread(self.put, key, response)
+
+    def _lookup(self, key: str) -> Optional[GenerationResponse]:
+        now = self._clock()
+        with self._lock:
+            row = self._db.execute("SELECT body, expires_at, accessed_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        body, expires_at, accessed_at = row
+        if expires_at <= now:
+            self._remove(key)
+            self.expirations += 1
+            return None
+        if accessed_at < now - self.touch_seconds:
+            with transaction(self._db, self._lock):
+                self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return GenerationResponse.from_json_bytes(body)
+
+    def _remove(self, key: str) -> None:
+        with transaction(self._db, self._lock):
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def _evict(self, now: float, written: str) -> None:
+        # Runs inside the transaction of a write; never evicts the entry just written.
+        entries, size = self._totals()
+        if entries <= self.max_entries and size <= self.max_bytes:
+            return
+        self.expirations += self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,)).rowcount
+        entries, size = self._totals()
+        max_entries = int(self.max_entries * _LOW_WATERMARK)
+        max_bytes = int(self.max_bytes * _LOW_WATERMARK)
+        victims = []
+        # The cursor walks the accessed_at index lazily, reading only the rows it evicts.
+        rows = self._db.execute("SELECT key, size FROM responses WHERE key != ? ORDER BY accessed_at", (written,))
+        for key, entry_size in rows:
+            if entries <= max_entries and size <= max_bytes:
+                break
+            victims.append((key,))
+            entries -= 1
+            size -= entry_size
+        rows.close()
+        self._db.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    def _totals(self) -> Tuple[int, int]:
+        with self._lock:
+            return self._db.execute("SELECT entries, bytes FROM totals").fetchone()
+
+
+@lru_cache()
+def get_response_cache() -> ResponseCache:
+    if settings.CACHE_SHARED_PATH:
+        return SharedResponseCache(
+            settings.CACHE_SHARED_PATH,
+            max_entries=settings.CACHE_MAX_ENTRIES,
+            max_bytes=settings.CACHE_MAX_BYTES,
+            ttl_seconds=settings.CACHE_TTL_SECONDS,
+        )
+    return ResponseCache(
+        max_entries=settings.CACHE_MAX_ENTRIES,
+        max_bytes=settings.CACHE_MAX_BYTES,
+        ttl_seconds=settings.CACHE_TTL_SECONDS,
+    )
@@ -0,0 +1,196 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Hashable, List, Optional, Tuple
+
+from app.common.fingerprint import MinHashLSH, sketch, word_shingles
+from app.core.config import settings
+
+# Results kept per document, e.g. claims for a few `max_claims`/`min_score` combinations.
+MAX_RESULTS_PER_DOCUMENT = 8
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+@dataclass
+class Reuse:
+    """Where a reused result came from; reported in response metadata.
+
+    `novel` lists the (offset, text) regions of the new document that do not occur in
+    the near-duplicate, so their results have to be computed afresh.
+    """
+    document: str
+    similarity: float
+    exact: bool
+    novel: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def novel_chars(self) -> int:
+        return sum(len(text) for _, text in self.novel)
+
+    def to_metadata(self) -> Dict[str, Any]:
+        return {
+            "document": self.document[:16],
+            "similarity": round(self.similarity, 4),
+            "exact": self.exact,
+            "novel_chars": self.novel_chars,
+        }
+
+
+class DocumentKey:
+    """Identity of a document's content: its hash, and a shingle sketch computed on first use."""
+
+    def __init__(self, content: str, shingle_size: int, sketch_size: int):
+        self.digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        self.content = content
+        self._shingle_size = shingle_size
+        self._sketch_size = sketch_size
+        self._sketch: Optional[FrozenSet[str]] = None
+
+    @property
+    def sketch(self) -> FrozenSet[str]:
+        if self._sketch is None:
+            self._sketch = sketch(word_shingles(self.content, self._shingle_size), self._sketch_size)
+        return self._sketch
+
+
+@dataclass
+class _Document:
+    content: str
+    results: "OrderedDict[Hashable, Any]" = field(default_factory=OrderedDict)
+
+
+class DocumentCache:
+    """LRU cache of per-document analysis results (spans, embeddings, claims).
+
+    Results are stored per content hash and looked up first by exact hash, then among
+    near-duplicates: documents whose word-shingle sketches have a Jaccard similarity
+    of at least `threshold`, found with MinHash LSH. Near-duplicate results describe
+    the other document, so callers must re-anchor offsets before using them and
+    analyse the `novel` regions of the new document themselves.
+    """
+
+    def __init__(
+        self,
+        max_documents: int,
+        threshold: float = 0.9,
+        shingle_size: int = 3,
+        sketch_size: int = 256,
+    ):
+        self.max_documents = max_documents
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.sketch_size = sketch_size
+        self._lock = threading.Lock()
+        self._documents: "OrderedDict[str, _Document]" = OrderedDict()
+        self._lsh: MinHashLSH[str] = MinHashLSH(threshold)
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def key(self, content: str) -> DocumentKey:
+        return DocumentKey(content, self.shingle_size, self.sketch_size)
+
+    def lookup(self, content: str, name: Hashable) -> Tuple[DocumentKey, Optional[Tuple[Any, Reuse]]]:
+        """Key a document and look up its result `name`; CPU bound for large documents."""
+        key = self.key(content)
+        return key, self.get(key, name)
+
+    def get(self, key: DocumentKey, name: Hashable) -> Optional[Tuple[Any, Reuse]]:
+        """Return a result stored under `name` for this document or a near-duplicate, with its origin."""
+        with self._lock:
+            document = self._documents.get(key.digest)
+            if document is not None and name in document.results:
+                self._documents.move_to_end(key.digest)
+                self.exact_hits += 1
+                return document.results[name], Reuse(key.digest, 1.0, exact=True)
+        # Sketching large documents is CPU bound; keep it outside the lock.
+        shingles = key.sketch
+        with self._lock:
+            for digest, similarity in self._lsh.query(shingles) if shingles else ():
+                document = self._documents.get(digest)
+                if digest != key.digest and document is not None and name in document.results:
+                    self._documents.move_to_end(digest)
+                    self.near_hits += 1
+                    result, original = document.results[name], document.content
+                    break
+            else:
+                self.misses += 1
+                return None
+        return result, Reuse(digest, similarity, exact=False, novel=novel_regions(original, key.content))
+
+    def put(self, key: DocumentKey, name: Hashable, result: Any) -> None:
+        """Store a result computed for the document of `key`."""
+        shingles = key.sketch
+        with self._lock:
+            document = self._documents.get(key.digest)
+            if document is None:
+                document = self._documents[key.digest] = _Document(key.content)
+                self._lsh.add(key.digest, shingles)
+            self._documents.move_to_end(key.digest)
+            document.results[name] = result
+            document.results.move_to_end(name)
+            while len(document.results) > MAX_RESULTS_PER_DOCUMENT:
+                document.results.popitem(last=False)
+            while len(self._documents) > self.max_documents:
+                digest, _ = self._documents.popitem(last=False)
+                self._lsh.remove(digest)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "exact_hits": self.exact_hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "documents": len(self._documents),
+        }
+
+
+def relocate(content: str, text: str, start: int) -> int:
+    """Find `text` in `content`, preferring the occurrence at or after `start`; -1 if absent."""
+    position = content.find(text, max(0, min(start, len(content)) - len(text)))
+    return position if position >= 0 else content.find(text)
+
+
+def novel_regions(original: str, content: str) -> List[Tuple[int, str]]:
+    """Return the (offset, text) regions of `content` whose paragraphs do not occur in `original`.
+
+    Paragraphs are compared with normalised whitespace; consecutive new or changed
+    paragraphs form one region.
+    """
+    original_keys = [" ".join(text.split()) for _, _, text in _paragraphs(original)]
+    paragraphs = _paragraphs(content)
+    matcher = SequenceMatcher(None, original_keys, [" ".join(text.split()) for _, _, text in paragraphs], autojunk=False)
+    regions = []
+    for tag, _, _, first, last in matcher.get_opcodes():
+        if tag in ("replace", "insert"):
+            start, end = paragraphs[first][0], paragraphs[last - 1][1]
+            regions.append((start, content[start:end]))
+    return regions
+
+
+def _paragraphs(text: str) -> List[Tuple[int, int, str]]:
+    paragraphs = []
+    start = 0
+    for separator in _PARAGRAPH_BREAK.finditer(text):
+        if text[start:separator.start()].strip():
+            paragraphs.append((start, separator.start(), text[start:separator.start()]))
+        start = separator.end()
+    if text[start:].strip():
+        paragraphs.append((start, len(text), text[start:]))
+    return paragraphs
+
+
+@lru_cache()
+def get_document_cache() -> DocumentCache:
+    return DocumentCache(
+        max_documents=settings.DEDUP_MAX_DOCUMENTS,
+        threshold=settings.DEDUP_THRESHOLD,
+        shingle_size=settings.DEDUP_SHINGLE_SIZE,
+        sketch_size=settings.DEDUP_SKETCH_SIZE,
+    )
@@ -1,29 +1,261 @@
-from typing import Dict, Type
+import asyncio
+from contextlib import aclosing
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 
-from app.api.v1.routes.generation.schemas import GenerationRequest, GenerationResponse, GenerationType
-from app.core.exceptions import ValidationError
+from fastapi import HTTPException
+from pydantic import ValidationError as PydanticValidationError
+
+from app.api.v1.routes.generation.schemas import (
+    BatchItemError,
+    BatchItemResult,
+    GenerationRequest,
+    GenerationResponse,
+    GenerationStreamEvent,
+    OutputType,
+    StreamEventType,
+)
+from app.core.config import settings
+from app.common.deadline import Deadline, deadline_scope
+from app.common.metrics import track_request
+from app.common.schema import OutputValidationError, StreamingValidator, validate_json_output
+from app.core.exceptions import DeadlineExceededError, GenerationError
+from app.services.cache import ResponseCache, canonical_request_key
+from app.services.store import ResultStore
 from app.strategies.base import GenerationStrategy
-from app.strategies.claim_discovery import ClaimDiscoveryStrategy
-from app.strategies.default import DefaultStrategy
-from app.strategies.evidence_discovery import EvidenceDiscoveryStrategy
+from app.strategies.registry import StrategyRegistry
+
+
+RESULT_NAMESPACE = "response"
+
+# Wraps the generation of a batch item, e.g. to hold an admission slot of its generation type.
+ItemAdmission = Callable[[GenerationRequest], AsyncContextManager[None]]
 
 
 class GenerationService:
-    """Service for handling content generation requests."""
+    """Service for handling content generation requests.
+
+    With a result store, responses are persisted per request, strategy version and
+    corpus revision, and looked up before the strategy runs, so they survive restarts.
+    """
 
-    def __init__(self):
-        self._strategies: Dict[str, Type[GenerationStrategy]] = {GenerationType.CLAIM_DISCOVERY: ClaimDiscoveryStrategy,
-                                                                 GenerationType.EVIDENCE_DISCOVERY: EvidenceDiscoveryStrategy,
-                                                                 GenerationType.DEFAULT: DefaultStrategy, }
+    def __init__(
+        self,
+        registry: Optional[StrategyRegistry] = None,
+        cache: Optional[ResponseCache] = None,
+        store: Optional[ResultStore] = None,
+    ):
+        self._registry = registry or StrategyRegistry()
+        self._cache = cache
+        self._store = store
 
     def get_strategy(self, generation_type: str) -> GenerationStrategy:
         """Get the appropriate generation strategy."""
-        strategy_class = self._strategies.get(generation_type)
-        if not strategy_class:
-            raise ValidationError(f"No strategy found for generation type: {generation_type}")
-        return strategy_class()
+        return self._registry.get(generation_type)
+
+    async def generate_content(
+        self, request: GenerationRequest, use_cache: bool = True, deadline: Optional[Deadline] = None
+    ) -> GenerationResponse:
+        """Generate content using the appropriate strategy, serving repeated requests from the cache.
+
+        With a deadline, the work is cancelled when it passes (or the client goes away)
+        and the request fails with 504, or is answered with the partial result reported
+        by the strategy when the deadline allows it.
+        """
+        with track_request(request.generation_type, request.output_type, request.search_type):
+            if deadline is None:
+                return await self._cached(request, use_cache)
+            with deadline_scope(deadline.fork()) as deadline:
+                deadline.check()
+                try:
+                    async with deadline.timeout():
+                        return await self._cached(request, use_cache)
+                except (TimeoutError, DeadlineExceededError):
+                    partial = self._partial(request, deadline)
+                    if partial is None:
+                        raise deadline.error() from None
+                    return partial
+                except asyncio.CancelledError:
+                    # Abandoned by the caller: stop work running in threads at its next check.
+                    deadline.cancel()
+                    raise
+
+    async def _cached(self, request: GenerationRequest, use_cache: bool) -> GenerationResponse:
+        if self._cache is None or not use_cache:
+            return await self._generate(request, use_cache)
+        key = self._result_key(self.get_strategy(request.generation_type), request)
+        return await self._cache.get_or_compute(key, lambda: self._generate(request))
+
+    @staticmethod
+    def _result_key(strategy: GenerationStrategy, request: GenerationRequest) -> str:
+        """Key of a request's response; it changes with the corpus, so ingestion invalidates cached results."""
+        return f"{canonical_request_key(request)}:{strategy.search_service.revision}"
+
+    def _partial(self, request: GenerationRequest, deadline: Deadline) -> Optional[GenerationResponse]:
+        """The strategy's partial result, marked as such; never cached or stored."""
+        response = deadline.partial_result()
+        if response is None:
+            return None
+        try:
+            self.validate_output(request, response.content)
+        except GenerationError:
+            return None
+        return response.model_copy(update={"metadata": {**response.metadata, "partial": True}})
+
+    async def _generate(self, request: GenerationRequest, use_store: bool = True) -> GenerationResponse:
+        strategy = self.get_strategy(request.generation_type)
+        if self._store is None or not use_store:
+            return await self._run(strategy, request)
+        key = self._result_key(strategy, request)
+        # Reads and writes (which may compact the store) stay off the event loop.
+        body = await asyncio.to_thread(self._store.get, RESULT_NAMESPACE, strategy.fingerprint, key)
+        if body is not None:
+            return GenerationResponse.from_json_bytes(body)
+        response = await self._run(strategy, request)
+        await asyncio.to_thread(self._store.put, RESULT_NAMESPACE, strategy.fingerprint, key, response.json_bytes())
+        return response
 
-    async def generate_content(self, request: GenerationRequest) -> GenerationResponse:
-        """Generate content using the appropriate strategy."""
+    async def _run(self, strategy: GenerationStrategy, request: GenerationRequest) -> GenerationResponse:
+        response = await strategy.generate(request)
+        self.validate_output(request, response.content)
+        return response
+
+    @staticmethod
+    def validate_output(request: GenerationRequest, content: str) -> None:
+        """Validate JSON output against the request's output_schema."""
+        if request.output_type != OutputType.JSON:
+            return
+        errors = validate_json_output(content, request.output_schema)
+        if errors:
+            raise GenerationError(f"Generated content does not match output_schema: {'; '.join(errors[:10])}")
+
+    def stream_content(
+        self, request: GenerationRequest, deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[GenerationStreamEvent]:
+        """Stream generation events using the appropriate strategy.
+
+        The strategy is resolved and the request validated before the stream is returned,
+        so invalid requests fail with a regular error response instead of a broken stream.
+        A stream that outlives its deadline ends with an error event.
+        """
         strategy = self.get_strategy(request.generation_type)
-        return await strategy.generate(request)
+        strategy.validate_request(request)
+        return self._validated_stream(request, strategy.stream(request), deadline)
+
+    async def _validated_stream(
+        self,
+        request: GenerationRequest,
+        events: AsyncIterator[GenerationStreamEvent],
+        deadline: Optional[Deadline] = None,
+    ) -> AsyncIterator[GenerationStreamEvent]:
+        """Pass stream events through, validating JSON content as it arrives.
+
+        JSON output is parsed incrementally against the output_schema: the stream fails
+        (and the strategy's stream is closed) at the first chunk that violates it, and a
+        `field` event follows each chunk that completes a top-level field.
+        """
+        chunks: List[str] = []
+        validator = StreamingValidator(request.output_schema) if request.output_type == OutputType.JSON else None
+        with track_request(request.generation_type, request.output_type, request.search_type):
+            with deadline_scope(deadline.fork() if deadline is not None else None) as deadline:
+                if deadline is not None:
+                    deadline.check()
+                    events = self._bounded(events, deadline)
+                try:
+                    async with aclosing(events):
+                        async for event in events:
+                            if event.event == StreamEventType.CONTENT:
+                                chunks.append(event.data)
+                                fields = self._feed(validator, event.data) if validator is not None else []
+                                yield event
+                                for name, value in fields:
+                                    yield GenerationStreamEvent(event=StreamEventType.FIELD, data={"name": name, "value": value})
+                                continue
+                            if event.event == StreamEventType.METADATA:
+                                if validator is not None:
+                                    self._feed(validator, None)
+                                self.validate_output(request, "".join(chunks))
+                            yield event
+                except (asyncio.CancelledError, GeneratorExit):
+                    # The client went away mid-stream: stop work running in threads at its next check.
+                    if deadline is not None:
+                        deadline.cancel()
+                    raise
+
+    @staticmethod
+    async def _bounded(
+        events: AsyncIterator[GenerationStreamEvent], deadline: Deadline
+    ) -> AsyncIterator[GenerationStreamEvent]:
+        """Pass events through, failing when the next one is not ready before the deadline."""
+        async with aclosing(events):
+            while True:
+                try:
+                    async with deadline.timeout():
+                        event = await anext(events)
+                except StopAsyncIteration:
+                    return
+                except TimeoutError:
+                    raise deadline.error() from None
+                yield event
+
+    @staticmethod
+    def _feed(validator: StreamingValidator, chunk: Optional[str]) -> List[Tuple[str, Any]]:
+        """Feed a content chunk to the validator, or close it when `chunk` is None."""
+        try:
+            return validator.close() if chunk is None else validator.feed(chunk)
+        except OutputValidationError as e:
+            raise GenerationError(f"Generated content does not match output_schema: {str(e)}")
+
+    async def generate_batch(
+        self,
+        requests: List[Union[GenerationRequest, Dict[str, Any]]],
+        max_concurrency: Optional[int] = None,
+        use_cache: bool = True,
+        deadline: Optional[Deadline] = None,
+        admit: Optional[ItemAdmission] = None,
+    ) -> List[BatchItemResult]:
+        """Generate content for several requests concurrently, keeping results in input order.
+
+        All items share `deadline`; items not finished by then fail (or are partial) on their own.
+        Each item is generated inside `admit`, whose failures become the item's error.
+        """
+        limit = min(max_concurrency or settings.BATCH_MAX_CONCURRENCY, settings.BATCH_MAX_CONCURRENCY)
+        results: List[Optional[BatchItemResult]] = [None] * len(requests)
+        pending = iter(enumerate(requests))
+
+        async def worker() -> None:
+            # Workers pull from a shared iterator so at most `limit` items are in flight
+            # and no coroutine is created per item up front.
+            for index, request in pending:
+                results[index] = await self.generate_item(index, request, use_cache, deadline, admit)
+
+        await asyncio.gather(*(worker() for _ in range(min(limit, len(requests)))))
+        return results
+
+    async def generate_item(
+        self,
+        index: int,
+        request: Union[GenerationRequest, Dict[str, Any]],
+        use_cache: bool = True,
+        deadline: Optional[Deadline] = None,
+        admit: Optional[ItemAdmission] = None,
+    ) -> BatchItemResult:
+        """Generate a single batch item, capturing failures (including invalid raw items) as per-item errors."""
+        if isinstance(request, dict):
+            try:
+                request = GenerationRequest.model_validate(request)
+            except PydanticValidationError as e:
+                return BatchItemResult(index=index, error=BatchItemError(status_code=422, detail=str(e)))
+        try:
+            if admit is None:
+                response = await self.generate_content(request, use_cache, deadline)
+            else:
+                async with admit(request):
+                    response = await self.generate_content(request, use_cache, deadline)
+        except HTTPException as e:
+            return BatchItemResult(index=index, error=BatchItemError(status_code=e.status_code, detail=str(e.detail)))
+        except Exception as e:
+            return BatchItemResult(
+                index=index,
+                error=BatchItemError(status_code=500, detail=f"Failed to generate content: {str(e)}"),
+            )
+        return BatchItemResult(index=index, response=response)
@@ -0,0 +1,103 @@
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from app.api.v1.routes.ingestion.schemas import IngestionJob, IngestionStatus
+from app.common.chunking import TextChunk, chunk_file, chunk_text
+from app.core.config import settings
+from app.services.search import SearchService, get_search_service
+
+
+class IngestionService:
+    """Loads documents into the searchable corpus and tracks ingestion progress."""
+
+    def __init__(self, search_service: Optional[SearchService] = None, history_size: Optional[int] = None):
+        self.search_service = search_service or get_search_service()
+        self.history_size = history_size or settings.INGESTION_JOB_HISTORY
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._started: Dict[str, float] = {}
+
+    def create_job(self, file_id: str, bytes_total: int = 0) -> IngestionJob:
+        """Register a new ingestion job."""
+        job = IngestionJob(job_id=uuid.uuid4().hex, file_id=file_id, status=IngestionStatus.UPLOADING, bytes_total=bytes_total)
+        self._jobs[job.job_id] = job
+        self._started[job.job_id] = time.perf_counter()
+        while len(self._jobs) > self.history_size:
+            expired, _ = self._jobs.popitem(last=False)
+            self._started.pop(expired, None)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        job = self._jobs.get(job_id)
+        if job is not None and job.status in (IngestionStatus.UPLOADING, IngestionStatus.INDEXING):
+            self._update_timing(job)
+        return job
+
+    def jobs(self) -> List[IngestionJob]:
+        return [self.get_job(job_id) for job_id in list(self._jobs)]
+
+    def record_upload(self, job: IngestionJob, bytes_received: int) -> None:
+        """Record upload progress of a job."""
+        job.bytes_read = bytes_received
+        job.bytes_total = max(job.bytes_total, bytes_received)
+
+    def fail_job(self, job: IngestionJob, error: str) -> None:
+        """Mark a job as failed."""
+        job.status = IngestionStatus.FAILED
+        job.error = error
+        self._update_timing(job)
+
+    def ingest_file(self, file_id: str, path: str, job: Optional[IngestionJob] = None) -> IngestionJob:
+        """Stream a UTF-8 file from disk into the corpus, re-indexing only changed chunks.
+
+        This is CPU bound; call it from a worker thread when running inside the event loop.
+        """
+        job = job or self.create_job(file_id)
+        job.bytes_total = os.path.getsize(path)
+        job.bytes_read = 0
+
+        def on_progress(bytes_read: int) -> None:
+            job.bytes_read = bytes_read
+
+        chunks = chunk_file(
+            path, settings.INGESTION_CHUNK_MIN_CHARS, settings.INGESTION_CHUNK_MAX_CHARS, on_progress=on_progress
+        )
+        return self._index(job, chunks)
+
+    def ingest_text(self, file_id: str, text: str) -> IngestionJob:
+        """Ingest an in-memory document."""
+        job = self.create_job(file_id, len(text.encode("utf-8")))
+        job.bytes_read = job.bytes_total
+        chunks = chunk_text(text, settings.INGESTION_CHUNK_MIN_CHARS, settings.INGESTION_CHUNK_MAX_CHARS)
+        return self._index(job, chunks)
+
+    def remove_file(self, file_id: str) -> int:
+        """Remove a file from the corpus."""
+        return self.search_service.remove_file(file_id)
+
+    def _index(self, job: IngestionJob, chunks: Iterable[TextChunk]) -> IngestionJob:
+        job.status = IngestionStatus.INDEXING
+        try:
+            result = self.search_service.sync_file(job.file_id, self._count_chunks(job, chunks))
+        except Exception as e:
+            self.fail_job(job, str(e))
+            raise
+        job.chunks_added = result.added
+        job.chunks_unchanged = result.unchanged
+        job.chunks_removed = result.removed
+        job.status = IngestionStatus.COMPLETED
+        self._update_timing(job)
+        return job
+
+    @staticmethod
+    def _count_chunks(job: IngestionJob, chunks: Iterable[TextChunk]) -> Iterator[TextChunk]:
+        for chunk in chunks:
+            job.chunks += 1
+            yield chunk
+
+    def _update_timing(self, job: IngestionJob) -> None:
+        elapsed = time.perf_counter() - self._started.get(job.job_id, time.perf_counter())
+        job.elapsed_seconds = elapsed
+        job.throughput_bytes_per_second = job.bytes_read / elapsed if elapsed > 0 else 0.0
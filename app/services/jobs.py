@@ -0,0 +1,185 @@
+import asyncio
+import itertools
+import math
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter, deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from app.api.v1.routes.generation.schemas import (
+    BatchItemError,
+    GenerationJob,
+    GenerationRequest,
+    GenerationResponse,
+    JobPriority,
+    JobStatus,
+)
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableError
+from app.services.generation import GenerationService
+
+# Lower values are dequeued first.
+PRIORITY_ORDER = {JobPriority.HIGH: 0, JobPriority.NORMAL: 1, JobPriority.LOW: 2}
+
+
+class JobBackend(ABC):
+    """Queues generation requests for background execution and keeps their results until they expire."""
+
+    async def start(self) -> None:
+        """Start executing queued jobs."""
+        pass
+
+    async def stop(self) -> None:
+        """Stop executing jobs and release resources."""
+        pass
+
+    @abstractmethod
+    async def submit(
+        self, request: GenerationRequest, priority: JobPriority = JobPriority.NORMAL, use_cache: bool = True
+    ) -> GenerationJob:
+        """Queue a request; raises `ServiceUnavailableError` when the backend is saturated."""
+        pass
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[GenerationJob]:
+        """Return a job, or None when it is unknown or its result expired."""
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Return queue occupancy and counters."""
+        pass
+
+
+class LocalJobBackend(JobBackend):
+    """In-process job backend: a priority queue drained by a bounded pool of worker tasks.
+
+    Jobs of the same priority run in submission order. Submissions are rejected once
+    `queue_size` jobs are waiting, with a `Retry-After` estimated from the observed job
+    duration. Finished jobs are kept for `result_ttl` seconds, and at most `max_retained`
+    of them are kept at all.
+    """
+
+    def __init__(
+        self,
+        service: GenerationService,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        result_ttl: Optional[float] = None,
+        max_retained: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.service = service
+        self.workers = workers or settings.JOB_WORKERS
+        self.queue_size = queue_size or settings.JOB_QUEUE_SIZE
+        self.result_ttl = result_ttl if result_ttl is not None else settings.JOB_RESULT_TTL_SECONDS
+        self.max_retained = max_retained or settings.JOB_MAX_RETAINED
+        self._clock = clock
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._jobs: Dict[str, GenerationJob] = {}
+        self._requests: Dict[str, Tuple[GenerationRequest, bool]] = {}
+        # Finished job ids in the order they finished, i.e. the order they expire in.
+        self._finished: Deque[str] = deque()
+        self._sequence = itertools.count()
+        self._running = 0
+        self._counters: Counter = Counter()
+        self._average_seconds = 1.0
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        while self._queue is not None and not self._queue.empty():
+            _, _, job_id = self._queue.get_nowait()
+            self._requests.pop(job_id, None)
+            self._finish(self._jobs[job_id], error=BatchItemError(status_code=503, detail="Service stopped before the job ran"))
+
+    async def submit(
+        self, request: GenerationRequest, priority: JobPriority = JobPriority.NORMAL, use_cache: bool = True
+    ) -> GenerationJob:
+        # Outside of the application lifespan (scripts, tests) workers start on first use.
+        await self.start()
+        self._expire()
+        if self._queue.qsize() >= self.queue_size:
+            self._counters["rejected"] += 1
+            raise ServiceUnavailableError("Job queue is full", retry_after=self.retry_after())
+
+        job = GenerationJob(job_id=uuid.uuid4().hex, status=JobStatus.QUEUED, priority=priority, created_at=self._clock())
+        self._jobs[job.job_id] = job
+        self._requests[job.job_id] = (request, use_cache)
+        self._queue.put_nowait((PRIORITY_ORDER[priority], next(self._sequence), job.job_id))
+        self._counters["submitted"] += 1
+        return job
+
+    async def get(self, job_id: str) -> Optional[GenerationJob]:
+        self._expire()
+        return self._jobs.get(job_id)
+
+    def retry_after(self) -> int:
+        """Seconds the workers need to drain the queue at the observed job duration."""
+        queued = self._queue.qsize() if self._queue is not None else 0
+        return max(1, math.ceil(queued * self._average_seconds / self.workers))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self._running,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "submitted": self._counters["submitted"],
+            "rejected": self._counters["rejected"],
+            "completed": self._counters["completed"],
+            "failed": self._counters["failed"],
+            "retained": len(self._finished),
+        }
+
+    async def _work(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self._jobs[job_id]
+            request, use_cache = self._requests.pop(job_id)
+            job.status = JobStatus.RUNNING
+            job.started_at = self._clock()
+            self._running += 1
+            started = time.perf_counter()
+            try:
+                result = await self.service.generate_item(0, request, use_cache)
+            except asyncio.CancelledError:
+                self._finish(job, error=BatchItemError(status_code=503, detail="Service stopped while the job was running"))
+                raise
+            finally:
+                self._running -= 1
+            # Exponentially weighted average job duration, used for Retry-After estimates.
+            self._average_seconds = 0.9 * self._average_seconds + 0.1 * (time.perf_counter() - started)
+            self._finish(job, result.response, result.error)
+
+    def _finish(
+        self, job: GenerationJob, response: Optional[GenerationResponse] = None, error: Optional[BatchItemError] = None
+    ) -> None:
+        job.status = JobStatus.COMPLETED if error is None else JobStatus.FAILED
+        job.response = response
+        job.error = error
+        job.finished_at = self._clock()
+        job.expires_at = job.finished_at + self.result_ttl
+        self._counters["completed" if error is None else "failed"] += 1
+        self._finished.append(job.job_id)
+        while len(self._finished) > self.max_retained:
+            self._jobs.pop(self._finished.popleft(), None)
+
+    def _expire(self) -> None:
+        now = self._clock()
+        while self._finished and self._jobs[self._finished[0]].expires_at <= now:
+            self._jobs.pop(self._finished.popleft(), None)
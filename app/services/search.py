@@ -0,0 +1,328 @@
+import hashlib
+import math
+import os
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.api.v1.routes.generation.schemas import SearchType
+from app.common.chunking import TextChunk, content_hash
+from app.common.deadline import check_deadline
+from app.core.config import settings
+from app.core.exceptions import ReadOnlyIndexError
+from app.search import snapshot
+from app.search.bm25 import BM25Index
+from app.search.embedding import Embedder, HashingEmbedder
+from app.search.vector import VectorIndex
+from app.services.store import ResultStore, get_result_store
+
+# Rank constant of reciprocal rank fusion.
+RRF_K = 60
+EMBEDDING_NAMESPACE = "embedding"
+EMPTY_REVISION = hashlib.sha256(b"").hexdigest()
+
+
+class SearchMode(str, Enum):
+    """Retrieval methods selectable through `parameters["search_mode"]`."""
+    KEYWORD = "keyword"
+    SEMANTIC = "semantic"
+    HYBRID = "hybrid"
+
+
+@dataclass
+class IndexSyncResult:
+    """Counts of passages touched while synchronising a file with the index."""
+    added: int = 0
+    removed: int = 0
+    unchanged: int = 0
+
+
+class SearchService:
+    """Application-scoped retrieval over the searchable corpus.
+
+    Every passage is indexed both for BM25 keyword search and, through the embedder,
+    in the dense vector index; both share the same document ids. A service opened
+    from a snapshot (`open_snapshot`) is read-only. With a result store, chunk
+    embeddings are persisted by content hash and reused after restarts.
+
+    `revision` identifies the corpus contents: it changes whenever passages are added
+    or removed, and is the same after re-ingesting the same files in the same order.
+    """
+
+    def __init__(
+        self,
+        index: Optional[BM25Index] = None,
+        embedder: Optional[Embedder] = None,
+        vectors: Optional[VectorIndex] = None,
+        read_only: bool = False,
+        store: Optional[ResultStore] = None,
+    ):
+        self.index = index or BM25Index(k1=settings.SEARCH_BM25_K1, b=settings.SEARCH_BM25_B)
+        self.embedder = embedder or HashingEmbedder(settings.EMBEDDING_DIM)
+        self.vectors = vectors or VectorIndex(self.embedder.dim, path=vector_index_path())
+        self.read_only = read_only
+        self.store = store
+        self.revision = EMPTY_REVISION
+        # `_lock` guards the indexes for readers; `_write_lock` serializes writers, which
+        # prepare chunks and embeddings before taking `_lock` for the index updates.
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        # file id -> chunk key (content hash and occurrence) -> document id
+        self._file_chunks: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def open_snapshot(cls, directory: str, embedder: Optional[Embedder] = None) -> "SearchService":
+        """Serve the corpus of a snapshot written by `write_snapshot`, memory-mapped read-only."""
+        manifest = snapshot.read_manifest(directory)
+        embedder = embedder or HashingEmbedder(manifest["dim"])
+        if embedder.dim != manifest["dim"]:
+            raise ValueError(f"Snapshot {directory} holds {manifest['dim']}-dimensional vectors, the embedder produces {embedder.dim}")
+        service = cls(
+            index=snapshot.MappedBM25Index(directory, manifest),
+            embedder=embedder,
+            vectors=snapshot.MappedVectorIndex(directory, manifest),
+            read_only=True,
+        )
+        service._file_chunks = snapshot.read_file_chunks(directory)
+        service.revision = manifest["revision"]
+        return service
+
+    def write_snapshot(self, directory: str) -> Dict[str, Any]:
+        """Compact the corpus and write it as a snapshot that other processes can open; returns its manifest."""
+        with self._write_lock, self._lock:
+            if self.index.dead_ratio:
+                self._compact()
+            return snapshot.write_snapshot(directory, self.index, self.vectors, self._file_chunks, self.revision)
+
+    def index_passages(self, file_id: str, passages: List[str]) -> List[int]:
+        """Add passages of a file to the corpus."""
+        self._check_writable()
+        with self._write_lock:
+            embeddings = self._embeddings_batched(passages)
+            with self._lock:
+                doc_ids = self.index.add_many(file_id, passages)
+                self._embed(doc_ids, embeddings)
+                self._advance("add", file_id, *(content_hash(passage) for passage in passages))
+                self._maybe_build_ivf()
+        return doc_ids
+
+    def sync_file(self, file_id: str, chunks: Iterable[TextChunk]) -> IndexSyncResult:
+        """Make the indexed passages of a file match `chunks`.
+
+        Chunks are identified by content hash, so only chunks that changed since the
+        previous sync are indexed and embedded; chunks that disappeared are removed.
+        Chunking and embedding run before the service lock is taken, so searches only
+        wait for the index updates themselves.
+        """
+        self._check_writable()
+        result = IndexSyncResult()
+        with self._write_lock:
+            # Only writers change `_file_chunks`, and they are serialized by the write lock.
+            previous = self._file_chunks.get(file_id, {})
+            keyed: List[Tuple[str, TextChunk]] = []
+            occurrences: Counter = Counter()
+            for chunk in chunks:
+                digest = chunk.digest
+                keyed.append((f"{digest}:{occurrences[digest]}", chunk))
+                occurrences[digest] += 1
+            added = [chunk.text for key, chunk in keyed if key not in previous]
+            embeddings = self._embeddings_batched(added)
+
+            with self._lock:
+                current: Dict[str, int] = {}
+                doc_ids: List[int] = []
+                for key, chunk in keyed:
+                    metadata = {"start": chunk.start, "end": chunk.end, "chunk_hash": chunk.digest}
+                    doc_id = previous.get(key)
+                    if doc_id is None:
+                        doc_id = self.index.add(file_id, chunk.text, metadata)
+                        doc_ids.append(doc_id)
+                        result.added += 1
+                    else:
+                        self.index.update_metadata(doc_id, metadata)
+                        result.unchanged += 1
+                    current[key] = doc_id
+                self._embed(doc_ids, embeddings)
+
+                result.removed = self._remove([doc_id for key, doc_id in previous.items() if key not in current])
+                self._file_chunks[file_id] = current
+                if result.added or result.removed:
+                    self._advance("sync", file_id, *sorted(current))
+                self._maybe_compact()
+                self._maybe_build_ivf()
+        return result
+
+    def remove_file(self, file_id: str) -> int:
+        """Remove all passages of a file; returns the number of passages removed."""
+        self._check_writable()
+        with self._write_lock, self._lock:
+            removed = self._remove(list(self._file_chunks.pop(file_id, {}).values()))
+            if removed:
+                self._advance("remove", file_id)
+            self._maybe_compact()
+        return removed
+
+    def files(self) -> Dict[str, int]:
+        """Return the number of indexed chunks per ingested file."""
+        with self._lock:
+            return {file_id: len(chunks) for file_id, chunks in self._file_chunks.items()}
+
+    def search(
+        self,
+        query: str,
+        search_type: SearchType = SearchType.GLOBAL,
+        file_ids: Optional[List[str]] = None,
+        top_k: Optional[int] = None,
+        mode: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Search the whole corpus, or only the given files for `SearchType.SELECTED_FILES`.
+
+        Like `search_batch`, reads the indexes under the service lock, so concurrent
+        ingestion and compaction cannot renumber documents between a hit and its passage.
+        """
+        check_deadline()
+        top_k = min(top_k or settings.SEARCH_TOP_K, settings.SEARCH_MAX_TOP_K)
+        mode = SearchMode(mode or settings.SEARCH_DEFAULT_MODE)
+        selected = (file_ids or []) if search_type == SearchType.SELECTED_FILES else None
+
+        if mode == SearchMode.KEYWORD:
+            with self._lock:
+                return self.index.search(query, top_k, file_ids=selected)
+        if mode == SearchMode.SEMANTIC:
+            return self.search_batch([query], search_type, file_ids, top_k)[0]
+
+        # Hybrid: fuse keyword and semantic rankings with reciprocal rank fusion.
+        candidates = top_k * 2
+        embedded = self.embedder.embed([query])
+        with self._lock:
+            rankings = [
+                self.index.search(query, candidates, file_ids=selected),
+                self._semantic(embedded, selected, candidates)[0],
+            ]
+        fused: Dict[int, float] = {}
+        passages: Dict[int, Dict[str, Any]] = {}
+        for ranking in rankings:
+            for rank, result in enumerate(ranking):
+                fused[result["id"]] = fused.get(result["id"], 0.0) + 1.0 / (RRF_K + rank + 1)
+                passages[result["id"]] = result
+        best = sorted(fused, key=lambda doc_id: (-fused[doc_id], doc_id))[:top_k]
+        return [{**passages[doc_id], "score": fused[doc_id]} for doc_id in best]
+
+    def search_batch(
+        self,
+        queries: List[str],
+        search_type: SearchType = SearchType.GLOBAL,
+        file_ids: Optional[List[str]] = None,
+        top_k: Optional[int] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """Run semantic search for several queries with one embedding batch and one matrix product."""
+        check_deadline()
+        top_k = min(top_k or settings.SEARCH_TOP_K, settings.SEARCH_MAX_TOP_K)
+        selected = (file_ids or []) if search_type == SearchType.SELECTED_FILES else None
+        # Queries are embedded outside the lock; only the index reads need a stable corpus.
+        embedded = self.embedder.embed(queries)
+        with self._lock:
+            return self._semantic(embedded, selected, top_k)
+
+    def _semantic(
+        self, embedded: np.ndarray, selected: Optional[List[str]], top_k: int
+    ) -> List[List[Dict[str, Any]]]:
+        # Callers hold the lock.
+        allowed = None
+        if selected is not None:
+            allowed = self.index.file_mask(selected)
+            if allowed is None:
+                return [[] for _ in range(len(embedded))]
+        hits = self.vectors.search(embedded, top_k, allowed=allowed, nprobe=settings.VECTOR_IVF_NPROBE)
+        results = []
+        for query_hits in hits:
+            query_results = []
+            for doc_id, score in query_hits:
+                passage = self.index.passage(doc_id)
+                if passage is not None:
+                    query_results.append({**passage, "score": score})
+            results.append(query_results)
+        return results
+
+    def _embed(self, doc_ids: List[int], embeddings: np.ndarray) -> None:
+        if doc_ids:
+            self.vectors.add(doc_ids, embeddings)
+
+    def _embeddings_batched(self, texts: List[str]) -> np.ndarray:
+        # Embeds `EMBEDDING_BATCH_SIZE` texts at a time; callers hold the write lock, not the service lock.
+        batches = [
+            self._embeddings(texts[start:start + settings.EMBEDDING_BATCH_SIZE])
+            for start in range(0, len(texts), settings.EMBEDDING_BATCH_SIZE)
+        ]
+        return np.concatenate(batches) if batches else np.empty((0, self.embedder.dim), dtype=np.float32)
+
+    def _embeddings(self, texts: List[str]) -> np.ndarray:
+        # Only texts without a persisted embedding go through the embedder.
+        if self.store is None:
+            return self.embedder.embed(texts)
+        version = self.embedder.fingerprint
+        keys = [content_hash(text) for text in texts]
+        stored = self.store.get_many(EMBEDDING_NAMESPACE, version, keys)
+        vectors = np.empty((len(texts), self.embedder.dim), dtype=np.float32)
+        missing = []
+        for row, key in enumerate(keys):
+            if key in stored:
+                vectors[row] = np.frombuffer(stored[key], dtype=np.float32)
+            else:
+                missing.append(row)
+        if missing:
+            vectors[missing] = self.embedder.embed([texts[row] for row in missing])
+            self.store.put_many(EMBEDDING_NAMESPACE, version, [(keys[row], vectors[row].tobytes()) for row in missing])
+        return vectors
+
+    def _advance(self, *changes: str) -> None:
+        self.revision = hashlib.sha256("\0".join((self.revision, *changes)).encode("utf-8")).hexdigest()
+
+    def _remove(self, doc_ids: List[int]) -> int:
+        self.vectors.remove(doc_ids)
+        return self.index.remove(doc_ids)
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise ReadOnlyIndexError("The corpus is served from a read-only snapshot")
+
+    def _maybe_compact(self) -> None:
+        if self.index.dead_ratio > settings.SEARCH_COMPACT_RATIO:
+            self._compact()
+
+    def _compact(self) -> None:
+        remap = self.index.compact()
+        self.vectors.apply_remap(remap)
+        for chunks in self._file_chunks.values():
+            for key, doc_id in chunks.items():
+                chunks[key] = int(remap[doc_id])
+
+    def _maybe_build_ivf(self) -> None:
+        # Switch to clustered search for large corpora and re-cluster once the corpus doubles.
+        size = len(self.index)
+        if size < settings.VECTOR_IVF_MIN_VECTORS or (self.vectors.is_ivf and size < 2 * self.vectors.ivf_size):
+            return
+        self.vectors.build_ivf(nlist=int(math.sqrt(size)))
+
+
+def vector_index_path() -> Optional[str]:
+    """Backing file of this process's vector index, or None to keep it in memory.
+
+    Every worker process indexes its own copy of the corpus, so each one maps its own
+    file, suffixed with its pid; processes share vectors only through snapshots.
+    """
+    if not settings.VECTOR_INDEX_PATH:
+        return None
+    return f"{settings.VECTOR_INDEX_PATH}.{os.getpid()}"
+
+
+@lru_cache()
+def get_search_service() -> SearchService:
+    if settings.SEARCH_SNAPSHOT_PATH:
+        return SearchService.open_snapshot(settings.SEARCH_SNAPSHOT_PATH)
+    return SearchService(store=get_result_store())
@@ -0,0 +1,141 @@
+import hashlib
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.common.sqlite import connect, transaction
+from app.core.config import settings
+
+# Query parameters per statement when fetching many entries at once.
+_BATCH = 500
+# Access times are refreshed at most this often, so hot entries do not cost a write per read.
+_TOUCH_SECONDS = 60.0
+# Compaction evicts down to this fraction of the size bound, so it does not run on every write.
+_LOW_WATERMARK = 0.9
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS results ("
+    " address TEXT PRIMARY KEY, namespace TEXT NOT NULL, body BLOB NOT NULL,"
+    " size INTEGER NOT NULL, accessed_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at)",
+    "CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), entries INTEGER NOT NULL, bytes INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO totals VALUES (0, 0, 0)",
+    "CREATE TRIGGER IF NOT EXISTS results_added AFTER INSERT ON results"
+    " BEGIN UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.size; END",
+    "CREATE TRIGGER IF NOT EXISTS results_removed AFTER DELETE ON results"
+    " BEGIN UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size; END",
+)
+
+
+def result_address(namespace: str, version: str, key: str) -> str:
+    """Content address of a result: the hash of what it was computed from and by which code version."""
+    return hashlib.sha256(f"{namespace}\0{version}\0{key}".encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+    """Persistent, content-addressed store of computed results in a local SQLite database.
+
+    Results (strategy outputs, chunk embeddings) are addressed by their namespace, the
+    version of the code that produced them and a key derived from their inputs, so a
+    new version never reads stale results. The store survives restarts and is shared
+    by all processes of a node; when it exceeds `max_bytes` the least recently used
+    results are evicted and the freed pages returned to the file system.
+    """
+
+    def __init__(self, path: str, max_bytes: int, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._db = connect(path, incremental_vacuum=True)
+        with transaction(self._db, self._lock):
+            for statement in _SCHEMA:
+                self._db.execute(statement)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return self._totals()[0]
+
+    def get(self, namespace: str, version: str, key: str) -> Optional[bytes]:
+        return self.get_many(namespace, version, [key]).get(key)
+
+    def get_many(self, namespace: str, version: str, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Return the stored results among `keys`."""
+        addresses = {result_address(namespace, version, key): key for key in keys}
+        found: Dict[str, bytes] = {}
+        stale: List[str] = []
+        now = self._clock()
+        pending = list(addresses)
+        with self._lock:
+            for start in range(0, len(pending), _BATCH):
+                batch = pending[start:start + _BATCH]
+                rows = self._db.execute(
+                    f"SELECT address, body, accessed_at FROM results WHERE address IN ({','.join('?' * len(batch))})", batch
+                )
+                for address, body, accessed_at in rows:
+                    found[addresses[address]] = body
+                    if accessed_at < now - _TOUCH_SECONDS:
+                        stale.append(address)
+            if stale:
+                with transaction(self._db, self._lock):
+                    self._db.executemany("UPDATE results SET accessed_at = ? WHERE address = ?", [(now, address) for address in stale])
+        self.hits += len(found)
+        self.misses += len(addresses) - len(found)
+        return found
+
+    def put(self, namespace: str, version: str, key: str, body: bytes) -> None:
+        self.put_many(namespace, version, [(key, body)])
+
+    def put_many(self, namespace: str, version: str, items: Iterable[Tuple[str, bytes]]) -> None:
+        """Store results, compacting the store when it outgrows `max_bytes`."""
+        now = self._clock()
+        rows = list({
+            address: (address, namespace, body, len(body), now)
+            for address, body in ((result_address(namespace, version, key), body) for key, body in items)
+            if len(body) <= self.max_bytes
+        }.values())
+        if not rows:
+            return
+        with transaction(self._db, self._lock):
+            self._db.executemany("DELETE FROM results WHERE address = ?", [(row[0],) for row in rows])
+            self._db.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?)", rows)
+        if self._totals()[1] > self.max_bytes:
+            self.compact()
+
+    def compact(self) -> int:
+        """Evict least recently used results down to the low watermark; returns the number evicted."""
+        target = int(self.max_bytes * _LOW_WATERMARK)
+        with transaction(self._db, self._lock):
+            _, size = self._totals()
+            victims = []
+            for address, entry_size in self._db.execute("SELECT address, size FROM results ORDER BY accessed_at").fetchall():
+                if size <= target:
+                    break
+                victims.append((address,))
+                size -= entry_size
+            self._db.executemany("DELETE FROM results WHERE address = ?", victims)
+        with self._lock:
+            self._db.execute("PRAGMA incremental_vacuum").fetchall()
+        self.evictions += len(victims)
+        return len(victims)
+
+    def stats(self) -> Dict[str, int]:
+        entries, size = self._totals()
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": entries, "bytes": size}
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _totals(self) -> Tuple[int, int]:
+        with self._lock:
+            return self._db.execute("SELECT entries, bytes FROM totals").fetchone()
+
+
+@lru_cache()
+def get_result_store() -> Optional[ResultStore]:
+    if not settings.RESULT_STORE_PATH:
+        return None
+    return ResultStore(settings.RESULT_STORE_PATH, settings.RESULT_STORE_MAX_BYTES)
@@ -1,15 +1,88 @@
+import asyncio
+import json
 from abc import ABC, abstractmethod
-from typing import Dict, Any
-from app.api.v1.routes.generation.schemas import GenerationRequest, GenerationResponse
+from typing import Dict, Any, AsyncIterator, Callable, List, Optional
+from app.api.v1.routes.generation.schemas import (
+    GenerationRequest,
+    GenerationResponse,
+    GenerationStreamEvent,
+    OutputType,
+    SearchType,
+    StreamEventType,
+)
+from app.analysis.context import PackedContext, PackingMethod, build_passages, pack_context
+from app.common.deadline import check_deadline, report_partial
+from app.common.metrics import Stage, track_stage
+from app.common.schema import check_output_shape
+from app.core.config import parse_limits, settings
+from app.core.exceptions import ValidationError
+from app.services.backend import DEFAULT_BACKEND, BackendClient, get_backend_pool
+from app.services.search import SearchMode, SearchService, get_search_service
 
 class GenerationStrategy(ABC):
-    """Base class for all generation strategies."""
-    
+    """Base class for all generation strategies.
+
+    Strategies are built once per application by the strategy registry and shared by
+    all concurrent requests, so they must not keep per-request state on the instance.
+    """
+
+    _search_service: Optional[SearchService] = None
+    # Bump when a change alters the response to the same request, so stored results are not reused.
+    version: str = "1"
+    # Top-level fields (name to JSON type) of the JSON documents rendered by the strategy.
+    output_fields: Dict[str, str] = {"content": "string"}
+
+    def __init__(self, search_service: Optional[SearchService] = None):
+        self._search_service = search_service
+
+    @property
+    def search_service(self) -> SearchService:
+        """Search service used to fill `search_results`; defaults to the shared corpus."""
+        return self._search_service or get_search_service()
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the strategy code whose stored responses may be reused."""
+        return f"{type(self).__module__}.{type(self).__qualname__}:{self.version}"
+
+    @staticmethod
+    def backend(name: str = DEFAULT_BACKEND) -> BackendClient:
+        """Shared client of a generation backend configured in `BACKEND_URLS`."""
+        return get_backend_pool().get(name)
+
+    @staticmethod
+    def has_backend(name: str = DEFAULT_BACKEND) -> bool:
+        """Whether `BACKEND_URLS` configures this backend; strategies fall back to local output otherwise."""
+        return get_backend_pool().configured(name)
+
+    async def warmup(self) -> None:
+        """Prepare expensive resources (clients, templates, indexes) before serving requests."""
+        pass
+
+    async def close(self) -> None:
+        """Release resources acquired by the strategy."""
+        pass
+
     @abstractmethod
     async def generate(self, request: GenerationRequest) -> GenerationResponse:
         """Generate content based on the request."""
         pass
 
+    async def stream(self, request: GenerationRequest) -> AsyncIterator[GenerationStreamEvent]:
+        """Stream search results, content chunks and final metadata as they become ready.
+
+        The default implementation replays the result of `generate`; strategies that
+        produce output incrementally should override it to emit events earlier.
+        """
+        response = await self.generate(request)
+        yield GenerationStreamEvent(event=StreamEventType.SEARCH_RESULTS, data=response.search_results)
+        chunk_size = settings.STREAM_CHUNK_SIZE
+        for start in range(0, len(response.content), chunk_size):
+            yield GenerationStreamEvent(
+                event=StreamEventType.CONTENT, data=response.content[start:start + chunk_size]
+            )
+        yield GenerationStreamEvent(event=StreamEventType.METADATA, data=self.get_stream_metadata(response))
+
     @abstractmethod
     def validate_request(self, request: GenerationRequest) -> None:
         """Validate the request parameters."""
@@ -22,4 +95,126 @@ class GenerationStrategy(ABC):
             "generation_type": request.generation_type,
             "output_type": request.output_type,
             "search_type": request.search_type
-        } 
\ No newline at end of file
+        }
+
+    async def search(self, request: GenerationRequest, query: Optional[str]) -> List[Dict[str, Any]]:
+        """Retrieve corpus passages for `query` according to the request's search type.
+
+        A selected_files request without `file_ids` selects no corpus files, so nothing is
+        searched; only an explicit `query` parameter makes `file_ids` required. The search
+        runs in a worker thread, so waiting for concurrent ingestion never blocks the event loop.
+        """
+        if not query:
+            return []
+        file_ids = request.parameters.get("file_ids")
+        top_k = request.parameters.get("top_k")
+        if file_ids is not None and not isinstance(file_ids, list):
+            raise ValidationError("file_ids must be a list of file ids")
+        if request.search_type == SearchType.SELECTED_FILES and not file_ids:
+            if request.parameters.get("query"):
+                raise ValidationError("file_ids are required for selected_files search")
+            return []
+        if top_k is not None and (not isinstance(top_k, int) or top_k < 1):
+            raise ValidationError("top_k must be a positive integer")
+        mode = request.parameters.get("search_mode")
+        if mode is not None and mode not in {search_mode.value for search_mode in SearchMode}:
+            raise ValidationError(f"search_mode must be one of: {', '.join(search_mode.value for search_mode in SearchMode)}")
+        with track_stage(request.generation_type, Stage.SEARCH):
+            return await asyncio.to_thread(self.search_service.search, query, request.search_type, file_ids, top_k, mode)
+
+    @staticmethod
+    def context_budget(request: GenerationRequest) -> int:
+        """Token budget for prompt context: `context_tokens`, else the budget of the request's `model`."""
+        context_tokens = request.parameters.get("context_tokens")
+        if context_tokens is not None:
+            if not isinstance(context_tokens, int) or context_tokens < 1:
+                raise ValidationError("context_tokens must be a positive integer")
+            return context_tokens
+        budgets = parse_limits(settings.CONTEXT_TOKEN_BUDGETS)
+        window = budgets.get(request.parameters.get("model"), settings.CONTEXT_TOKEN_BUDGET)
+        return max(int(window) - settings.CONTEXT_RESERVED_TOKENS, 0)
+
+    @staticmethod
+    def packing_method(request: GenerationRequest) -> PackingMethod:
+        """Context packing method: `packing`, else `CONTEXT_PACKING`."""
+        method = request.parameters.get("packing", settings.CONTEXT_PACKING)
+        if method not in {packing.value for packing in PackingMethod}:
+            raise ValidationError(f"packing must be one of: {', '.join(packing.value for packing in PackingMethod)}")
+        return PackingMethod(method)
+
+    def validate_context(self, request: GenerationRequest) -> None:
+        """Validate the context packing parameters, also when no context ends up being packed."""
+        self.packing_method(request)
+        self.context_budget(request)
+
+    async def build_context(
+        self, request: GenerationRequest, search_results: List[Dict[str, Any]], query: Optional[str]
+    ) -> PackedContext:
+        """Pack the most relevant content spans and search results into the request's token budget."""
+        method = self.packing_method(request)
+        budget = self.context_budget(request)
+        content = request.parameters.get("content")
+
+        def pack() -> PackedContext:
+            check_deadline()
+            passages = build_passages(
+                content if isinstance(content, str) else None,
+                search_results,
+                query,
+                self.search_service.embedder,
+                settings.CONTEXT_SPAN_CHARS,
+            )
+            return pack_context(passages, budget, method)
+
+        return await asyncio.to_thread(pack)
+
+    @staticmethod
+    def report_partial(build: Callable[[], GenerationResponse]) -> None:
+        """Offer the result available so far, returned if the request's deadline passes and allows it."""
+        report_partial(build)
+
+    @staticmethod
+    def build_response(
+        request: GenerationRequest, content: str, metadata: Dict[str, Any], search_results: List[Dict[str, Any]]
+    ) -> GenerationResponse:
+        """Assemble the response from parts the strategy built itself, without validating them again."""
+        return GenerationResponse.model_construct(
+            content=content,
+            metadata=metadata,
+            search_results=search_results,
+            generation_parameters=request.parameters,
+            output_schema=request.output_schema if request.output_type == OutputType.JSON else None
+        )
+
+    @staticmethod
+    def render_content(request: GenerationRequest, payload: Dict[str, Any], text: str) -> str:
+        """Render generated content as a JSON document for JSON output and as plain text otherwise."""
+        with track_stage(request.generation_type, Stage.SERIALIZATION):
+            if request.output_type == OutputType.JSON:
+                return json.dumps(payload, ensure_ascii=False)
+            return text
+
+    def validate_output_schema(self, request: GenerationRequest) -> None:
+        """Reject JSON output schemas the strategy's `output_fields` can never satisfy."""
+        if request.output_type != OutputType.JSON or not isinstance(request.output_schema, dict):
+            return
+        errors = check_output_shape(request.output_schema, self.output_fields)
+        if errors:
+            raise ValidationError(
+                f"output_schema cannot be satisfied by {request.generation_type} output: {'; '.join(errors)}"
+            )
+
+    @staticmethod
+    def output_item_type(request: GenerationRequest, field: str) -> Optional[str]:
+        """Return the JSON type the output schema declares for the items of an array property."""
+        properties = (request.output_schema or {}).get("properties") or {}
+        return ((properties.get(field) or {}).get("items") or {}).get("type")
+
+    @staticmethod
+    def get_stream_metadata(response: GenerationResponse) -> Dict[str, Any]:
+        """Get the payload of the final metadata event of a stream."""
+        return {
+            "metadata": response.metadata,
+            "generation_parameters": response.generation_parameters,
+            "output_schema": response.output_schema
+        }
@@ -1,28 +1,188 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.analysis.claims import Claim, chunk_spans, extract_candidates, extract_claims, merge_claims
+from app.common.metrics import Stage, track_stage
+from app.core.config import settings
 from app.core.exceptions import ValidationError
+from app.services.dedup import Reuse, get_document_cache, relocate
 from app.strategies.base import GenerationStrategy
-from app.api.v1.routes.generation.schemas import GenerationRequest, GenerationType, GenerationResponse, OutputType
+from app.api.v1.routes.generation.schemas import GenerationRequest, GenerationType, GenerationResponse
 
 
 class ClaimDiscoveryStrategy(GenerationStrategy):
-    """Strategy for discovering claims from content."""
-    
+    """Strategy for discovering claims from content.
+
+    Documents are segmented into sentences, scored as claim candidates and
+    deduplicated. Small documents are processed in a worker thread; documents of at
+    least `CLAIM_PARALLEL_MIN_CHARS` characters are split into chunks that are processed
+    in a process pool and merged deterministically, so the event loop stays responsive.
+    Claims of documents seen before, or of near-duplicates, are reused.
+    """
+
+    output_fields = {"claims": "array"}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def warmup(self) -> None:
+        """Start the worker processes before the first large document arrives."""
+        pool = self._get_pool()
+        await asyncio.gather(*(
+            asyncio.get_running_loop().run_in_executor(pool, extract_candidates, "", 0)
+            for _ in range(settings.CLAIM_PROCESS_WORKERS)
+        ))
+
+    async def close(self) -> None:
+        """Shut down the worker processes."""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await asyncio.to_thread(pool.shutdown, True, cancel_futures=True)
+
     def validate_request(self, request: GenerationRequest) -> None:
         """Validate claim discovery specific parameters."""
         if request.generation_type != GenerationType.CLAIM_DISCOVERY:
             raise ValidationError("Invalid generation type for claim discovery strategy")
-        
+
         if not request.parameters.get("content"):
             raise ValidationError("Content is required for claim discovery")
 
+        if not isinstance(request.parameters["content"], str):
+            raise ValidationError("Content must be a string")
+
+        max_claims = request.parameters.get("max_claims")
+        if max_claims is not None and (not isinstance(max_claims, int) or max_claims < 1):
+            raise ValidationError("max_claims must be a positive integer")
+
+        min_score = request.parameters.get("min_score")
+        if min_score is not None and (not isinstance(min_score, (int, float)) or not 0 <= min_score <= 1):
+            raise ValidationError("min_score must be a number between 0 and 1")
+
+        self.validate_output_schema(request)
+
     async def generate(self, request: GenerationRequest) -> GenerationResponse:
         """Generate claims from content."""
-        self.validate_request(request)
-        
-        # TODO: Implement actual claim discovery logic
-        return GenerationResponse(
-            content="Discovered claims from content",
-            metadata=self.get_metadata(request),
-            search_results=[],
-            generation_parameters=request.parameters,
-            output_schema=request.output_schema if request.output_type == OutputType.JSON else None
-        ) 
\ No newline at end of file
+        with track_stage(request.generation_type, Stage.VALIDATION):
+            self.validate_request(request)
+
+        max_claims = request.parameters.get("max_claims") or settings.CLAIM_MAX_CLAIMS
+        search_results = await self.search(request, request.parameters.get("query"))
+        # Cut short while chunks of a large document are processed, the claims of the finished ones are returned.
+        progress: List[Claim] = []
+        self.report_partial(lambda: self._response(request, merge_claims(list(progress), max_claims), None, search_results))
+        with track_stage(request.generation_type, Stage.GENERATION):
+            claims, reuse = await self.find_claims(
+                request.parameters["content"],
+                max_claims,
+                request.parameters.get("min_score", settings.CLAIM_MIN_SCORE),
+                progress,
+            )
+        return self._response(request, claims, reuse, search_results)
+
+    def _response(
+        self,
+        request: GenerationRequest,
+        claims: List[Claim],
+        reuse: Optional[Reuse],
+        search_results: List[Dict[str, Any]],
+    ) -> GenerationResponse:
+        text = "\n".join(claim.text for claim in claims)
+        metadata = self.get_metadata(request)
+        metadata["claim_count"] = len(claims)
+        if reuse is not None:
+            metadata["content_reuse"] = reuse.to_metadata()
+        return self.build_response(
+            request,
+            content=self.render_content(request, {"claims": self._claim_items(request, claims)}, text),
+            metadata=metadata,
+            search_results=search_results
+        )
+
+    async def find_claims(
+        self, content: str, max_claims: int, min_score: float, progress: Optional[List[Claim]] = None
+    ) -> Tuple[List[Claim], Optional[Reuse]]:
+        """Return the claims of a document, reusing those of the same or a near-duplicate document.
+
+        Reused claims are re-anchored in `content`; claims whose sentence does not occur
+        in it are dropped. Claims of the text the near-duplicate lacks are discovered and
+        merged in, unless that text is large enough to warrant a full run.
+        """
+        if not settings.DEDUP_ENABLED:
+            return await self.discover_claims(content, max_claims, min_score, progress), None
+        cache = get_document_cache()
+        name = ("claims", max_claims, min_score)
+        key, hit = await asyncio.to_thread(cache.lookup, content, name)
+        if hit is None:
+            claims = await self.discover_claims(content, max_claims, min_score, progress)
+            cache.put(key, name, claims)
+            return claims, None
+        claims, reuse = hit
+        if reuse.exact:
+            return claims, reuse
+        if reuse.novel_chars >= settings.CLAIM_PARALLEL_MIN_CHARS:
+            # As much new text as a large document: a full run in the process pool is exact at similar cost.
+            claims = await self.discover_claims(content, max_claims, min_score, progress)
+            cache.put(key, name, claims)
+            return claims, None
+        relocated = []
+        for claim in claims:
+            start = relocate(content, claim.text, claim.start)
+            if start >= 0:
+                relocated.append(Claim(text=claim.text, score=claim.score, start=start, end=start + len(claim.text)))
+
+        def merge() -> List[Claim]:
+            candidates = [claim for offset, text in reuse.novel for claim in extract_candidates(text, offset, min_score)]
+            return merge_claims(relocated + candidates, max_claims)
+
+        return await asyncio.to_thread(merge), reuse
+
+    async def discover_claims(
+        self, content: str, max_claims: int, min_score: float, progress: Optional[List[Claim]] = None
+    ) -> List[Claim]:
+        """Extract the best `max_claims` claims from a document without blocking the event loop.
+
+        Candidates of large documents are added to `progress` chunk by chunk as they are found.
+        Cancelling the call drops the chunks that have not started yet.
+        """
+        if len(content) < settings.CLAIM_PARALLEL_MIN_CHARS:
+            return await asyncio.to_thread(extract_claims, content, max_claims, min_score)
+
+        pool = self._get_pool()
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(pool, extract_candidates, text, offset, min_score)
+            for offset, text in chunk_spans(content, settings.CLAIM_CHUNK_CHARS)
+        ]
+        if progress is not None:
+            for future in futures:
+                future.add_done_callback(
+                    lambda done: progress.extend(done.result()) if not done.cancelled() and done.exception() is None else None
+                )
+        try:
+            chunks = await asyncio.gather(*futures)
+        except BrokenProcessPool:
+            # A crashed worker breaks the whole pool; start a fresh one for later requests.
+            if self._pool is pool:
+                self._pool = None
+            raise
+        candidates = [claim for chunk in chunks for claim in chunk]
+        return await asyncio.to_thread(merge_claims, candidates, max_claims)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned workers do not inherit the server's threads and locks.
+            self._pool = ProcessPoolExecutor(
+                max_workers=settings.CLAIM_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def _claim_items(self, request: GenerationRequest, claims: List[Claim]) -> List[Any]:
+        # Claims are objects with offsets unless the output schema asks for plain strings.
+        if self.output_item_type(request, "claims") == "string":
+            return [claim.text for claim in claims]
+        return [claim.to_dict() for claim in claims]
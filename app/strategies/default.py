@@ -1,10 +1,22 @@
-from app.api.v1.routes.generation.schemas import GenerationRequest, GenerationType, GenerationResponse, OutputType
+from typing import Any, Dict, Optional
+
+from app.analysis.context import PackedContext
+from app.api.v1.routes.generation.schemas import GenerationRequest, GenerationType, GenerationResponse
+from app.common.metrics import Stage, track_stage
+from app.core.config import settings
 from app.core.exceptions import ValidationError
 from app.strategies.base import GenerationStrategy
 
+# Content returned while no generation backend is configured (`BACKEND_URLS`).
+FALLBACK_CONTENT = "Generated content using default strategy"
+
 
 class DefaultStrategy(GenerationStrategy):
-    """Default strategy for content generation."""
+    """Default strategy for content generation.
+
+    The content and search results are packed into a prompt for the `default`
+    generation backend, whose completion is the generated content.
+    """
     
     def validate_request(self, request: GenerationRequest) -> None:
         """Validate default strategy specific parameters."""
@@ -14,15 +26,58 @@ class DefaultStrategy(GenerationStrategy):
         if not request.parameters.get("content"):
             raise ValidationError("Content is required for default generation")
 
+        self.validate_context(request)
+        self.validate_output_schema(request)
+
     async def generate(self, request: GenerationRequest) -> GenerationResponse:
         """Generate content using default strategy."""
-        self.validate_request(request)
+        with track_stage(request.generation_type, Stage.VALIDATION):
+            self.validate_request(request)
         
-        # TODO: Implement actual default generation logic
-        return GenerationResponse(
-            content="Generated content using default strategy",
+        query = request.parameters.get("query")
+        search_results = await self.search(request, query)
+        # Cut short after the search, the request can still be answered with its search results.
+        self.report_partial(lambda: self.build_response(
+            request,
+            content=self.render_content(request, {"content": ""}, ""),
             metadata=self.get_metadata(request),
-            search_results=[],
-            generation_parameters=request.parameters,
-            output_schema=request.output_schema if request.output_type == OutputType.JSON else None
-        ) 
\ No newline at end of file
+            search_results=search_results
+        ))
+        metadata = self.get_metadata(request)
+        with track_stage(request.generation_type, Stage.GENERATION):
+            if self.has_backend():
+                # The packed context is the prompt material for the generation backend.
+                context = await self.build_context(request, search_results, query)
+                text = await self.backend().complete(self.build_prompt(context, query), **self.backend_parameters(request))
+                metadata["context_tokens"] = context.tokens
+                metadata["context_passages"] = len(context.passages)
+            else:
+                # Without a backend nothing consumes the context, so it is not packed.
+                text = FALLBACK_CONTENT
+        return self.build_response(
+            request,
+            content=self.render_content(request, {"content": text}, text),
+            metadata=metadata,
+            search_results=search_results
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        # Responses generated without a backend must not be reused once one is configured, and vice versa.
+        return f"{super().fingerprint}:{'backend' if self.has_backend() else 'local'}"
+
+    @staticmethod
+    def build_prompt(context: PackedContext, query: Optional[str]) -> str:
+        """Prompt of the generation backend: the packed context, followed by the query if any."""
+        sections = [context.render()]
+        if query:
+            sections.append(f"Query: {query}")
+        return "\n\n".join(section for section in sections if section)
+
+    @staticmethod
+    def backend_parameters(request: GenerationRequest) -> Dict[str, Any]:
+        """Completion parameters: the request's `model`, and the tokens reserved for the completion."""
+        parameters: Dict[str, Any] = {"max_tokens": settings.CONTEXT_RESERVED_TOKENS}
+        if request.parameters.get("model"):
+            parameters["model"] = request.parameters["model"]
+        return parameters
@@ -1,31 +1,162 @@
-from app.api.v1.routes.generation.schemas import GenerationRequest, GenerationType, GenerationResponse, OutputType
+import asyncio
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.analysis.evidence import (
+    Evidence,
+    SpanIndex,
+    find_evidence as find_document_evidence,
+    index_regions,
+    index_spans,
+    merge_evidence,
+    rank_evidence,
+)
+from app.common.chunking import TextChunk
+from app.api.v1.routes.generation.schemas import GenerationRequest, GenerationType, GenerationResponse
+from app.common.metrics import Stage, track_stage
+from app.core.config import settings
 from app.core.exceptions import ValidationError
+from app.services.dedup import Reuse, get_document_cache, relocate
 from app.strategies.base import GenerationStrategy
 
 
 class EvidenceDiscoveryStrategy(GenerationStrategy):
-    """Strategy for discovering evidence from content."""
-    
+    """Strategy for discovering evidence from content.
+
+    The content is split into sentence spans and embedded once; every claim of the
+    request (`claim` and/or `claims`) is ranked against all spans in a single matrix
+    product. `search_results` lists the content spans for each claim, followed by
+    matching corpus passages. The spans and embeddings of documents seen before, or of
+    near-duplicates, are reused.
+    """
+
+    output_fields = {"evidence": "array"}
+
     def validate_request(self, request: GenerationRequest) -> None:
         """Validate evidence discovery specific parameters."""
         if request.generation_type != GenerationType.EVIDENCE_DISCOVERY:
             raise ValidationError("Invalid generation type for evidence discovery strategy")
-        
+
         if not request.parameters.get("content"):
             raise ValidationError("Content is required for evidence discovery")
-        
-        if not request.parameters.get("claim"):
+
+        if not isinstance(request.parameters["content"], str):
+            raise ValidationError("Content must be a string")
+
+        claims = request.parameters.get("claims")
+        if claims is not None and (
+            not isinstance(claims, list) or not all(isinstance(claim, str) and claim for claim in claims)
+        ):
+            raise ValidationError("claims must be a list of non-empty strings")
+
+        if not request.parameters.get("claim") and not claims:
             raise ValidationError("Claim is required for evidence discovery")
 
+        if len(self.get_claims(request)) > settings.EVIDENCE_MAX_CLAIMS:
+            raise ValidationError(f"At most {settings.EVIDENCE_MAX_CLAIMS} claims are allowed per request")
+
+        top_k = request.parameters.get("top_k")
+        if top_k is not None and (not isinstance(top_k, int) or top_k < 1):
+            raise ValidationError("top_k must be a positive integer")
+
+        self.validate_output_schema(request)
+
+    @staticmethod
+    def get_claims(request: GenerationRequest) -> List[str]:
+        """Return the claims of a request: `claim` first, then `claims`, without duplicates."""
+        claims = [request.parameters["claim"]] if request.parameters.get("claim") else []
+        claims.extend(request.parameters.get("claims") or [])
+        return list(dict.fromkeys(claims))
+
     async def generate(self, request: GenerationRequest) -> GenerationResponse:
         """Generate evidence from content."""
-        self.validate_request(request)
-        
-        # TODO: Implement actual evidence discovery logic
-        return GenerationResponse(
-            content="Discovered evidence from content",
-            metadata=self.get_metadata(request),
-            search_results=[],
-            generation_parameters=request.parameters,
-            output_schema=request.output_schema if request.output_type == OutputType.JSON else None
-        ) 
\ No newline at end of file
+        with track_stage(request.generation_type, Stage.VALIDATION):
+            self.validate_request(request)
+
+        claims = self.get_claims(request)
+        top_k = min(request.parameters.get("top_k") or settings.EVIDENCE_TOP_K, settings.SEARCH_MAX_TOP_K)
+        with track_stage(request.generation_type, Stage.GENERATION):
+            evidence, reuse = await asyncio.to_thread(self.find_evidence, claims, request.parameters["content"], top_k)
+
+        search_results: List[Dict[str, Any]] = []
+        # Cut short during the corpus searches, the response holds the passages found so far.
+        self.report_partial(lambda: self._response(request, claims, evidence, reuse, list(search_results)))
+        for claim_index, (claim, claim_evidence) in enumerate(zip(claims, evidence)):
+            search_results.extend({**asdict(item), "source": "content"} for item in claim_evidence)
+            passages = await self.search(request, claim)
+            search_results.extend(
+                {**passage, "claim_index": claim_index, "claim": claim, "source": "corpus"}
+                for passage in passages
+            )
+        return self._response(request, claims, evidence, reuse, search_results)
+
+    def _response(
+        self,
+        request: GenerationRequest,
+        claims: List[str],
+        evidence: List[List[Evidence]],
+        reuse: Optional[Reuse],
+        search_results: List[Dict[str, Any]],
+    ) -> GenerationResponse:
+        items = [item for claim_evidence in evidence for item in claim_evidence]
+        metadata = self.get_metadata(request)
+        metadata["claim_count"] = len(claims)
+        metadata["evidence_count"] = len(items)
+        if reuse is not None:
+            metadata["content_reuse"] = reuse.to_metadata()
+        payload = {"evidence": self._evidence_items(request, items)}
+        return self.build_response(
+            request,
+            content=self.render_content(request, payload, self._render_text(claims, evidence)),
+            metadata=metadata,
+            search_results=search_results
+        )
+
+    def find_evidence(self, claims: List[str], content: str, top_k: int) -> Tuple[List[List[Evidence]], Optional[Reuse]]:
+        """Rank the spans of `content` against the claims; CPU bound, run it in a worker thread.
+
+        With a near-duplicate, its spans are reused and only the text it lacks is embedded.
+        """
+        embedder = self.search_service.embedder
+        if not settings.DEDUP_ENABLED:
+            return find_document_evidence(claims, content, embedder, top_k, settings.EVIDENCE_SPAN_CHARS), None
+        cache = get_document_cache()
+        name = ("spans", settings.EVIDENCE_SPAN_CHARS, type(embedder).__name__, embedder.dim)
+        key, hit = cache.lookup(content, name)
+        if hit is None:
+            index = index_spans(content, embedder, settings.EVIDENCE_SPAN_CHARS)
+            cache.put(key, name, index)
+            return rank_evidence(claims, index, embedder, top_k), None
+        index, reuse = hit
+        if reuse.exact:
+            return rank_evidence(claims, index, embedder, top_k), reuse
+        # Spans of the near-duplicate are re-anchored in this document; spans it lacks are masked out.
+        spans = []
+        allowed = np.zeros(len(index.spans), dtype=bool)
+        for span_id, span in enumerate(index.spans):
+            start = relocate(content, span.text, span.start)
+            allowed[span_id] = start >= 0
+            spans.append(TextChunk(start=start, end=start + len(span.text), text=span.text))
+        evidence = rank_evidence(claims, SpanIndex(spans=spans, vectors=index.vectors), embedder, top_k, allowed=allowed)
+        if not reuse.novel:
+            return evidence, reuse
+        # Text the near-duplicate lacks is indexed on its own and ranked alongside.
+        novel = index_regions(reuse.novel, embedder, settings.EVIDENCE_SPAN_CHARS)
+        return merge_evidence([evidence, rank_evidence(claims, novel, embedder, top_k)], top_k), reuse
+
+    def _evidence_items(self, request: GenerationRequest, items: List[Evidence]) -> List[Any]:
+        # Evidence entries are objects with offsets unless the output schema asks for plain strings.
+        if self.output_item_type(request, "evidence") == "string":
+            return [item.text for item in items]
+        return [asdict(item) for item in items]
+
+    @staticmethod
+    def _render_text(claims: List[str], evidence: List[List[Evidence]]) -> str:
+        sections = []
+        for claim, claim_evidence in zip(claims, evidence):
+            lines = [f"Claim: {claim}"]
+            lines.extend(f"- {item.text}" for item in claim_evidence)
+            sections.append("\n".join(lines))
+        return "\n\n".join(sections)
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from functools import lru_cache
+from importlib.metadata import entry_points
+from typing import Dict, Optional, Type
+
+from app.api.v1.routes.generation.schemas import GenerationType
+from app.core.exceptions import ValidationError
+from app.strategies.base import GenerationStrategy
+from app.strategies.claim_discovery import ClaimDiscoveryStrategy
+from app.strategies.default import DefaultStrategy
+from app.strategies.evidence_discovery import EvidenceDiscoveryStrategy
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "content_generation.strategies"
+
+BUILTIN_STRATEGIES: Dict[str, Type[GenerationStrategy]] = {
+    GenerationType.CLAIM_DISCOVERY: ClaimDiscoveryStrategy,
+    GenerationType.EVIDENCE_DISCOVERY: EvidenceDiscoveryStrategy,
+    GenerationType.DEFAULT: DefaultStrategy,
+}
+
+
+class StrategyRegistry:
+    """Application-scoped registry that builds each strategy once and shares it across requests.
+
+    Third-party packages can provide strategies through the `content_generation.strategies`
+    entry point group; the entry point name is the generation type it serves and overrides
+    the built-in strategy for that type.
+    """
+
+    def __init__(self, strategy_classes: Optional[Dict[str, Type[GenerationStrategy]]] = None):
+        self._strategy_classes: Dict[str, Type[GenerationStrategy]] = dict(
+            BUILTIN_STRATEGIES if strategy_classes is None else strategy_classes
+        )
+        self._instances: Dict[str, GenerationStrategy] = {}
+        self._started = False
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    def register(self, generation_type: str, strategy_class: Type[GenerationStrategy]) -> None:
+        """Register a strategy class for a generation type."""
+        self._strategy_classes[generation_type] = strategy_class
+        self._instances.pop(generation_type, None)
+
+    def load_entry_points(self) -> None:
+        """Register strategies advertised by installed packages."""
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                strategy_class = entry_point.load()
+            except Exception as e:
+                logger.error(f"Failed to load strategy entry point {entry_point.name}: {str(e)}")
+                continue
+            if not (isinstance(strategy_class, type) and issubclass(strategy_class, GenerationStrategy)):
+                logger.error(f"Strategy entry point {entry_point.name} is not a GenerationStrategy subclass")
+                continue
+            logger.info(f"Registered strategy {strategy_class.__name__} for {entry_point.name}")
+            self.register(entry_point.name, strategy_class)
+
+    def get(self, generation_type: str) -> GenerationStrategy:
+        """Return the shared strategy instance for a generation type."""
+        strategy = self._instances.get(generation_type)
+        if strategy is not None:
+            return strategy
+        strategy_class = self._strategy_classes.get(generation_type)
+        if not strategy_class:
+            raise ValidationError(f"No strategy found for generation type: {generation_type}")
+        # Outside of the application lifespan (scripts, tests) strategies are built on first use.
+        strategy = self._instances[generation_type] = strategy_class()
+        return strategy
+
+    async def startup(self) -> None:
+        """Discover, build and warm up all strategies."""
+        if self._started:
+            return
+        self.load_entry_points()
+        for generation_type in self._strategy_classes:
+            self.get(generation_type)
+        await asyncio.gather(*(strategy.warmup() for strategy in self._instances.values()))
+        self._started = True
+
+    async def shutdown(self) -> None:
+        """Close all strategies and drop the instances."""
+        instances = list(self._instances.values())
+        self._instances.clear()
+        self._started = False
+        results = await asyncio.gather(*(strategy.close() for strategy in instances), return_exceptions=True)
+        for strategy, result in zip(instances, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to close strategy {type(strategy).__name__}: {str(result)}")
+
+
+@lru_cache()
+def get_strategy_registry() -> StrategyRegistry:
+    return StrategyRegistry()
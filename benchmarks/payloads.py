@@ -0,0 +1,75 @@
+"""Seeded generator of realistic request mixes for the benchmarks."""
+import random
+from typing import Any, Dict, List
+
+# Share of requests per generation type.
+STRATEGY_MIX = {"claim_discovery": 0.4, "evidence_discovery": 0.4, "default": 0.2}
+# Document sizes in characters and their share of requests.
+CONTENT_SIZES = {2_000: 0.6, 20_000: 0.3, 100_000: 0.1}
+JSON_SHARE = 0.5
+# Extra optional properties of the large output schemas.
+SCHEMA_PROPERTIES = 200
+
+PAYLOAD_FIELDS = {"claim_discovery": "claims", "evidence_discovery": "evidence", "default": "content"}
+
+_SUBJECTS = ["The company", "Revenue", "The study", "Researchers", "The new policy", "Average latency", "The council"]
+_VERBS = ["increased", "reported", "found", "reduced", "announced", "confirmed", "caused"]
+_OBJECTS = ["operating costs", "customer churn", "emissions", "the error rate", "market share", "hospital admissions"]
+_TAILS = ["in 2023", "by 12% last year", "according to the annual report", "since 2019", "compared to 2021"]
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(_SUBJECTS), rng.choice(_VERBS), rng.choice(_OBJECTS), rng.choice(_TAILS)]
+    # A random token keeps sentences from collapsing into near-duplicates.
+    return f"{' '.join(words)} in region {rng.randrange(100000)}."
+
+
+def build_content(rng: random.Random, chars: int) -> str:
+    paragraphs: List[str] = []
+    size = 0
+    while size < chars:
+        paragraph = " ".join(_sentence(rng) for _ in range(rng.randint(3, 8)))
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+
+def build_output_schema(rng: random.Random, field: str) -> Dict[str, Any]:
+    """A large schema: the field the strategy fills plus many optional nested properties."""
+    items = {"type": "string"} if field == "claims" and rng.random() < 0.5 else {"type": "object"}
+    properties: Dict[str, Any] = {
+        field: {"type": "string"} if field == "content" else {"type": "array", "items": items}
+    }
+    for index in range(SCHEMA_PROPERTIES):
+        properties[f"extra_{index}"] = {
+            "type": "object",
+            "properties": {"value": {"type": "string"}, "score": {"type": "number", "minimum": 0}},
+        }
+    return {"type": "object", "properties": properties, "required": [field]}
+
+
+def _choose(rng: random.Random, weights: Dict[Any, float]) -> Any:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def build_payloads(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Build `count` generation requests; the same seed always yields the same mix."""
+    rng = random.Random(seed)
+    payloads = []
+    for _ in range(count):
+        generation_type = _choose(rng, STRATEGY_MIX)
+        content = build_content(rng, _choose(rng, CONTENT_SIZES))
+        parameters: Dict[str, Any] = {"content": content, "query": rng.choice(_OBJECTS)}
+        if generation_type == "evidence_discovery":
+            parameters["claims"] = [_sentence(rng) for _ in range(rng.randint(1, 5))]
+        payload: Dict[str, Any] = {
+            "generation_type": generation_type,
+            "output_type": "text",
+            "search_type": "global",
+            "parameters": parameters,
+        }
+        if rng.random() < JSON_SHARE:
+            payload["output_type"] = "json"
+            payload["output_schema"] = build_output_schema(rng, PAYLOAD_FIELDS[generation_type])
+        payloads.append(payload)
+    return payloads
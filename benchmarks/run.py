@@ -0,0 +1,254 @@
+"""Load benchmark of the generation API against the stub backend.
+
+Replays a seeded mix of requests (all strategies, large documents, large output
+schemas) with a fixed number of concurrent clients and reports throughput and
+latency percentiles. With `--baseline` the run fails when it regresses by more than
+`--tolerance` against the stored numbers of its scenario.
+
+Usage:
+    python -m benchmarks.run --requests 500 --concurrency 32 --baseline benchmarks/baselines.json
+    python -m benchmarks.run --workers 4 --scenario uvicorn-4 --baseline benchmarks/baselines.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from benchmarks.payloads import build_payloads
+from benchmarks.stub_backend import StubBackend, build_stub_service
+
+GENERATE_PATH = "/api/v1/generation/generate"
+HEALTH_PATH = "/api/v1/health"
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class Sample:
+    generation_type: str
+    status_code: int
+    seconds: float
+
+
+def percentile(values: Sequence[float], rank: float) -> float:
+    """Nearest-rank percentile of `values`."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(rank / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def _latency_summary(seconds: Sequence[float]) -> Dict[str, float]:
+    summary = {f"p{rank}": round(percentile(seconds, rank) * 1000, 2) for rank in PERCENTILES}
+    summary["mean"] = round(sum(seconds) / len(seconds) * 1000, 2) if seconds else 0.0
+    return summary
+
+
+def summarize(scenario: str, samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    """Aggregate samples into the report stored as a baseline."""
+    succeeded = [sample for sample in samples if sample.status_code == 200]
+    by_type: Dict[str, List[float]] = {}
+    for sample in succeeded:
+        by_type.setdefault(sample.generation_type, []).append(sample.seconds)
+    return {
+        "scenario": scenario,
+        "requests": len(samples),
+        "errors": len(samples) - len(succeeded),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(succeeded) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": _latency_summary([sample.seconds for sample in succeeded]),
+        "by_generation_type": {
+            generation_type: {"requests": len(seconds), **_latency_summary(seconds)}
+            for generation_type, seconds in sorted(by_type.items())
+        },
+    }
+
+
+def compare(
+    report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, tail_tolerance: Optional[float] = None
+) -> List[str]:
+    """Describe every way `report` is worse than `baseline` by more than `tolerance`.
+
+    p99 rests on a handful of samples, so it is checked against `tail_tolerance`.
+    """
+    regressions = []
+    if report["errors"] > baseline.get("errors", 0):
+        regressions.append(f"errors: {report['errors']} > baseline {baseline.get('errors', 0)}")
+    minimum = baseline["throughput_rps"] * (1 - tolerance)
+    if report["throughput_rps"] < minimum:
+        regressions.append(f"throughput_rps: {report['throughput_rps']} < {minimum:.2f} (baseline {baseline['throughput_rps']})")
+    for name, value in baseline["latency_ms"].items():
+        allowed = tail_tolerance if name == "p99" and tail_tolerance is not None else tolerance
+        maximum = value * (1 + allowed)
+        if report["latency_ms"].get(name, 0.0) > maximum:
+            regressions.append(f"latency_ms.{name}: {report['latency_ms'][name]} > {maximum:.2f} (baseline {value})")
+    return regressions
+
+
+async def replay(client: httpx.AsyncClient, payloads: List[Dict[str, Any]], concurrency: int, tenants: int) -> List[Sample]:
+    """Send every payload with `concurrency` closed-loop clients spread over `tenants` tenants."""
+    samples: List[Sample] = []
+    pending = iter(payloads)
+
+    async def worker(number: int) -> None:
+        # The benchmark measures the service, not the response cache.
+        headers = {"X-API-Key": f"bench-{number % tenants}", "Cache-Control": "no-cache"}
+        for payload in pending:
+            started = time.perf_counter()
+            response = await client.post(GENERATE_PATH, json=payload, headers=headers)
+            samples.append(Sample(payload["generation_type"], response.status_code, time.perf_counter() - started))
+
+    await asyncio.gather(*(worker(number) for number in range(concurrency)))
+    return samples
+
+
+async def run_in_process(
+    payloads: List[Dict[str, Any]], concurrency: int, tenants: int, backend: StubBackend
+) -> Tuple[List[Sample], float]:
+    """Serve the app through an in-memory ASGI transport; returns (samples, elapsed seconds)."""
+    from app.api.v1.routes.generation.dependencies import get_generation_service
+    from app.main import app
+
+    service, registry = build_stub_service(backend)
+    app.dependency_overrides[get_generation_service] = lambda: service
+    await registry.startup()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+            started = time.perf_counter()
+            samples = await replay(client, payloads, concurrency, tenants)
+            return samples, time.perf_counter() - started
+    finally:
+        app.dependency_overrides.pop(get_generation_service, None)
+        await registry.shutdown()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_ready(base_url: str, server: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            try:
+                if (await client.get(HEALTH_PATH)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("uvicorn did not become ready in time")
+
+
+async def run_uvicorn(
+    payloads: List[Dict[str, Any]], concurrency: int, tenants: int, backend: StubBackend, workers: int
+) -> Tuple[List[Sample], float]:
+    """Serve `benchmarks.stub_app` with uvicorn worker processes; returns (samples, elapsed seconds)."""
+    port = _free_port()
+    env = dict(
+        os.environ,
+        BENCH_LATENCY_MS=str(backend.latency * 1000),
+        BENCH_JITTER=str(backend.jitter),
+        BENCH_SEED=str(backend.seed),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.stub_app:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        await _wait_until_ready(base_url, server)
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as client:
+            started = time.perf_counter()
+            samples = await replay(client, payloads, concurrency, tenants)
+            return samples, time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def run_benchmark(
+    scenario: str,
+    requests: int = 200,
+    concurrency: int = 16,
+    tenants: int = 8,
+    latency: float = 0.05,
+    jitter: float = 0.2,
+    seed: int = 0,
+    workers: int = 0,
+) -> Dict[str, Any]:
+    """Run one scenario in-process (`workers=0`) or under uvicorn and return its report."""
+    payloads = build_payloads(requests, seed)
+    backend = StubBackend(latency, jitter, seed)
+    if workers:
+        samples, elapsed = asyncio.run(run_uvicorn(payloads, concurrency, tenants, backend, workers))
+    else:
+        samples, elapsed = asyncio.run(run_in_process(payloads, concurrency, tenants, backend))
+    return summarize(scenario, samples, elapsed)
+
+
+def load_baselines(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the generation API against a stub backend")
+    parser.add_argument("--scenario", help="Baseline key; defaults to in-process or uvicorn-<workers>")
+    parser.add_argument("--requests", type=int, default=200, help="Requests to replay")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--tenants", type=int, default=8, help="Tenants the clients are spread over")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Stub backend latency per request")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency spread as a fraction of the latency")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the payload mix and latencies")
+    parser.add_argument("--workers", type=int, default=0, help="Run under uvicorn with this many workers; 0 runs in-process")
+    parser.add_argument("--baseline", help="JSON file with baseline reports by scenario")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    parser.add_argument("--tail-tolerance", type=float, default=0.5, help="Allowed relative regression of p99 latency")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the scenario's baseline")
+    args = parser.parse_args(argv)
+    # The client logs every request at INFO level.
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    scenario = args.scenario or (f"uvicorn-{args.workers}" if args.workers else "in-process")
+    report = run_benchmark(
+        scenario, args.requests, args.concurrency, args.tenants, args.latency_ms / 1000, args.jitter, args.seed, args.workers
+    )
+    print(json.dumps(report, indent=2))
+    if not args.baseline:
+        return 0
+
+    baselines = load_baselines(args.baseline)
+    if args.update_baseline:
+        baselines[scenario] = report
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2)
+            f.write("\n")
+        return 0
+    if scenario not in baselines:
+        print(f"No baseline for scenario {scenario} in {args.baseline}", file=sys.stderr)
+        return 1
+    regressions = compare(report, baselines[scenario], args.tolerance, args.tail_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Micro-benchmark of the per-request cost of building and serializing generation responses.
+
+Compares the framework path (validated model construction, FastAPI `response_model`
+re-validation and `jsonable_encoder`) with the fast path (`model_construct` plus a
+single pydantic JSON encoding, reused for cached responses) on the benchmark payload mix.
+
+Usage:
+    python -m benchmarks.serialization --requests 50 --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import sys
+import timeit
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.v1.routes.generation.router import json_response
+from app.api.v1.routes.generation.schemas import GenerationRequest, GenerationResponse
+from app.services.generation import GenerationService
+from app.strategies.registry import StrategyRegistry
+from benchmarks.payloads import build_payloads
+
+RESPONSE_FIELD = create_response_field(name="Response_generate_content", type_=GenerationResponse)
+
+
+def _response_fields(count: int, seed: int) -> List[Dict[str, Any]]:
+    """Generate real responses for the payload mix and return their fields."""
+    service = GenerationService(registry=StrategyRegistry())
+
+    async def generate() -> List[GenerationResponse]:
+        requests = [GenerationRequest(**payload) for payload in build_payloads(count, seed)]
+        return [await service.generate_content(request) for request in requests]
+
+    return [dict(response) for response in asyncio.run(generate())]
+
+
+def _run_sync(coroutine: Any) -> Any:
+    # serialize_response never suspends for coroutine endpoints; avoid timing an event loop.
+    try:
+        coroutine.send(None)
+    except StopIteration as e:
+        return e.value
+    raise RuntimeError("coroutine suspended")
+
+
+def framework_path(fields: Dict[str, Any]) -> bytes:
+    response = GenerationResponse(**fields)
+    content = _run_sync(serialize_response(field=RESPONSE_FIELD, response_content=response))
+    return JSONResponse(content).body
+
+
+def fast_path(fields: Dict[str, Any]) -> bytes:
+    return json_response(GenerationResponse.model_construct(**fields)).body
+
+
+def _microseconds(function: Callable[[], Any], repeat: int) -> float:
+    return min(timeit.repeat(function, number=1, repeat=repeat)) * 1e6
+
+
+def run(requests: int = 50, repeat: int = 20, seed: int = 0) -> Dict[str, float]:
+    """Return the mean per-request cost in microseconds of each path."""
+    all_fields = _response_fields(requests, seed)
+    cached = [GenerationResponse.model_construct(**fields) for fields in all_fields]
+    for response in cached:
+        response.json_bytes()
+
+    totals = {"framework_us": 0.0, "fast_us": 0.0, "fast_cached_us": 0.0}
+    for fields, response in zip(all_fields, cached):
+        assert json.loads(framework_path(fields)) == json.loads(fast_path(fields))
+        totals["framework_us"] += _microseconds(lambda: framework_path(fields), repeat)
+        totals["fast_us"] += _microseconds(lambda: fast_path(fields), repeat)
+        totals["fast_cached_us"] += _microseconds(lambda: json_response(response).body, repeat)
+    report = {name: round(total / requests, 1) for name, total in totals.items()}
+    report["speedup"] = round(report["framework_us"] / report["fast_us"], 2)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare response serialization paths")
+    parser.add_argument("--requests", type=int, default=50, help="Responses from the payload mix")
+    parser.add_argument("--repeat", type=int, default=20, help="Timings per response; the fastest is kept")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the payload mix")
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.requests, args.repeat, args.seed), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
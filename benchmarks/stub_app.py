@@ -0,0 +1,37 @@
+"""The service wired to the stub backend, for benchmarks under uvicorn.
+
+    BENCH_LATENCY_MS=50 uvicorn benchmarks.stub_app:app --workers 4
+
+`BENCH_LATENCY_MS`, `BENCH_JITTER` and `BENCH_SEED` configure the stub backend.
+"""
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from app.api.v1.routes.generation.dependencies import get_generation_service
+from app.main import app
+from benchmarks.stub_backend import StubBackend, build_stub_service
+
+backend = StubBackend(
+    latency=float(os.getenv("BENCH_LATENCY_MS", "50")) / 1000,
+    jitter=float(os.getenv("BENCH_JITTER", "0.2")),
+    seed=int(os.getenv("BENCH_SEED", "0")),
+)
+service, registry = build_stub_service(backend)
+app.dependency_overrides[get_generation_service] = lambda: service
+
+_lifespan = app.router.lifespan_context
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the application lifespan and warm up the stubbed strategies."""
+    async with _lifespan(app):
+        await registry.startup()
+        try:
+            yield
+        finally:
+            await registry.shutdown()
+
+app.router.lifespan_context = lifespan
@@ -0,0 +1,56 @@
+"""Deterministic stand-in for the generation backend used by the benchmarks."""
+import asyncio
+import zlib
+from typing import Dict, Optional, Tuple, Type
+
+from app.api.v1.routes.generation.schemas import GenerationRequest, GenerationResponse
+from app.services.cache import canonical_request_key
+from app.services.generation import GenerationService
+from app.strategies.base import GenerationStrategy
+from app.strategies.registry import BUILTIN_STRATEGIES, StrategyRegistry
+
+
+class StubBackend:
+    """Simulates backend calls with a latency that depends only on the request.
+
+    Each call sleeps `latency` seconds, spread by up to `jitter` (a fraction of the
+    latency) according to a hash of the request, so repeated runs see identical delays.
+    """
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.seed = seed
+        self.calls = 0
+
+    def latency_for(self, key: str) -> float:
+        fraction = zlib.crc32(key.encode("utf-8"), self.seed) / 0xFFFFFFFF
+        return max(0.0, self.latency * (1 + self.jitter * (2 * fraction - 1)))
+
+    async def complete(self, key: str) -> None:
+        self.calls += 1
+        await asyncio.sleep(self.latency_for(key))
+
+
+def stub_strategy(strategy_class: Type[GenerationStrategy], backend: StubBackend) -> Type[GenerationStrategy]:
+    """Subclass a strategy so that every generation also waits for a stub backend call."""
+
+    class StubbedStrategy(strategy_class):
+        async def generate(self, request: GenerationRequest) -> GenerationResponse:
+            response = await super().generate(request)
+            await backend.complete(canonical_request_key(request))
+            return response
+
+    StubbedStrategy.__name__ = f"Stubbed{strategy_class.__name__}"
+    return StubbedStrategy
+
+
+def build_stub_service(
+    backend: StubBackend, strategy_classes: Optional[Dict[str, Type[GenerationStrategy]]] = None
+) -> Tuple[GenerationService, StrategyRegistry]:
+    """Build a generation service, without response cache, whose strategies call `backend`."""
+    registry = StrategyRegistry({
+        generation_type: stub_strategy(strategy_class, backend)
+        for generation_type, strategy_class in (strategy_classes or BUILTIN_STRATEGIES).items()
+    })
+    return GenerationService(registry=registry), registry
@@ -0,0 +1,64 @@
+"""Local HTTP stand-in for a generation backend, for tests and benchmarks of `BackendClient`.
+
+    BENCH_LATENCY_MS=50 uvicorn benchmarks.stub_server:app --port 9000
+    BACKEND_URLS=default=http://127.0.0.1:9000 uvicorn app.main:app
+
+Each completion waits the stub backend latency of its prompt (see `StubBackend`); a
+batched completion waits once for all of its prompts, like a batching model server.
+Tests can script the next responses, e.g. two 503s followed by a slow answer.
+"""
+import asyncio
+import os
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from app.services.backend import BATCH_COMPLETIONS_PATH, COMPLETIONS_PATH
+from benchmarks.stub_backend import StubBackend
+
+# (status code, extra delay in seconds) of a scripted response.
+ScriptedResponse = Tuple[int, float]
+
+
+def create_stub_server(backend: StubBackend, script: Optional[Iterable[ScriptedResponse]] = None) -> FastAPI:
+    """Build a stub backend app; `script` lists responses to return before behaving normally."""
+    app = FastAPI(title="Stub generation backend")
+    scripted: Deque[ScriptedResponse] = deque(script or ())
+    app.state.backend = backend
+    app.state.script = scripted
+
+    async def respond(key: str) -> Optional[JSONResponse]:
+        status_code, delay = scripted.popleft() if scripted else (200, 0.0)
+        await backend.complete(key)
+        if delay:
+            await asyncio.sleep(delay)
+        if status_code != 200:
+            return JSONResponse({"detail": "scripted failure"}, status_code=status_code, headers={"Retry-After": "0"})
+        return None
+
+    @app.post(COMPLETIONS_PATH)
+    async def complete(payload: Dict[str, Any]) -> JSONResponse:
+        prompt = payload.get("prompt", "")
+        failure = await respond(prompt)
+        return failure or JSONResponse({"text": _completion(prompt), "model": "stub"})
+
+    @app.post(BATCH_COMPLETIONS_PATH)
+    async def complete_batch(payload: Dict[str, Any]) -> JSONResponse:
+        prompts = payload.get("prompts", [])
+        failure = await respond("\n".join(prompts))
+        return failure or JSONResponse({"texts": [_completion(prompt) for prompt in prompts], "model": "stub"})
+
+    return app
+
+
+def _completion(prompt: str) -> str:
+    return f"Stub completion of {len(prompt)} characters: {prompt[:64]}"
+
+
+app = create_stub_server(StubBackend(
+    latency=float(os.getenv("BENCH_LATENCY_MS", "50")) / 1000,
+    jitter=float(os.getenv("BENCH_JITTER", "0.2")),
+    seed=int(os.getenv("BENCH_SEED", "0")),
+))
@@ -0,0 +1,218 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1.routes.generation.dependencies import get_admission_controller
+from app.api.v1.routes.generation.router import generate_content_stream
+from app.api.v1.routes.generation.schemas import GenerationRequest, StreamFormat
+from app.core.config import parse_limits, settings
+from app.core.exceptions import ServiceUnavailableError, TooManyRequestsError
+from app.main import app
+from app.services.generation import GenerationService
+from app.services.admission import AdmissionController, TokenBucket, tenant_id
+
+client = TestClient(app)
+
+
+def _controller(**kwargs):
+    options = dict(max_concurrency=1, tenant_concurrency=10, type_concurrency={}, tenant_rate=0, type_rates={},
+                   tenant_weights={}, max_queue_seconds=5, enabled=True)
+    options.update(kwargs)
+    return AdmissionController(**options)
+
+
+async def _drain(controller, waiters, order):
+    """Release slots one by one and record which waiter got each of them."""
+    while any(not task.done() for task, _ in waiters):
+        await asyncio.sleep(0)
+        for task, name in waiters:
+            if task.done() and name not in order:
+                order.append(name)
+                controller.release(name.split("-")[0], "default")
+                break
+
+
+def test_token_bucket_and_limits_parsing():
+    """Test token bucket refill and configuration parsing."""
+    now = [0.0]
+    bucket = TokenBucket(rate=2, burst=2, clock=lambda: now[0])
+    assert bucket.take() == 0 and bucket.take() == 0
+    assert bucket.take() == pytest.approx(0.5)
+    now[0] += 0.5
+    assert bucket.take() == 0
+
+    assert parse_limits("claim_discovery=8, batch=2.5,") == {"claim_discovery": 8.0, "batch": 2.5}
+    assert tenant_id("acme", "secret") == tenant_id(None, "secret")
+    assert tenant_id("acme", "secret", trusted=True) == "acme"
+    assert tenant_id(None, "secret").startswith("key:")
+    assert "secret" not in tenant_id(None, "secret")
+    assert tenant_id(None, None) == "anonymous"
+
+
+def test_rate_limits_per_tenant_and_type():
+    """Test that exhausted token buckets reject with 429 and Retry-After."""
+    controller = _controller(tenant_rate=1, tenant_burst=2, type_rates={"claim_discovery": 0.5})
+    controller.check_rate("a", "default", cost=2)
+    with pytest.raises(TooManyRequestsError) as error:
+        controller.check_rate("a", "default")
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == "1"
+    controller.check_rate("b", "default")
+
+    controller.check_rate("c", "claim_discovery")
+    with pytest.raises(TooManyRequestsError):
+        controller.check_rate("d", "claim_discovery")
+
+
+def test_rejected_requests_keep_no_tokens():
+    """Test that requests rejected by a type bucket or shed from the queue are refunded their tokens."""
+    controller = _controller(tenant_rate=1, tenant_burst=2, type_rates={"claim_discovery": 0.5})
+    controller.check_rate("a", "claim_discovery")
+    with pytest.raises(TooManyRequestsError):
+        controller.check_rate("a", "claim_discovery")
+    controller.check_rate("a", "default")
+
+    async def run():
+        shedding = _controller(tenant_rate=1, tenant_burst=2, max_queue_seconds=0.01, max_queued=1)
+        await shedding.acquire("a", "default")
+        with pytest.raises(ServiceUnavailableError):
+            await shedding.acquire("b", "default")
+        with pytest.raises(ServiceUnavailableError):
+            await shedding.acquire("b", "default")
+        shedding.check_rate("b", "default", cost=2)
+
+    asyncio.run(run())
+
+    with pytest.raises(ValueError):
+        _controller(tenant_weights={"gold": 0})
+
+
+def test_fair_queuing_between_tenants():
+    """Test that a flooding tenant does not delay other tenants, and weights are honoured."""
+    async def run(weights, arrivals):
+        controller = _controller(tenant_weights=weights)
+        await controller.acquire("holder", "default")
+        waiters = []
+        for name in arrivals:
+            waiters.append((asyncio.create_task(controller.acquire(name.split("-")[0], "default")), name))
+            await asyncio.sleep(0)
+        order = []
+        controller.release("holder", "default")
+        await _drain(controller, waiters, order)
+        return order
+
+    order = asyncio.run(run({}, [f"noisy-{number}" for number in range(10)] + ["interactive-0"]))
+    assert order.index("interactive-0") <= 1
+
+    arrivals = [f"bronze-{number}" for number in range(8)] + [f"gold-{number}" for number in range(8)]
+    order = asyncio.run(run({"gold": 3}, arrivals))
+    assert sum(name.startswith("gold") for name in order[:8]) == 6
+
+
+def test_tenant_concurrency_and_queue_budget():
+    """Test per-tenant concurrency limits and shedding once the queue-time budget is exceeded."""
+    async def run():
+        controller = _controller(max_concurrency=4, tenant_concurrency=1, max_queue_seconds=0.05)
+        await controller.acquire("a", "default")
+        await asyncio.wait_for(controller.acquire("b", "default"), 0.01)
+        with pytest.raises(ServiceUnavailableError) as error:
+            await controller.acquire("a", "default")
+        stats = controller.stats()
+        controller.release("a", "default")
+        await asyncio.wait_for(controller.acquire("a", "default"), 0.01)
+        return error.value, stats
+
+    error, stats = asyncio.run(run())
+    assert error.status_code == 503
+    assert int(error.headers["Retry-After"]) >= 1
+    assert stats["shed"] == 1
+    assert stats["waiting"] == 0
+
+
+def test_generate_endpoint_rate_limited_per_tenant():
+    """Test that /generate answers 429 with Retry-After for a tenant over its rate."""
+    app.dependency_overrides[get_admission_controller] = lambda: controller
+    controller = _controller(max_concurrency=8, tenant_rate=0.1, tenant_burst=1)
+    request_data = {"generation_type": "default", "output_type": "text", "parameters": {"content": "Hello"}}
+    try:
+        assert client.post("/api/v1/generation/generate", json=request_data, headers={"X-API-Key": "a"}).status_code == 200
+        response = client.post("/api/v1/generation/generate", json=request_data, headers={"X-API-Key": "a"})
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        # A tenant header from an untrusted client does not buy a fresh bucket.
+        response = client.post(
+            "/api/v1/generation/generate", json=request_data, headers={"X-API-Key": "a", "X-Tenant-ID": "fresh"}
+        )
+        assert response.status_code == 429
+        assert client.post("/api/v1/generation/generate", json=request_data, headers={"X-API-Key": "k"}).status_code == 200
+        stream = client.post("/api/v1/generation/generate/stream", json=request_data, headers={"X-API-Key": "b"})
+        assert stream.status_code == 200
+        assert controller.stats()["active"] == 0
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_batch_items_charged_and_admitted_per_generation_type():
+    """Test that batch items use their own type's rate limits and slots, and oversized batches are rejected."""
+    controller = _controller(max_concurrency=8, tenant_rate=0.1, tenant_burst=3, type_rates={"claim_discovery": 1})
+    app.dependency_overrides[get_admission_controller] = lambda: controller
+
+    def item(generation_type):
+        return {"generation_type": generation_type, "output_type": "text", "parameters": {"content": "Revenue grew by 12%."}}
+
+    try:
+        response = client.post(
+            "/api/v1/generation/generate/batch", json={"items": [item("claim_discovery")] * 3}, headers={"X-API-Key": "a"}
+        )
+        assert response.status_code == 400
+        assert "exceed the rate limit burst" in response.json()["detail"]
+
+        items = [item("claim_discovery"), item("claim_discovery"), item("default")]
+        response = client.post("/api/v1/generation/generate/batch", json={"items": items}, headers={"X-API-Key": "a"})
+        assert response.status_code == 200
+        assert all(result["error"] is None for result in response.json()["results"])
+        assert controller.stats()["admitted"] == 3 and controller.stats()["active"] == 0
+        with pytest.raises(TooManyRequestsError):
+            controller.check_rate("b", "claim_discovery")
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_stream_slot_released_when_the_body_never_runs():
+    """Test that a stream whose client disconnects before the response starts gives its slot back."""
+    controller = _controller(max_concurrency=8)
+    request = GenerationRequest(generation_type="default", output_type="text", parameters={"content": "Hello"})
+    sent = []
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        await asyncio.sleep(1)
+        sent.append(message)
+
+    async def run():
+        response = await generate_content_stream(request, StreamFormat.SSE, GenerationService(), "a", controller, None)
+        assert controller.stats()["active"] == 1
+        await response({"type": "http"}, receive, send)
+
+    asyncio.run(run())
+    assert not sent
+    assert controller.stats()["active"] == 0
+
+
+def test_tenant_header_honoured_from_trusted_proxies(monkeypatch):
+    """Test that only trusted proxies can assign requests to tenants with `X-Tenant-ID`."""
+    controller = _controller(max_concurrency=8, tenant_rate=0.1, tenant_burst=1)
+    app.dependency_overrides[get_admission_controller] = lambda: controller
+    request_data = {"generation_type": "default", "output_type": "text", "parameters": {"content": "Hello"}}
+    monkeypatch.setattr(settings, "ADMISSION_TRUSTED_PROXIES", "gateway, testclient")
+    try:
+        for tenant in ("a", "b"):
+            response = client.post("/api/v1/generation/generate", json=request_data, headers={"X-Tenant-ID": tenant})
+            assert response.status_code == 200
+        assert client.post("/api/v1/generation/generate", json=request_data, headers={"X-Tenant-ID": "a"}).status_code == 429
+        assert controller.stats()["tenants"] == 2
+    finally:
+        app.dependency_overrides.clear()
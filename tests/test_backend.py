@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.api.v1.routes.generation.schemas import GenerationRequest, GenerationType, OutputType, SearchType
+from app.core.exceptions import BackendError, BackendTimeoutError, GenerationError
+from app.services.backend import BackendClient, BackendPool, parse_backends
+from app.strategies import base
+from app.strategies.default import DefaultStrategy
+from benchmarks.stub_backend import StubBackend
+from benchmarks.stub_server import create_stub_server
+
+
+def _client(script=(), latency=0.0, **kwargs):
+    server = create_stub_server(StubBackend(latency=latency), script)
+    options = dict(retries=2, backoff=0.001, backoff_max=0.01, timeout=5, hedge=False)
+    options.update(kwargs)
+    return BackendClient("http://stub", transport=httpx.ASGITransport(app=server), **options)
+
+
+def test_complete_returns_backend_text():
+    """Test that a completion is sent to the stub server and its text returned."""
+    async def run():
+        client = _client()
+        try:
+            return await client.complete("Summarize the report"), client.stats()
+        finally:
+            await client.close()
+
+    text, stats = asyncio.run(run())
+    assert text.startswith("Stub completion of 20 characters")
+    assert stats["calls"] == 1 and stats["retries"] == 0
+
+
+def test_transient_failures_are_retried():
+    """Test that 503 and 429 responses are retried until a call succeeds."""
+    async def run():
+        client = _client(script=[(503, 0), (429, 0)])
+        try:
+            return await client.complete("prompt"), client.stats()
+        finally:
+            await client.close()
+
+    text, stats = asyncio.run(run())
+    assert text
+    assert stats["calls"] == 3 and stats["retries"] == 2
+
+
+def test_exhausted_retries_and_client_errors_fail():
+    """Test that persistent failures raise 502, timeouts 504, and 4xx responses are not retried."""
+    async def run(script, **kwargs):
+        client = _client(script=script, **kwargs)
+        try:
+            with pytest.raises((BackendError, BackendTimeoutError)) as error:
+                await client.complete("prompt")
+            return error.value, client.stats()
+        finally:
+            await client.close()
+
+    error, stats = asyncio.run(run([(500, 0)] * 3))
+    assert error.status_code == 502 and stats["calls"] == 3
+
+    error, stats = asyncio.run(run([(200, 1.0)] * 2, retries=1, timeout=0.05))
+    assert error.status_code == 504 and stats["calls"] == 2
+
+    error, stats = asyncio.run(run([(400, 0)]))
+    assert error.status_code == 502 and stats["calls"] == 1
+
+
+def test_slow_call_is_hedged():
+    """Test that a call slower than the recent p95 is duplicated and the faster answer wins."""
+    async def run():
+        server = create_stub_server(StubBackend(latency=0.01))
+        client = BackendClient(
+            "http://stub", transport=httpx.ASGITransport(app=server), hedge=True, hedge_min_samples=5, retries=0
+        )
+        try:
+            for _ in range(5):
+                await client.complete("warmup")
+            server.state.script.append((200, 1.0))
+            started = time.perf_counter()
+            await client.complete("slow")
+            return time.perf_counter() - started, client.stats()
+        finally:
+            await client.close()
+
+    elapsed, stats = asyncio.run(run())
+    assert elapsed < 0.5
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+
+
+def test_pool_sizes_clients_per_backend():
+    """Test that the pool builds one shared client per configured backend with its own limit."""
+    assert parse_backends("default=http://a:1, fast=http://b:2") == {"default": "http://a:1", "fast": "http://b:2"}
+    pool = BackendPool({"default": "http://a:1", "fast": "http://b:2"}, {"fast": 4})
+    assert pool.get("default") is pool.get("default")
+    assert pool.get("fast").max_connections == 4
+    with pytest.raises(GenerationError):
+        pool.get("missing")
+    asyncio.run(pool.close())
+
+
+def test_default_strategy_generates_through_backend(monkeypatch):
+    """Test that default generation sends its packed context to the configured backend and returns the completion."""
+    server = create_stub_server(StubBackend(latency=0.0))
+    pool = BackendPool({"default": "http://stub"}, transport=httpx.ASGITransport(app=server))
+    monkeypatch.setattr(base, "get_backend_pool", lambda: pool)
+    strategy = DefaultStrategy()
+    request = GenerationRequest(
+        generation_type=GenerationType.DEFAULT,
+        output_type=OutputType.TEXT,
+        search_type=SearchType.GLOBAL,
+        parameters={"content": "Revenue grew by 20% in 2023.", "query": "revenue"},
+    )
+
+    async def run():
+        try:
+            return await strategy.generate(request), pool.get().stats()
+        finally:
+            await pool.close()
+
+    response, stats = asyncio.run(run())
+    assert response.content.startswith("Stub completion of ")
+    assert "Revenue grew by 20% in 2023." in response.content
+    assert stats["calls"] == 1
+    assert strategy.fingerprint.endswith(":backend")
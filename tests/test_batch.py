@@ -0,0 +1,101 @@
+from fastapi.testclient import TestClient
+
+from app.api.v1.routes.generation.schemas import GenerationType, OutputType, SearchType
+from app.main import app
+
+client = TestClient(app)
+
+
+def _item(generation_type, parameters):
+    return {
+        "generation_type": generation_type,
+        "output_type": OutputType.TEXT,
+        "search_type": SearchType.GLOBAL,
+        "parameters": parameters,
+    }
+
+
+def test_generate_batch_preserves_order():
+    """Test that batch results are returned in input order."""
+    request_data = {
+        "items": [
+            _item(GenerationType.DEFAULT, {"content": "First document"}),
+            _item(GenerationType.CLAIM_DISCOVERY, {"content": "Second document"}),
+            _item(GenerationType.EVIDENCE_DISCOVERY, {"content": "Third document", "claim": "A claim"}),
+        ],
+        "max_concurrency": 2,
+    }
+
+    response = client.post("/api/v1/generation/generate/batch", json=request_data)
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert [result["response"]["metadata"]["generation_type"] for result in results] == [
+        GenerationType.DEFAULT,
+        GenerationType.CLAIM_DISCOVERY,
+        GenerationType.EVIDENCE_DISCOVERY,
+    ]
+    assert all(result["error"] is None for result in results)
+
+
+def test_generate_batch_reports_item_errors():
+    """Test that a failing item does not fail the whole batch."""
+    request_data = {
+        "items": [
+            _item(GenerationType.DEFAULT, {"content": "Valid document"}),
+            _item(GenerationType.EVIDENCE_DISCOVERY, {"content": "Missing claim"}),
+        ]
+    }
+
+    response = client.post("/api/v1/generation/generate/batch", json=request_data)
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert results[0]["response"] is not None
+    assert results[0]["error"] is None
+    assert results[1]["response"] is None
+    assert results[1]["error"]["status_code"] == 400
+    assert "Claim is required" in results[1]["error"]["detail"]
+
+
+def test_generate_batch_reports_invalid_items_in_their_slot():
+    """Test that an item failing request validation fails alone instead of the whole batch."""
+    request_data = {
+        "items": [
+            _item(GenerationType.DEFAULT, {"content": "Valid document"}),
+            {**_item(GenerationType.DEFAULT, {"content": "Bad output type"}), "output_type": "yaml"},
+        ]
+    }
+
+    response = client.post("/api/v1/generation/generate/batch", json=request_data)
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert results[0]["response"] is not None
+    assert results[1]["response"] is None
+    assert results[1]["error"]["status_code"] == 422
+    assert "output_type" in results[1]["error"]["detail"]
+
+
+def test_generate_batch_requires_items():
+    """Test that an empty batch is rejected."""
+    response = client.post("/api/v1/generation/generate/batch", json={"items": []})
+    assert response.status_code == 422
+
+
+def test_generate_batch_item_limit(monkeypatch):
+    """Test that batches above the configured size are rejected."""
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "BATCH_MAX_ITEMS", 1)
+    request_data = {
+        "items": [
+            _item(GenerationType.DEFAULT, {"content": "One"}),
+            _item(GenerationType.DEFAULT, {"content": "Two"}),
+        ]
+    }
+
+    response = client.post("/api/v1/generation/generate/batch", json=request_data)
+    assert response.status_code == 400
+    assert "exceeds the limit" in response.json()["detail"]
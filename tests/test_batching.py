@@ -0,0 +1,158 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.api.v1.routes.generation.schemas import GenerationRequest, GenerationType, OutputType, SearchType
+from app.core.config import settings
+from app.core.exceptions import BackendError
+from app.services.backend import BackendClient, BackendPool
+from app.services.batching import MicroBatcher
+from app.services.generation import GenerationService
+from app.strategies import base
+from app.strategies.default import DefaultStrategy
+from app.strategies.registry import StrategyRegistry
+from benchmarks.stub_backend import StubBackend
+from benchmarks.stub_server import create_stub_server
+
+
+def _client(backend, script=(), **kwargs):
+    server = create_stub_server(backend, script)
+    options = dict(retries=0, timeout=5, hedge=False, batch=True, batch_max_items=4, batch_max_wait=0.02)
+    options.update(kwargs)
+    return BackendClient("http://stub", transport=httpx.ASGITransport(app=server), **options)
+
+
+def test_concurrent_completions_are_batched():
+    """Test that concurrent calls are sent in batches of at most `max_items` and split back in order."""
+    backend = StubBackend(latency=0.01)
+
+    async def run():
+        client = _client(backend)
+        try:
+            prompts = [f"prompt {index}" for index in range(10)]
+            texts = await asyncio.gather(*(client.complete(prompt) for prompt in prompts))
+            return prompts, texts, client.stats()
+        finally:
+            await client.close()
+
+    prompts, texts, stats = asyncio.run(run())
+    assert [text.split(": ", 1)[1] for text in texts] == prompts
+    assert backend.calls == 3
+    assert stats["batches"] == 3 and stats["batched"] == 10 and stats["calls"] == 3
+
+
+def test_calls_with_different_parameters_are_not_batched_together():
+    """Test that only calls with equal parameters share a batch, and a lone call is sent unbatched."""
+    backend = StubBackend(latency=0.0)
+
+    async def run():
+        client = _client(backend)
+        try:
+            await asyncio.gather(
+                client.complete("a", temperature=0.1),
+                client.complete("b", temperature=0.1),
+                client.complete("c", temperature=0.9),
+            )
+            return client.stats()
+        finally:
+            await client.close()
+
+    stats = asyncio.run(run())
+    assert stats["batches"] == 2 and stats["batched"] == 3
+
+
+def test_cancelled_callers_leave_their_batch():
+    """Test that callers cancelled before dispatch are dropped, and a batch with no callers left is cancelled."""
+    async def send(items, parameters):
+        await asyncio.sleep(10)
+
+    async def run():
+        backend = StubBackend(latency=0.0)
+        client = _client(backend, batch_max_wait=0.05)
+        try:
+            kept = asyncio.ensure_future(client.complete("kept"))
+            dropped = asyncio.ensure_future(client.complete("dropped"))
+            await asyncio.sleep(0)
+            dropped.cancel()
+            text = await kept
+            stats = client.stats()
+        finally:
+            await client.close()
+
+        batcher = MicroBatcher(send, max_items=2, max_wait=1.0)
+        callers = [asyncio.ensure_future(batcher.submit(item, {})) for item in ("a", "b")]
+        await asyncio.sleep(0.01)
+        assert batcher.stats()["in_flight"] == 1
+        for caller in callers:
+            caller.cancel()
+        await asyncio.sleep(0.01)
+        return text, stats, batcher.stats()
+
+    text, stats, batcher_stats = asyncio.run(run())
+    assert text.endswith(": kept")
+    assert stats["batched"] == 1 and stats["abandoned"] == 1
+    assert batcher_stats["in_flight"] == 0
+
+
+def test_batch_failure_reaches_every_caller():
+    """Test that a failed batched call raises in each of its callers."""
+    async def run():
+        client = _client(StubBackend(latency=0.0), script=[(400, 0)])
+        try:
+            return await asyncio.gather(client.complete("a"), client.complete("b"), return_exceptions=True)
+        finally:
+            await client.close()
+
+    results = asyncio.run(run())
+    assert len(results) == 2 and all(isinstance(result, BackendError) for result in results)
+
+
+def test_batcher_requires_a_result_per_item():
+    """Test that a batched response with a missing completion is rejected."""
+    async def run():
+        client = _client(StubBackend(latency=0.0))
+        client._client.post = _short_response
+        try:
+            with pytest.raises(BackendError):
+                await client.complete_many(["a", "b"])
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+
+
+async def _short_response(path, json, headers=None):
+    return httpx.Response(200, json={"texts": ["only one"]})
+
+
+def test_concurrent_generation_requests_share_backend_batches(monkeypatch):
+    """Test that concurrent default generation requests are batched into few backend calls."""
+    monkeypatch.setattr(settings, "BACKEND_BATCH_ENABLED", True)
+    monkeypatch.setattr(settings, "BACKEND_BATCH_MAX_ITEMS", 4)
+    # Full batches are sent right away; the long wait keeps slow thread scheduling from splitting them.
+    monkeypatch.setattr(settings, "BACKEND_BATCH_MAX_WAIT_MS", 1000)
+    backend = StubBackend(latency=0.01)
+    pool = BackendPool({"default": "http://stub"}, transport=httpx.ASGITransport(app=create_stub_server(backend)))
+    monkeypatch.setattr(base, "get_backend_pool", lambda: pool)
+    service = GenerationService(registry=StrategyRegistry({GenerationType.DEFAULT: DefaultStrategy}))
+    requests = [
+        GenerationRequest(
+            generation_type=GenerationType.DEFAULT,
+            output_type=OutputType.TEXT,
+            search_type=SearchType.GLOBAL,
+            parameters={"content": f"Document {number} about revenue."},
+        )
+        for number in range(8)
+    ]
+
+    async def run():
+        try:
+            responses = await asyncio.gather(*(service.generate_content(request) for request in requests))
+            return responses, pool.get().stats()
+        finally:
+            await pool.close()
+
+    responses, stats = asyncio.run(run())
+    assert [f"Document {number} " in response.content for number, response in enumerate(responses)] == [True] * 8
+    assert backend.calls == stats["batches"] == 2 and stats["batched"] == 8
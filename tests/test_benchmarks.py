@@ -0,0 +1,45 @@
+import asyncio
+
+from benchmarks.payloads import build_payloads
+from benchmarks.run import compare, percentile, run_benchmark
+from benchmarks.stub_backend import StubBackend
+
+
+def test_payload_mix_is_deterministic():
+    """Test that the same seed yields the same payloads covering every strategy."""
+    payloads = build_payloads(30, seed=3)
+    assert payloads == build_payloads(30, seed=3)
+    assert {payload["generation_type"] for payload in payloads} == {"claim_discovery", "evidence_discovery", "default"}
+    assert any(payload["output_type"] == "json" for payload in payloads)
+
+
+def test_stub_backend_latency_depends_only_on_request():
+    """Test that stub latencies are reproducible and stay within the jitter range."""
+    backend = StubBackend(latency=0.1, jitter=0.5, seed=1)
+    latencies = [backend.latency_for(f"request-{index}") for index in range(100)]
+    assert latencies == [StubBackend(0.1, 0.5, 1).latency_for(f"request-{index}") for index in range(100)]
+    assert all(0.05 <= latency <= 0.15 for latency in latencies)
+    asyncio.run(backend.complete("request-0"))
+    assert backend.calls == 1
+
+
+def test_in_process_benchmark_reports_percentiles():
+    """Test that an in-process run serves every request and reports latency percentiles."""
+    report = run_benchmark("test", requests=12, concurrency=4, latency=0.001)
+    assert report["requests"] == 12
+    assert report["errors"] == 0
+    assert report["throughput_rps"] > 0
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p95"] <= report["latency_ms"]["p99"]
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    """Test that throughput drops, latency increases and new errors past the tolerance are reported."""
+    baseline = {"errors": 0, "throughput_rps": 100.0, "latency_ms": {"p50": 10.0, "p99": 50.0}}
+    within = {"errors": 0, "throughput_rps": 90.0, "latency_ms": {"p50": 11.0, "p99": 55.0}}
+    assert compare(within, baseline, tolerance=0.2) == []
+
+    worse = {"errors": 2, "throughput_rps": 70.0, "latency_ms": {"p50": 10.0, "p99": 80.0}}
+    regressions = compare(worse, baseline, tolerance=0.2)
+    assert len(regressions) == 3
+    assert compare(worse, baseline, tolerance=0.2, tail_tolerance=0.8) == regressions[:2]
+    assert percentile([1, 2, 3, 4], 50) == 2 and percentile([1, 2, 3, 4], 99) == 4
@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+import pytest
+
+from app.bulk import Checkpoint, merge_shards, run_bulk, shard_path
+from app.services.generation import GenerationService
+
+
+class Interrupted(Exception):
+    pass
+
+
+class InterruptingService(GenerationService):
+    """Generation service that fails hard after a number of items, like a killed process."""
+
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+
+    async def generate_item(self, index, request, use_cache=True):
+        if self.limit == 0:
+            raise Interrupted()
+        self.limit -= 1
+        await asyncio.sleep(0.001 * (index % 3))
+        return await super().generate_item(index, request, use_cache)
+
+
+def _write_input(path, count):
+    lines = []
+    for number in range(count):
+        if number % 10 == 7:
+            lines.append('{"generation_type": "unknown"}')
+        else:
+            lines.append(json.dumps({
+                "generation_type": "default",
+                "output_type": "text",
+                "parameters": {"content": f"item {number}"},
+            }))
+    lines.insert(5, "")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _read_output(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_run_bulk_ordered(tmp_path):
+    """Test that results are written in input order with per-line errors."""
+    source, target = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_input(source, 40)
+
+    stats = asyncio.run(run_bulk(GenerationService(), str(source), str(target), concurrency=4))
+    results = _read_output(target)
+    assert [result["index"] for result in results] == [number for number in range(41) if number != 5]
+    assert stats.processed == 40
+    assert stats.failed == 4
+    by_index = {result["index"]: result for result in results}
+    assert by_index[8]["error"]["status_code"] == 422
+    assert results[0]["response"]["content"]
+    assert Checkpoint.load(f"{target}.checkpoint").complete
+
+
+def test_run_bulk_unordered_resume_after_interruption(tmp_path):
+    """Test that an interrupted unordered run resumes without losing or repeating lines."""
+    source, target = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_input(source, 60)
+
+    with pytest.raises(Interrupted):
+        asyncio.run(run_bulk(
+            InterruptingService(25), str(source), str(target), concurrency=4, ordered=False, checkpoint_interval=3
+        ))
+    checkpoint = Checkpoint.load(f"{target}.checkpoint")
+    assert not checkpoint.complete
+    assert checkpoint.output_bytes == target.stat().st_size
+    written = len(_read_output(target))
+    assert 0 < written < 60
+
+    stats = asyncio.run(run_bulk(GenerationService(), str(source), str(target), ordered=False, resume=True))
+    indexes = [result["index"] for result in _read_output(target)]
+    assert sorted(indexes) == [number for number in range(61) if number != 5]
+    assert stats.processed == 60 - written
+
+    assert asyncio.run(run_bulk(GenerationService(), str(source), str(target), resume=True)).processed == 0
+
+
+def test_sharded_outputs_merge_in_order(tmp_path):
+    """Test that shard outputs are merged back into input order."""
+    source, target = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_input(source, 30)
+    for shard in range(3):
+        asyncio.run(run_bulk(
+            GenerationService(), str(source), shard_path(str(target), shard), concurrency=2, shard=shard, shards=3
+        ))
+
+    merge_shards(str(target), 3, ordered=True)
+    assert [result["index"] for result in _read_output(target)] == [number for number in range(31) if number != 5]
+    assert not (tmp_path / "out.jsonl.shard0").exists()
@@ -0,0 +1,223 @@
+import asyncio
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.api.v1.routes.generation.schemas import (
+    GenerationRequest,
+    GenerationResponse,
+    GenerationType,
+    OutputType,
+    SearchType,
+)
+from app.main import app
+from app.services.cache import ResponseCache, SharedResponseCache, canonical_request_key
+
+client = TestClient(app)
+
+
+def _request(parameters):
+    return GenerationRequest(
+        generation_type=GenerationType.DEFAULT,
+        output_type=OutputType.TEXT,
+        search_type=SearchType.GLOBAL,
+        parameters=parameters,
+    )
+
+
+def _response(content):
+    return GenerationResponse(content=content, metadata={}, generation_parameters={})
+
+
+def test_canonical_request_key_ignores_key_order():
+    """Test that dict key order does not change the cache key."""
+    first = _request({"content": "Doc", "options": {"a": 1, "b": 2}})
+    second = _request({"options": {"b": 2, "a": 1}, "content": "Doc"})
+    third = _request({"content": "Other doc"})
+
+    assert canonical_request_key(first) == canonical_request_key(second)
+    assert canonical_request_key(first) != canonical_request_key(third)
+
+
+def test_response_cache_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = ResponseCache(max_entries=2, max_bytes=1_000_000, ttl_seconds=60)
+    cache.put("a", _response("a"))
+    cache.put("b", _response("b"))
+    assert cache.get("a") is not None
+    cache.put("c", _response("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_response_cache_ttl_expiry():
+    """Test that entries expire after their TTL."""
+    now = [0.0]
+    cache = ResponseCache(max_entries=10, max_bytes=1_000_000, ttl_seconds=5, clock=lambda: now[0])
+    cache.put("a", _response("a"))
+    assert cache.get("a") is not None
+
+    now[0] = 6.0
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_response_cache_single_flight():
+    """Test that concurrent identical requests run the computation once."""
+    cache = ResponseCache(max_entries=10, max_bytes=1_000_000, ttl_seconds=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return _response("shared")
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_compute("key", compute) for _ in range(5)))
+
+    responses = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(response.content == "shared" for response in responses)
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_response_cache_does_not_store_failures():
+    """Test that failed computations are not cached."""
+    cache = ResponseCache(max_entries=10, max_bytes=1_000_000, ttl_seconds=60)
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def run():
+        try:
+            await cache.get_or_compute("key", fail)
+        except RuntimeError:
+            pass
+        return await cache.get_or_compute("key", lambda: asyncio.sleep(0, result=_response("ok")))
+
+    assert asyncio.run(run()).content == "ok"
+
+
+def test_generate_cache_hit_and_bypass():
+    """Test cache hits over HTTP and the Cache-Control bypass."""
+    request_data = {
+        "generation_type": GenerationType.DEFAULT,
+        "output_type": OutputType.TEXT,
+        "search_type": SearchType.GLOBAL,
+        "parameters": {"content": "Cache test content"},
+    }
+
+    before = client.get("/api/v1/generation/cache/stats").json()
+    assert client.post("/api/v1/generation/generate", json=request_data).status_code == 200
+    assert client.post("/api/v1/generation/generate", json=request_data).status_code == 200
+    after_hit = client.get("/api/v1/generation/cache/stats").json()
+    assert after_hit["hits"] == before["hits"] + 1
+
+    response = client.post(
+        "/api/v1/generation/generate", json=request_data, headers={"Cache-Control": "no-cache"}
+    )
+    assert response.status_code == 200
+    after_bypass = client.get("/api/v1/generation/cache/stats").json()
+    assert after_bypass["hits"] == after_hit["hits"]
+    assert after_bypass["misses"] == after_hit["misses"]
+
+
+def test_shared_response_cache_across_instances(tmp_path):
+    """Test that caches opened on the same file, as in separate workers, share entries."""
+    path = str(tmp_path / "cache.db")
+    first = SharedResponseCache(path, max_entries=10, max_bytes=1_000_000, ttl_seconds=60)
+    second = SharedResponseCache(path, max_entries=10, max_bytes=1_000_000, ttl_seconds=60)
+    response = _response("shared")
+    first.put("key", response)
+
+    cached = second.get("key")
+    assert cached.content == "shared"
+    assert cached.json_bytes() == response.json_bytes()
+    assert len(second) == 1
+    assert second.stats()["bytes"] == len(response.json_bytes())
+    assert second.stats()["hits"] == 1
+    assert second.get("missing") is None
+
+    second.clear()
+    assert first.get("key") is None
+    assert len(first) == 0
+
+
+def test_shared_response_cache_eviction_and_ttl(tmp_path):
+    """Test that the shared cache evicts least recently used entries down to its low watermark and expires old ones."""
+    now = [0.0]
+    cache = SharedResponseCache(
+        str(tmp_path / "cache.db"), max_entries=10, max_bytes=1_000_000, ttl_seconds=10_000, clock=lambda: now[0]
+    )
+    for number in range(10):
+        now[0] = number * 100.0
+        cache.put(f"key{number}", _response(str(number)))
+    now[0] = 1000.0
+    assert cache.get("key0") is not None
+    now[0] = 1100.0
+    cache.put("key10", _response("10"))
+
+    assert len(cache) == 9
+    assert cache.stats()["evictions"] == 2
+    assert cache.get("key1") is None and cache.get("key2") is None
+    assert all(cache.get(key) is not None for key in ("key0", "key3", "key10"))
+    now[0] = 20_000.0
+    assert cache.get("key10") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 8
+
+
+def test_shared_response_cache_touches_access_times_sparingly(tmp_path):
+    """Test that hits refresh an entry's access time only once it is older than `touch_seconds`."""
+    now = [0.0]
+    cache = SharedResponseCache(
+        str(tmp_path / "cache.db"), max_entries=10, max_bytes=1_000_000, ttl_seconds=10_000, clock=lambda: now[0]
+    )
+    for number in range(10):
+        now[0] = float(number)
+        cache.put(f"key{number}", _response(str(number)))
+    now[0] = 30.0
+    assert cache.get("key0") is not None
+    cache.put("key10", _response("10"))
+    assert cache.get("key0") is None and cache.get("key1") is None
+
+
+def test_shared_response_cache_queries_off_the_event_loop(tmp_path):
+    """Test that get_or_compute reads and writes the database from worker threads."""
+    cache = SharedResponseCache(str(tmp_path / "cache.db"), max_entries=10, max_bytes=1_000_000, ttl_seconds=60)
+    threads = []
+    lookup, put = cache._lookup, cache.put
+    cache._lookup = lambda key: threads.append(threading.current_thread()) or lookup(key)
+    cache.put = lambda key, response: threads.append(threading.current_thread()) or put(key, response)
+
+    async def compute():
+        return _response("computed")
+
+    async def run():
+        await cache.get_or_compute("key", compute)
+        return (await cache.get_or_compute("key", compute)).content
+
+    assert asyncio.run(run()) == "computed"
+    assert len(threads) == 3 and threading.main_thread() not in threads
+
+
+def test_shared_response_cache_single_flight(tmp_path):
+    """Test that concurrent misses in one process compute the response once."""
+    cache = SharedResponseCache(str(tmp_path / "cache.db"), max_entries=10, max_bytes=1_000_000, ttl_seconds=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return _response("computed")
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_compute("key", compute) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result.content == "computed" for result in results)
+    assert cache.get("key").content == "computed"
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import random
+
+from fastapi.testclient import TestClient
+
+from app.analysis.claims import chunk_spans, extract_claims, merge_claims, score_sentence
+from app.analysis.sentences import split_sentences
+from app.common.fingerprint import MinHashLSH, jaccard, word_shingles
+from app.core.config import settings
+from app.main import app
+from app.strategies.claim_discovery import ClaimDiscoveryStrategy
+
+client = TestClient(app)
+
+FILING = (
+    "Revenue increased by 12% to $4.2 billion in 2023 compared to the prior year. "
+    "Dr. Smith, the CFO of Acme Inc., said the growth was driven by cloud services. "
+    "What will happen next year? "
+    "We believe the outlook may possibly improve.\n\n"
+    "Operating costs fell 3 percent because of lower energy prices in Europe. "
+    "Revenue increased by 12% to $4.2 billion in 2023 compared to the previous year."
+)
+
+
+def _document(sections):
+    rng = random.Random(0)
+    words = [f"{consonant}{vowel}{ending}" for consonant in "bdgkmprst" for vowel in "aeiou" for ending in ("n", "l", "x")]
+    paragraphs = []
+    for section in sections:
+        phrase = " ".join(rng.sample(words, 6))
+        paragraphs.append(
+            f"{phrase.capitalize()} reported revenue of ${section} million in {2000 + section % 20}. "
+            "We think things might improve."
+        )
+    return "\n\n".join(paragraphs)
+
+
+def test_split_sentences_offsets_and_abbreviations():
+    """Test that sentences carry exact offsets and abbreviations do not split sentences."""
+    sentences = list(split_sentences(FILING))
+    assert all(FILING[sentence.start:sentence.end] == sentence.text for sentence in sentences)
+    assert sentences[1].text.startswith("Dr. Smith, the CFO of Acme Inc., said")
+    assert len(sentences) == 6
+
+    shifted = list(split_sentences(FILING, offset=100))
+    assert [sentence.start for sentence in shifted] == [sentence.start + 100 for sentence in sentences]
+
+
+def test_score_sentence_prefers_specific_factual_statements():
+    """Test that quantified statements outrank hedged opinions and questions."""
+    factual = score_sentence("Revenue increased by 12% to $4.2 billion in 2023 compared to the prior year.")
+    hedged = score_sentence("We believe the outlook may possibly improve.")
+    assert factual > 0.8
+    assert hedged < 0.3
+    assert score_sentence("What will happen to revenue next year?") == 0.0
+    assert score_sentence("Too short.") == 0.0
+
+
+def test_minhash_lsh_finds_near_duplicates():
+    """Test that LSH returns sets above the similarity threshold and nothing else."""
+    first = word_shingles("Revenue increased by 12% to $4.2 billion in 2023 compared to the prior year")
+    second = word_shingles("Revenue increased by 12% to $4.2 billion in 2023 compared to the previous year")
+    other = word_shingles("Operating costs fell 3 percent because of lower energy prices in Europe")
+    assert jaccard(first, second) >= 0.8 > jaccard(first, other)
+
+    index = MinHashLSH(threshold=0.8)
+    assert index.query_or_add("first", first) == []
+    assert [key for key, _ in index.query(second)] == ["first"]
+    assert index.query(other) == []
+    assert len(index) == 1
+
+
+def test_extract_claims_deduplicates_and_ranks():
+    """Test that near-duplicate claims are merged and claims are ranked by score."""
+    claims = extract_claims(FILING)
+    texts = [claim.text for claim in claims]
+    assert sum(text.startswith("Revenue increased by 12%") for text in texts) == 1
+    assert not any("?" in text or "believe" in text for text in texts)
+    assert [claim.score for claim in claims] == sorted((claim.score for claim in claims), reverse=True)
+    assert all(FILING[claim.start:claim.end] == claim.text for claim in claims)
+    assert len(extract_claims(FILING, max_claims=1)) == 1
+
+
+def test_chunked_extraction_matches_whole_document():
+    """Test that chunked processing in the process pool merges to the single-pass result."""
+    document = _document(range(300))
+    spans = chunk_spans(document, 2000)
+    assert "".join(text for _, text in spans) == document
+    assert all(document[offset:offset + len(text)] == text for offset, text in spans)
+
+    strategy = ClaimDiscoveryStrategy()
+    original = settings.CLAIM_PARALLEL_MIN_CHARS, settings.CLAIM_CHUNK_CHARS, settings.CLAIM_PROCESS_WORKERS
+    settings.CLAIM_PARALLEL_MIN_CHARS, settings.CLAIM_CHUNK_CHARS, settings.CLAIM_PROCESS_WORKERS = 1000, 2000, 2
+
+    async def run():
+        try:
+            return await strategy.discover_claims(document, 100, 0.5)
+        finally:
+            await strategy.close()
+
+    try:
+        parallel = asyncio.run(run())
+    finally:
+        settings.CLAIM_PARALLEL_MIN_CHARS, settings.CLAIM_CHUNK_CHARS, settings.CLAIM_PROCESS_WORKERS = original
+    assert parallel == extract_claims(document, 100, 0.5)
+    assert parallel == merge_claims(list(reversed(parallel)), 100)
+    assert len(parallel) == 100
+
+
+def test_claim_discovery_endpoint_output_shapes():
+    """Test that claims are objects with offsets by default and strings when the schema asks for them."""
+    request_data = {
+        "generation_type": "claim_discovery",
+        "output_type": "json",
+        "search_type": "global",
+        "parameters": {"content": FILING, "max_claims": 2},
+        "output_schema": {"type": "object", "properties": {"claims": {"type": "array"}}},
+    }
+    response = client.post("/api/v1/generation/generate", json=request_data)
+    assert response.status_code == 200
+    claims = json.loads(response.json()["content"])["claims"]
+    assert len(claims) == 2
+    assert set(claims[0]) == {"text", "score", "start", "end"}
+    assert response.json()["metadata"]["claim_count"] == 2
+
+    request_data["output_schema"]["properties"]["claims"]["items"] = {"type": "string"}
+    claims = json.loads(client.post("/api/v1/generation/generate", json=request_data).json()["content"])["claims"]
+    assert all(isinstance(claim, str) for claim in claims)
+
+    request_data["parameters"]["max_claims"] = 0
+    assert client.post("/api/v1/generation/generate", json=request_data).status_code == 400
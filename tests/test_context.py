@@ -0,0 +1,80 @@
+import httpx
+from fastapi.testclient import TestClient
+
+from app.analysis.context import Passage, PackingMethod, build_passages, pack_context
+from app.common.tokens import TokenCountCache, estimate_tokens
+from app.main import app
+from app.search.embedding import HashingEmbedder
+from app.services.backend import BackendPool
+from app.strategies import base
+from benchmarks.stub_backend import StubBackend
+from benchmarks.stub_server import create_stub_server
+
+client = TestClient(app)
+
+
+def _passage(tokens, score, position):
+    return Passage(" ".join(["word"] * tokens), score, "content", position)
+
+
+def test_token_estimate_and_cache():
+    """Test that token counts follow word and punctuation structure and are cached by content."""
+    assert estimate_tokens("Hello, world!") == 4
+    assert estimate_tokens("internationalization") == 4
+    cache = TokenCountCache(max_size=2)
+    text = "Revenue grew in 2023. " * 50
+    assert cache.count(text) == cache.count(text) == estimate_tokens(text)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_greedy_packing_fits_budget_in_document_order():
+    """Test that greedy packing keeps the best passages that fit and restores their order."""
+    passages = [_passage(4, 0.2, 0), _passage(5, 0.9, 1), _passage(3, 0.5, 2), _passage(20, 1.0, 3)]
+    packed = pack_context(passages, budget=9)
+    assert [passage.position for passage in packed.passages] == [1, 2]
+    assert packed.tokens == 8 and packed.candidates == 4
+
+
+def test_knapsack_packing_maximizes_total_score():
+    """Test that knapsack packing finds a better combination than greedy selection."""
+    passages = [_passage(6, 10.0, 0), _passage(5, 7.0, 1), _passage(5, 7.0, 2)]
+    greedy = pack_context(passages, budget=10, method=PackingMethod.GREEDY)
+    knapsack = pack_context(passages, budget=10, method=PackingMethod.KNAPSACK)
+    assert [passage.position for passage in greedy.passages] == [0]
+    assert [passage.position for passage in knapsack.passages] == [1, 2]
+    assert knapsack.tokens <= 10
+
+
+def test_build_passages_ranks_content_by_query():
+    """Test that content spans are scored against the query and corpus scores are normalized."""
+    content = "The weather was pleasant.\n\nRevenue grew by 20% in 2023.\n\nThe team went hiking."
+    search_results = [{"text": "Quarterly revenue report", "score": 4.0}, {"text": "Other", "score": 2.0}]
+    passages = build_passages(content, search_results, "revenue growth", HashingEmbedder(), span_chars=200)
+    content_passages = [passage for passage in passages if passage.source == "content"]
+    assert max(content_passages, key=lambda passage: passage.score).text.startswith("Revenue")
+    assert [passage.score for passage in passages if passage.source == "corpus"] == [1.0, 0.5]
+
+
+def test_default_generation_reports_packed_context(monkeypatch):
+    """Test that the default strategy packs its context within the token budget only when a backend consumes it."""
+    request = {
+        "generation_type": "default",
+        "output_type": "text",
+        "search_type": "global",
+        "parameters": {"content": "Revenue grew by 20% in 2023. " * 200, "context_tokens": 1000, "packing": "knapsack"},
+    }
+    headers = {"Cache-Control": "no-cache"}
+    response = client.post("/api/v1/generation/generate", json=request, headers=headers)
+    assert response.status_code == 200
+    assert "context_tokens" not in response.json()["metadata"]
+
+    pool = BackendPool({"default": "http://stub"}, transport=httpx.ASGITransport(app=create_stub_server(StubBackend(0.0))))
+    monkeypatch.setattr(base, "get_backend_pool", lambda: pool)
+    response = client.post("/api/v1/generation/generate", json=request, headers=headers)
+    assert response.status_code == 200
+    metadata = response.json()["metadata"]
+    assert 0 < metadata["context_tokens"] <= 1000
+    assert metadata["context_passages"] > 0
+
+    request["parameters"]["packing"] = "random"
+    assert client.post("/api/v1/generation/generate", json=request, headers=headers).status_code == 400
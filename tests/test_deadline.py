@@ -0,0 +1,168 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1.routes.generation.dependencies import get_generation_service
+from app.api.v1.routes.generation.router import cancel_on_disconnect
+from app.api.v1.routes.generation.schemas import GenerationRequest, GenerationResponse, GenerationType
+from app.common.deadline import TIMEOUT_HEADER, Deadline, current_deadline, deadline_scope
+from app.core.exceptions import ClientDisconnectedError, DeadlineExceededError
+from app.main import app
+from app.search.bm25 import BM25Index
+from app.search.embedding import HashingEmbedder
+from app.services.backend import BackendClient
+from app.services.cache import ResponseCache
+from app.services.generation import GenerationService
+from app.services.search import SearchService
+from app.strategies.base import GenerationStrategy
+from app.strategies.registry import StrategyRegistry
+
+client = TestClient(app)
+
+REQUEST = GenerationRequest(
+    generation_type=GenerationType.DEFAULT,
+    output_type="text",
+    search_type="global",
+    parameters={"content": "Slow content"},
+)
+
+
+class SlowStrategy(GenerationStrategy):
+    """Strategy that reports a partial result, then waits far longer than any test deadline."""
+    cancelled = False
+    deadline = None
+
+    def validate_request(self, request) -> None:
+        pass
+
+    async def generate(self, request) -> GenerationResponse:
+        SlowStrategy.deadline = current_deadline()
+        self.report_partial(lambda: self.build_response(request, "partial", self.get_metadata(request), []))
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            SlowStrategy.cancelled = True
+            raise
+        return self.build_response(request, "complete", self.get_metadata(request), [])
+
+
+def _service(cache=None):
+    SlowStrategy.cancelled = False
+    return GenerationService(registry=StrategyRegistry({GenerationType.DEFAULT: SlowStrategy}), cache=cache)
+
+
+def test_deadline_expiry_and_cancellation():
+    """Test that a deadline expires with its clock, and that forks share its expiry and cancellation."""
+    now = [0.0]
+    deadline = Deadline(2.0, clock=lambda: now[0])
+    child = deadline.fork()
+    assert deadline.remaining() == 2.0 and not child.expired
+    now[0] = 2.5
+    with pytest.raises(DeadlineExceededError):
+        child.check()
+
+    deadline = Deadline(2.0, allow_partial=True)
+    child = deadline.fork()
+    child.report_partial(lambda: "partial")
+    assert deadline.partial_result() is None and child.partial_result() == "partial"
+    deadline.cancel()
+    assert child.cancelled and child.remaining() == 0.0 and child.partial_result() is None
+    with pytest.raises(ClientDisconnectedError):
+        child.check()
+
+
+def test_generation_is_cancelled_at_the_deadline():
+    """Test that work past its deadline is cancelled and fails with 504, unless partial results are allowed."""
+    cache = ResponseCache(max_entries=10, max_bytes=1_000_000, ttl_seconds=60)
+    service = _service(cache)
+    started = time.perf_counter()
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(service.generate_content(REQUEST, deadline=Deadline(0.05)))
+    assert time.perf_counter() - started < 1
+    assert SlowStrategy.cancelled
+
+    response = asyncio.run(service.generate_content(REQUEST, deadline=Deadline(0.05, allow_partial=True)))
+    assert response.content == "partial" and response.metadata["partial"] is True
+    assert len(cache) == 0
+
+
+def test_abandoned_generation_cancels_its_deadline():
+    """Test that cancelling a request cancels the deadline seen by its strategy, stopping threaded work."""
+    async def run():
+        task = asyncio.ensure_future(_service().generate_content(REQUEST, deadline=Deadline(5)))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert SlowStrategy.cancelled and SlowStrategy.deadline.cancelled
+
+
+def test_request_timeout_header():
+    """Test that `X-Request-Timeout` bounds a request, and `X-Allow-Partial` returns its partial result."""
+    app.dependency_overrides[get_generation_service] = _service
+    payload = REQUEST.model_dump(mode="json")
+    try:
+        response = client.post("/api/v1/generation/generate", json=payload, headers={TIMEOUT_HEADER: "0.05"})
+        assert response.status_code == 504
+        response = client.post(
+            "/api/v1/generation/generate", json=payload, headers={TIMEOUT_HEADER: "0.05", "X-Allow-Partial": "true"}
+        )
+        assert response.status_code == 200 and response.json()["metadata"]["partial"] is True
+        response = client.post("/api/v1/generation/generate", json=payload, headers={TIMEOUT_HEADER: "soon"})
+        assert response.status_code == 400
+    finally:
+        app.dependency_overrides.pop(get_generation_service, None)
+
+
+def test_work_is_cancelled_when_the_client_disconnects():
+    """Test that the handler stops waiting for and cancels work once the client disconnects."""
+    class DisconnectingRequest:
+        async def receive(self):
+            await asyncio.sleep(0.05)
+            return {"type": "http.disconnect"}
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        finally:
+            cancelled.append(True)
+
+    cancelled = []
+    with pytest.raises(ClientDisconnectedError):
+        asyncio.run(cancel_on_disconnect(DisconnectingRequest(), work()))
+    assert cancelled
+
+
+def test_search_and_backend_calls_honour_the_deadline():
+    """Test that search stops past the deadline and backend calls send and stay within the time left."""
+    search_service = SearchService(BM25Index(), HashingEmbedder(dim=32))
+    with deadline_scope(Deadline(0)):
+        with pytest.raises(DeadlineExceededError):
+            search_service.search("revenue")
+
+    timeouts = []
+
+    def handler(request):
+        timeouts.append(request.headers.get(TIMEOUT_HEADER))
+        return httpx.Response(503)
+
+    async def run():
+        backend = BackendClient(
+            "http://stub", transport=httpx.MockTransport(handler), retries=5, backoff=10, backoff_max=10, hedge=False
+        )
+        try:
+            with deadline_scope(Deadline(0.1)):
+                with pytest.raises(DeadlineExceededError):
+                    await backend.complete("prompt")
+        finally:
+            await backend.close()
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    assert time.perf_counter() - started < 1
+    assert timeouts and 0 < float(timeouts[0]) <= 0.1
@@ -0,0 +1,198 @@
+import json
+import random
+
+from fastapi.testclient import TestClient
+
+from app.common.fingerprint import MinHashLSH, jaccard, sketch, word_shingles
+from app.main import app
+from app.services.dedup import DocumentCache, novel_regions, relocate
+
+client = TestClient(app)
+
+HEADERS = {"Cache-Control": "no-cache"}
+
+
+def _report(seed):
+    rng = random.Random(seed)
+    words = [f"{consonant}{vowel}{ending}" for consonant in "bdgkmprst" for vowel in "aeiou" for ending in ("n", "l", "x")]
+    paragraphs = []
+    for section in range(30):
+        phrase = " ".join(rng.sample(words, 8))
+        paragraphs.append(
+            f"{phrase.capitalize()} reported revenue of ${section + seed} million in {2000 + section}. "
+            f"Operating costs fell {section % 9 + 1} percent because of lower energy prices."
+        )
+    return "\n\n".join(paragraphs)
+
+
+def _resubmitted(text):
+    # Trivial differences: extra whitespace and an appended boilerplate footer.
+    return "\n\n\n" + text.replace("\n\n", "\n\n\n") + "\n\nSent from the reporting portal."
+
+
+def test_sketch_is_bounded_and_preserves_similarity():
+    """Test that bottom-k sketches are bounded and keep near-duplicates similar."""
+    original = word_shingles(_report(1), 3)
+    near = word_shingles(_resubmitted(_report(1)), 3)
+    other = word_shingles(_report(2), 3)
+
+    assert len(sketch(original, 64)) == 64
+    assert sketch(original, 10_000) == original
+    assert jaccard(sketch(original, 64), sketch(near, 64)) >= 0.9
+    assert jaccard(sketch(original, 64), sketch(other, 64)) < 0.5
+
+
+def test_minhash_lsh_remove():
+    """Test that removed sets are no longer returned by queries."""
+    index = MinHashLSH(threshold=0.8)
+    shingles = word_shingles("Revenue increased by twelve percent in the third quarter")
+    index.add("a", shingles)
+    index.add("b", shingles)
+    index.remove("a")
+    index.remove("missing")
+
+    assert [key for key, _ in index.query(shingles)] == ["b"]
+    assert len(index) == 1
+
+
+def test_document_cache_exact_and_near_duplicate_hits():
+    """Test lookups by exact content and by near-duplicate content."""
+    cache = DocumentCache(max_documents=10)
+    report = _report(3)
+    key, hit = cache.lookup(report, "claims")
+    assert hit is None
+    cache.put(key, "claims", ["result"])
+
+    result, reuse = cache.get(cache.key(report), "claims")
+    assert result == ["result"] and reuse.exact and reuse.similarity == 1.0
+    result, reuse = cache.get(cache.key(_resubmitted(report)), "claims")
+    assert result == ["result"] and not reuse.exact and reuse.similarity >= 0.9
+    assert cache.get(cache.key(report), "spans") is None
+    assert cache.get(cache.key(_report(4)), "claims") is None
+    assert cache.stats() == {"exact_hits": 1, "near_hits": 1, "misses": 3, "documents": 1}
+
+
+def test_document_cache_evicts_least_recently_used():
+    """Test that evicted documents are dropped from the near-duplicate index too."""
+    cache = DocumentCache(max_documents=2)
+    reports = [_report(seed) for seed in (5, 6, 7)]
+    for report in reports:
+        cache.put(cache.key(report), "claims", report[:10])
+
+    assert len(cache) == 2
+    assert cache.get(cache.key(_resubmitted(reports[0])), "claims") is None
+    assert cache.get(cache.key(_resubmitted(reports[2])), "claims") is not None
+
+
+def test_relocate_prefers_nearby_occurrence():
+    """Test that relocated text prefers the occurrence at or just before the original offset."""
+    content = "alpha beta. alpha beta."
+    assert relocate(content, "alpha beta.", 12) == 12
+    assert relocate(content, "alpha beta.", 0) == 0
+    assert relocate(content, "alpha beta.", 100) == 12
+    assert relocate(content, "gamma", 0) == -1
+
+
+def test_claim_discovery_reuses_near_duplicate_claims():
+    """Test that resubmitted content reuses claims re-anchored at its own offsets."""
+    report = _report(8)
+    payload = {
+        "generation_type": "claim_discovery",
+        "output_type": "json",
+        "search_type": "global",
+        "output_schema": {"type": "object", "properties": {"claims": {"type": "array"}}},
+    }
+    first = client.post("/api/v1/generation/generate", json={**payload, "parameters": {"content": report}}, headers=HEADERS).json()
+    resubmitted = _resubmitted(report)
+    second = client.post("/api/v1/generation/generate", json={**payload, "parameters": {"content": resubmitted}}, headers=HEADERS).json()
+
+    assert "content_reuse" not in first["metadata"]
+    reuse = second["metadata"]["content_reuse"]
+    assert not reuse["exact"] and reuse["similarity"] >= 0.9
+    assert second["metadata"]["claim_count"] == first["metadata"]["claim_count"] > 0
+    for claim in json.loads(second["content"])["claims"]:
+        assert resubmitted[claim["start"]:claim["end"]] == claim["text"]
+
+
+def test_evidence_discovery_reuses_document_spans():
+    """Test that evidence for new claims on a seen document reuses its spans."""
+    report = _report(9)
+    payload = {"generation_type": "evidence_discovery", "output_type": "text", "search_type": "global"}
+    first = client.post(
+        "/api/v1/generation/generate",
+        json={**payload, "parameters": {"content": report, "claim": "Operating costs fell because of energy prices"}},
+        headers=HEADERS,
+    ).json()
+    second = client.post(
+        "/api/v1/generation/generate",
+        json={**payload, "parameters": {"content": report, "claim": "Revenue of 20 million was reported"}},
+        headers=HEADERS,
+    ).json()
+    resubmitted = _resubmitted(report)
+    third = client.post(
+        "/api/v1/generation/generate",
+        json={**payload, "parameters": {"content": resubmitted, "claim": "Revenue of 20 million was reported"}},
+        headers=HEADERS,
+    ).json()
+
+    assert "content_reuse" not in first["metadata"]
+    assert second["metadata"]["content_reuse"]["exact"]
+    assert not third["metadata"]["content_reuse"]["exact"]
+    spans = [result for result in third["search_results"] if result["source"] == "content"]
+    assert spans
+    for span in spans:
+        assert resubmitted[span["start"]:span["end"]] == span["text"]
+
+
+def _edited(text):
+    # One paragraph rewritten with a new claim; the rest is unchanged.
+    paragraphs = text.split("\n\n")
+    paragraphs[10] = "Net income rose 45 percent to $300 million in 2031 because of strong subscription sales."
+    return "\n\n".join(paragraphs)
+
+
+def test_novel_regions_of_an_edited_document():
+    """Test that only new or changed paragraphs are reported as novel, at their offsets."""
+    report = _report(10)
+    edited = _edited(_resubmitted(report))
+    regions = novel_regions(report, edited)
+    assert [text for _, text in regions] == [
+        "Net income rose 45 percent to $300 million in 2031 because of strong subscription sales.",
+        "Sent from the reporting portal.",
+    ]
+    assert all(edited[offset:offset + len(text)] == text for offset, text in regions)
+    assert novel_regions(report, report) == []
+
+
+def test_near_duplicate_reuse_discovers_changed_text():
+    """Test that claims and evidence of text only found in the resubmission are not lost."""
+    report = _report(11)
+    edited = _edited(report)
+    payload = {
+        "generation_type": "claim_discovery",
+        "output_type": "json",
+        "search_type": "global",
+        "output_schema": {"type": "object", "properties": {"claims": {"type": "array"}}},
+    }
+    for content in (report, edited):
+        second = client.post(
+            "/api/v1/generation/generate", json={**payload, "parameters": {"content": content, "max_claims": 100}}, headers=HEADERS
+        ).json()
+    reuse = second["metadata"]["content_reuse"]
+    assert not reuse["exact"] and reuse["novel_chars"] == len(edited.split("\n\n")[10])
+    claims = json.loads(second["content"])["claims"]
+    assert any(claim["text"].startswith("Net income rose 45 percent") for claim in claims)
+    for claim in claims:
+        assert edited[claim["start"]:claim["end"]] == claim["text"]
+
+    payload = {"generation_type": "evidence_discovery", "output_type": "text", "search_type": "global"}
+    claim = "Net income rose because of subscription sales"
+    for content in (report, edited):
+        second = client.post(
+            "/api/v1/generation/generate", json={**payload, "parameters": {"content": content, "claim": claim}}, headers=HEADERS
+        ).json()
+    assert second["metadata"]["content_reuse"]["novel_chars"] > 0
+    spans = [result for result in second["search_results"] if result["source"] == "content"]
+    assert spans[0]["text"].startswith("Net income rose 45 percent")
+    for span in spans:
+        assert edited[span["start"]:span["end"]] == span["text"]
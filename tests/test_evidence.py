@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from app.analysis.evidence import evidence_spans, find_evidence
+from app.api.v1.routes.generation.schemas import GenerationRequest, GenerationType, OutputType, SearchType
+from app.main import app
+from app.search.bm25 import BM25Index
+from app.search.embedding import HashingEmbedder
+from app.services.search import SearchService
+from app.strategies.evidence_discovery import EvidenceDiscoveryStrategy
+
+client = TestClient(app)
+
+REPORT = (
+    "Acme Corp published its annual report in March. The report covers all regions.\n\n"
+    "Revenue grew by twelve percent, driven by cloud subscriptions in Europe. "
+    "Cloud subscriptions now make up half of total revenue.\n\n"
+    "Operating costs fell because energy prices dropped during the winter. "
+    "The company also reduced its office space.\n\n"
+    "The board approved a new dividend policy for shareholders."
+)
+
+
+def test_evidence_spans_follow_paragraphs():
+    """Test that spans never cross paragraphs, respect the size limit and carry exact offsets."""
+    spans = list(evidence_spans(REPORT, max_chars=120))
+    assert all(REPORT[span.start:span.end] == span.text for span in spans)
+    assert all("\n\n" not in span.text for span in spans)
+    assert all(len(span.text) <= 120 for span in spans)
+    assert spans[-1].text == "The board approved a new dividend policy for shareholders."
+
+
+def test_find_evidence_ranks_spans_for_several_claims():
+    """Test that each claim gets its own ranking from one shared document index."""
+    claims = ["cloud subscriptions drove revenue growth", "energy prices lowered operating costs"]
+    evidence = find_evidence(claims, REPORT, HashingEmbedder(dim=256), top_k=2, max_chars=200)
+
+    assert len(evidence) == 2
+    assert "cloud subscriptions" in evidence[0][0].text
+    assert "energy prices" in evidence[1][0].text
+    assert all(item.claim_index == 1 and item.claim == claims[1] for item in evidence[1])
+    assert evidence[0][0].score >= evidence[0][-1].score
+    assert find_evidence(claims, "", HashingEmbedder(dim=16), 2, 200) == [[], []]
+
+
+def test_strategy_combines_content_and_corpus_evidence():
+    """Test that search_results hold content spans with offsets followed by corpus passages."""
+    search_service = SearchService(BM25Index(), HashingEmbedder(dim=256))
+    search_service.index_passages("memo.txt", ["Dividend policy was approved by the board in May."])
+    strategy = EvidenceDiscoveryStrategy(search_service=search_service)
+    request = GenerationRequest(
+        generation_type=GenerationType.EVIDENCE_DISCOVERY,
+        output_type=OutputType.JSON,
+        search_type=SearchType.GLOBAL,
+        parameters={"content": REPORT, "claim": "board approved dividend policy", "claims": ["revenue grew"]},
+        output_schema={"type": "object", "properties": {"evidence": {"type": "array"}}},
+    )
+    response = asyncio.run(strategy.generate(request))
+
+    first = response.search_results[0]
+    assert first["source"] == "content"
+    assert first["claim_index"] == 0
+    assert REPORT[first["start"]:first["end"]] == first["text"]
+    assert "dividend policy" in first["text"]
+    assert any(result["source"] == "corpus" and result["file_id"] == "memo.txt" for result in response.search_results)
+    assert response.metadata["claim_count"] == 2
+
+    evidence = json.loads(response.content)["evidence"]
+    assert {item["claim_index"] for item in evidence} == {0, 1}
+
+
+def test_evidence_endpoint_validation_and_string_items():
+    """Test claims validation and plain string output over HTTP."""
+    request_data = {
+        "generation_type": "evidence_discovery",
+        "output_type": "json",
+        "search_type": "global",
+        "parameters": {"content": REPORT, "claims": ["revenue grew twelve percent"], "top_k": 1},
+        "output_schema": {"type": "object", "properties": {"evidence": {"type": "array", "items": {"type": "string"}}}},
+    }
+    response = client.post("/api/v1/generation/generate", json=request_data)
+    assert response.status_code == 200
+    assert json.loads(response.json()["content"])["evidence"] == [
+        "Revenue grew by twelve percent, driven by cloud subscriptions in Europe. "
+        "Cloud subscriptions now make up half of total revenue."
+    ]
+
+    request_data["parameters"]["claims"] = ["ok", ""]
+    assert client.post("/api/v1/generation/generate", json=request_data).status_code == 400
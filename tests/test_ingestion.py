@@ -0,0 +1,163 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.common.chunking import chunk_file, chunk_text, iter_file_text, iter_paragraphs
+from app.main import app
+from app.search.bm25 import BM25Index
+from app.search.embedding import HashingEmbedder
+from app.services.ingestion import IngestionService
+from app.services.search import SearchService
+
+client = TestClient(app)
+
+
+def _document(paragraphs):
+    return "\n\n".join(f"Paragraph {number} talks about topic{number} in some detail." for number in paragraphs)
+
+
+def test_iter_paragraphs_offsets_across_blocks():
+    """Test that paragraph offsets are correct when breaks span block boundaries."""
+    text = "First paragraph here.\n\n  Second ü paragraph.\n \nThird " + "long " * 40 + "paragraph."
+    blocks = [text[index:index + 5] for index in range(0, len(text), 5)]
+
+    paragraphs = list(iter_paragraphs(blocks, max_chars=60))
+    assert paragraphs == list(iter_paragraphs([text], max_chars=60))
+    assert all(text[paragraph.start:paragraph.end] == paragraph.text for paragraph in paragraphs)
+    assert all(len(paragraph.text) <= 60 for paragraph in paragraphs)
+    assert paragraphs[1].text == "Second ü paragraph."
+
+
+def test_chunk_file_matches_chunk_text(tmp_path):
+    """Test that memory-mapped file chunking matches in-memory chunking."""
+    text = _document(range(200))
+    path = tmp_path / "doc.txt"
+    path.write_text(text, encoding="utf-8")
+
+    blocks = list(iter_file_text(str(path), block_size=1000))
+    assert "".join(blocks) == text
+    assert list(chunk_file(str(path), 200, 800)) == list(chunk_text(text, 200, 800))
+
+
+def test_reingestion_only_indexes_changed_chunks():
+    """Test that re-ingesting an edited document only re-indexes changed chunks."""
+    service = IngestionService(SearchService(BM25Index()))
+    original = _document(range(100))
+    first = service.ingest_text("doc", original)
+    assert first.chunks_added == first.chunks > 1
+
+    unchanged = service.ingest_text("doc", original)
+    assert unchanged.chunks_added == 0
+    assert unchanged.chunks_removed == 0
+
+    edited = original.replace("topic50 in some detail", "a completely different subject")
+    second = service.ingest_text("doc", edited)
+    assert 0 < second.chunks_added < first.chunks / 2
+    assert second.chunks_removed == second.chunks_added
+    assert service.search_service.search("completely different subject")[0]["file_id"] == "doc"
+    assert not any("topic50" in result["text"] for result in service.search_service.search("topic50"))
+
+
+def test_remove_file_and_compaction():
+    """Test that removed files disappear from search, including after compaction."""
+    search_service = SearchService(BM25Index())
+    service = IngestionService(search_service)
+    service.ingest_text("keep", _document(range(10)))
+    service.ingest_text("drop", _document(range(10, 20)))
+
+    assert service.remove_file("drop") > 0
+    assert search_service.index.dead_ratio == 0
+    assert search_service.search("topic15") == []
+    assert search_service.search("topic5")[0]["file_id"] == "keep"
+
+    service.ingest_text("keep", _document(range(5)))
+    assert search_service.search("topic3")[0]["file_id"] == "keep"
+    assert search_service.search("topic8") == []
+
+
+class BlockingEmbedder(HashingEmbedder):
+    """Embedder that blocks, once armed, until the test releases it."""
+
+    def __init__(self):
+        super().__init__(dim=32)
+        self.armed = False
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def embed(self, texts):
+        if self.armed:
+            self.started.set()
+            self.release.wait(5)
+        return super().embed(texts)
+
+
+def test_search_completes_while_a_slow_sync_is_in_progress():
+    """Test that searches do not wait for the chunking and embedding of a concurrent ingestion."""
+    embedder = BlockingEmbedder()
+    search_service = SearchService(BM25Index(), embedder)
+    service = IngestionService(search_service)
+    service.ingest_text("keep", _document(range(10)))
+
+    embedder.armed = True
+    ingestion = threading.Thread(target=service.ingest_text, args=("slow", _document(range(10, 20))))
+    ingestion.start()
+    try:
+        assert embedder.started.wait(5)
+        results = []
+        search = threading.Thread(target=lambda: results.append(search_service.search("topic5", mode="keyword")))
+        search.start()
+        search.join(2)
+        assert results and results[0][0]["file_id"] == "keep"
+    finally:
+        embedder.release.set()
+        ingestion.join()
+    assert search_service.search("topic15", mode="keyword")[0]["file_id"] == "slow"
+
+
+def test_ingest_file_endpoint():
+    """Test ingesting, inspecting and removing a file over HTTP."""
+    text = _document(range(30))
+    response = client.put("/api/v1/ingestion/files/reports/q3.txt", content=text.encode("utf-8"))
+    assert response.status_code == 200
+    job = response.json()
+    assert job["status"] == "completed"
+    assert job["file_id"] == "reports/q3.txt"
+    assert job["bytes_total"] == len(text.encode("utf-8"))
+    assert job["chunks_added"] == job["chunks"]
+
+    assert client.get(f"/api/v1/ingestion/jobs/{job['job_id']}").json()["status"] == "completed"
+    stats = client.get("/api/v1/ingestion/stats").json()
+    assert stats["files"]["reports/q3.txt"] == job["chunks"]
+
+    request_data = {
+        "generation_type": "default",
+        "output_type": "text",
+        "search_type": "selected_files",
+        "parameters": {"content": "x", "query": "topic7", "file_ids": ["reports/q3.txt"]},
+    }
+    results = client.post("/api/v1/generation/generate", json=request_data).json()["search_results"]
+    assert results and "topic7" in results[0]["text"]
+
+    assert client.delete("/api/v1/ingestion/files/reports/q3.txt").status_code == 200
+    assert client.delete("/api/v1/ingestion/files/reports/q3.txt").status_code == 404
+
+
+def test_ingestion_invalidates_cached_responses():
+    """Test that a cached response is not served once an ingested document changes its search results."""
+    request_data = {
+        "generation_type": "default",
+        "output_type": "text",
+        "search_type": "global",
+        "parameters": {"content": "x", "query": "zebra migration"},
+    }
+    assert client.post("/api/v1/generation/generate", json=request_data).json()["search_results"] == []
+    assert client.post("/api/v1/generation/generate", json=request_data).json()["search_results"] == []
+
+    text = "Every year the zebra migration crosses the river."
+    assert client.put("/api/v1/ingestion/files/z.txt", content=text.encode("utf-8")).status_code == 200
+    try:
+        results = client.post("/api/v1/generation/generate", json=request_data).json()["search_results"]
+        assert [result["file_id"] for result in results] == ["z.txt"]
+    finally:
+        client.delete("/api/v1/ingestion/files/z.txt")
+    assert client.post("/api/v1/generation/generate", json=request_data).json()["search_results"] == []
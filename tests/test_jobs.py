@@ -0,0 +1,134 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1.routes.generation.schemas import (
+    BatchItemResult,
+    GenerationRequest,
+    GenerationType,
+    JobPriority,
+    JobStatus,
+    OutputType,
+)
+from app.core.exceptions import ServiceUnavailableError
+from app.main import app
+from app.services.generation import GenerationService
+from app.services.jobs import LocalJobBackend
+
+
+class GatedService(GenerationService):
+    """Generation service that records execution order and blocks until released."""
+
+    def __init__(self):
+        super().__init__()
+        self.order = []
+        self.gate = asyncio.Event()
+
+    async def generate_item(self, index, request, use_cache=True):
+        await self.gate.wait()
+        self.order.append(request.parameters["content"])
+        return BatchItemResult(index=index, response=None)
+
+
+def _request(content):
+    return GenerationRequest(generation_type=GenerationType.DEFAULT, output_type=OutputType.TEXT, parameters={"content": content})
+
+
+async def _wait_finished(backend, job_id):
+    while True:
+        job = await backend.get(job_id)
+        if job is None or job.status not in (JobStatus.QUEUED, JobStatus.RUNNING):
+            return
+        await asyncio.sleep(0.001)
+
+
+def test_jobs_run_by_priority_then_submission_order():
+    """Test that higher priority jobs run first and equal priorities keep submission order."""
+    async def run():
+        service = GatedService()
+        backend = LocalJobBackend(service, workers=1, queue_size=10)
+        blocker = await backend.submit(_request("blocker"))
+        await asyncio.sleep(0)
+        jobs = [
+            await backend.submit(_request("low"), JobPriority.LOW),
+            await backend.submit(_request("normal-1")),
+            await backend.submit(_request("high"), JobPriority.HIGH),
+            await backend.submit(_request("normal-2")),
+        ]
+        assert (await backend.get(blocker.job_id)).status == JobStatus.RUNNING
+        service.gate.set()
+        for job in jobs:
+            await _wait_finished(backend, job.job_id)
+        await backend.stop()
+        return service.order, backend.stats()
+
+    order, stats = asyncio.run(run())
+    assert order == ["blocker", "high", "normal-1", "normal-2", "low"]
+    assert stats["completed"] == 5
+
+
+def test_full_queue_rejects_with_retry_after():
+    """Test backpressure: submissions beyond the queue size fail with 503 and Retry-After."""
+    async def run():
+        backend = LocalJobBackend(GatedService(), workers=1, queue_size=2)
+        await backend.submit(_request("running"))
+        await asyncio.sleep(0)
+        await backend.submit(_request("queued-1"))
+        queued = await backend.submit(_request("queued-2"))
+        with pytest.raises(ServiceUnavailableError) as error:
+            await backend.submit(_request("rejected"))
+        stats = backend.stats()
+        await backend.stop()
+        return error.value, stats, await backend.get(queued.job_id)
+
+    error, stats, queued = asyncio.run(run())
+    assert error.status_code == 503
+    assert int(error.headers["Retry-After"]) >= 1
+    assert stats["rejected"] == 1
+    assert stats["queued"] == 2
+    assert queued.status == JobStatus.FAILED
+    assert queued.error.status_code == 503
+
+
+def test_finished_jobs_expire():
+    """Test that results are discarded after their TTL and beyond the retention limit."""
+    now = [1000.0]
+
+    async def run():
+        service = GatedService()
+        service.gate.set()
+        backend = LocalJobBackend(service, workers=2, result_ttl=60, max_retained=2, clock=lambda: now[0])
+        jobs = [await backend.submit(_request(str(number))) for number in range(3)]
+        for job in jobs:
+            await _wait_finished(backend, job.job_id)
+        retained = [await backend.get(job.job_id) for job in jobs]
+        now[0] += 61
+        expired = await backend.get(jobs[2].job_id)
+        await backend.stop()
+        return retained, expired
+
+    retained, expired = asyncio.run(run())
+    assert retained[0] is None
+    assert retained[2].expires_at == 1060.0
+    assert expired is None
+
+
+def test_jobs_endpoints():
+    """Test submitting a job over HTTP and polling it to completion."""
+    with TestClient(app) as client:
+        request_data = {"generation_type": "default", "output_type": "text", "parameters": {"content": "Hello"}}
+        response = client.post("/api/v1/generation/jobs?priority=high", json=request_data)
+        assert response.status_code == 202
+        job = response.json()
+        assert job["priority"] == "high"
+
+        deadline = time.time() + 5
+        while job["status"] in ("queued", "running") and time.time() < deadline:
+            job = client.get(f"/api/v1/generation/jobs/{job['job_id']}").json()
+        assert job["status"] == "completed"
+        assert job["response"]["content"]
+
+        assert client.get("/api/v1/generation/jobs/unknown").status_code == 404
+        assert client.get("/api/v1/generation/jobs/stats").json()["submitted"] >= 1
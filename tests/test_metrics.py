@@ -0,0 +1,70 @@
+from fastapi.testclient import TestClient
+
+from app.common.metrics import GENERATION_REQUESTS, STAGE_LATENCY, Histogram, Stage
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test that histogram buckets count every observation at or below their bound."""
+    histogram = Histogram("test_duration_seconds", "Test latency", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value, "search")
+
+    lines = histogram.render()
+    assert 'test_duration_seconds_bucket{stage="search",le="0.1"} 2' in lines
+    assert 'test_duration_seconds_bucket{stage="search",le="1"} 3' in lines
+    assert 'test_duration_seconds_bucket{stage="search",le="+Inf"} 4' in lines
+    assert 'test_duration_seconds_count{stage="search"} 4' in lines
+    assert histogram.count("search") == 4
+
+
+def test_generation_records_request_and_stage_metrics():
+    """Test that a generation request is counted and its strategy stages are timed."""
+    labels = ("claim_discovery", "text", "global", "success")
+    requests_before = GENERATION_REQUESTS.value(*labels)
+    stages_before = {stage: STAGE_LATENCY.count("claim_discovery", stage) for stage in Stage}
+
+    response = client.post(
+        "/api/v1/generation/generate?use_cache=false",
+        json={
+            "generation_type": "claim_discovery",
+            "output_type": "text",
+            "search_type": "global",
+            "parameters": {"content": "Revenue grew 20% in 2023 according to the annual report.", "query": "revenue"},
+        },
+    )
+    assert response.status_code == 200
+    assert GENERATION_REQUESTS.value(*labels) == requests_before + 1
+    for stage in Stage:
+        assert STAGE_LATENCY.count("claim_discovery", stage) == stages_before[stage] + 1
+
+
+def test_failed_generation_is_labelled_client_error():
+    """Test that validation failures are counted with the client_error outcome."""
+    labels = ("default", "text", "global", "client_error")
+    before = GENERATION_REQUESTS.value(*labels)
+    response = client.post(
+        "/api/v1/generation/generate",
+        json={"generation_type": "default", "output_type": "text", "search_type": "global", "parameters": {}},
+    )
+    assert response.status_code == 400
+    assert GENERATION_REQUESTS.value(*labels) == before + 1
+
+
+def test_metrics_endpoint_renders_prometheus_text():
+    """Test that /metrics exposes request, stage and service metrics in the text format."""
+    client.post(
+        "/api/v1/generation/generate",
+        json={"generation_type": "default", "output_type": "text", "search_type": "global", "parameters": {"content": "x"}},
+    )
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert "# TYPE generation_request_duration_seconds histogram" in body
+    assert 'generation_requests_total{generation_type="default",output_type="text",search_type="global",outcome="success"}' in body
+    assert 'generation_stage_duration_seconds_bucket{generation_type="default",stage="validation",le="+Inf"}' in body
+    assert "# TYPE admission_events counter" in body
+    assert "job_queue_queued" in body
@@ -0,0 +1,66 @@
+import asyncio
+import os
+import pstats
+
+from fastapi.testclient import TestClient
+
+from app.common import profiling
+from app.core.config import settings
+from app.main import app
+
+client = TestClient(app)
+
+REQUEST = {
+    "generation_type": "claim_discovery",
+    "output_type": "text",
+    "search_type": "global",
+    "parameters": {"content": "Revenue grew 20% in 2023 according to the annual report."},
+}
+
+
+def test_profile_token_writes_pstats_artifact(monkeypatch, tmp_path):
+    """Test that a request with the profiling token is profiled and returns the artifact id."""
+    monkeypatch.setattr(settings, "PROFILE_TOKEN", "secret")
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+
+    response = client.post("/api/v1/generation/generate", json=REQUEST, headers={"X-Profile-Token": "secret"})
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    stats = pstats.Stats(str(tmp_path / f"{profile_id}.prof"))
+    assert any(function == "generate_content" for _, _, function in stats.stats)
+
+
+def test_requests_are_not_profiled_without_token(monkeypatch, tmp_path):
+    """Test that a missing or wrong token does not profile the request."""
+    monkeypatch.setattr(settings, "PROFILE_TOKEN", "secret")
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+
+    for headers in ({}, {"X-Profile-Token": "guess"}):
+        response = client.post("/api/v1/generation/generate", json=REQUEST, headers=headers)
+        assert response.status_code == 200
+        assert "X-Profile-Id" not in response.headers
+    assert not os.listdir(tmp_path)
+
+
+def test_sampling_rate_and_artifact_retention(monkeypatch, tmp_path):
+    """Test that sampled profiles are written and only the newest artifacts are kept."""
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_MAX_ARTIFACTS", 2)
+
+    for _ in range(4):
+        response = client.post("/api/v1/generation/generate", json=REQUEST)
+        assert "X-Profile-Id" in response.headers
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_only_one_request_is_profiled_at_a_time(tmp_path):
+    """Test that a request arriving while another one is profiled runs unprofiled."""
+    async def run():
+        async with profiling.profile_request(True, str(tmp_path)) as outer:
+            async with profiling.profile_request(True, str(tmp_path)) as inner:
+                return outer, inner
+
+    outer, inner = asyncio.run(run())
+    assert outer is not None and inner is None
+    assert os.listdir(tmp_path) == [f"{outer}.prof"]
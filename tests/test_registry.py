@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1.routes.generation.schemas import GenerationResponse, GenerationType
+from app.core.exceptions import ValidationError
+from app.main import app
+from app.services.generation import GenerationService
+from app.strategies import registry as registry_module
+from app.strategies.base import GenerationStrategy
+from app.strategies.registry import StrategyRegistry
+
+
+class TrackingStrategy(GenerationStrategy):
+    """Strategy that records lifecycle hook calls."""
+    instances = 0
+
+    def __init__(self):
+        TrackingStrategy.instances += 1
+        self.warmed_up = False
+        self.closed = False
+
+    async def warmup(self) -> None:
+        self.warmed_up = True
+
+    async def close(self) -> None:
+        self.closed = True
+
+    def validate_request(self, request) -> None:
+        pass
+
+    async def generate(self, request) -> GenerationResponse:
+        return GenerationResponse(content="tracked", metadata={}, generation_parameters={})
+
+
+class FakeEntryPoint:
+    def __init__(self, name, target):
+        self.name = name
+        self._target = target
+
+    def load(self):
+        return self._target
+
+
+def test_registry_lifecycle():
+    """Test that strategies are built once, warmed up and closed."""
+    TrackingStrategy.instances = 0
+    registry = StrategyRegistry({GenerationType.DEFAULT: TrackingStrategy})
+
+    asyncio.run(registry.startup())
+    strategy = registry.get(GenerationType.DEFAULT)
+    assert strategy is registry.get("default")
+    assert strategy.warmed_up
+    assert TrackingStrategy.instances == 1
+
+    asyncio.run(registry.shutdown())
+    assert strategy.closed
+    assert not registry.started
+
+
+def test_registry_unknown_type():
+    """Test that unknown generation types raise a validation error."""
+    registry = StrategyRegistry({})
+    with pytest.raises(ValidationError):
+        registry.get("unknown")
+
+
+def test_registry_entry_points(monkeypatch):
+    """Test that strategies advertised through entry points override built-ins."""
+    def fake_entry_points(group):
+        assert group == registry_module.ENTRY_POINT_GROUP
+        return [FakeEntryPoint("default", TrackingStrategy), FakeEntryPoint("broken", object)]
+
+    monkeypatch.setattr(registry_module, "entry_points", fake_entry_points)
+    registry = StrategyRegistry()
+    registry.load_entry_points()
+
+    assert isinstance(registry.get(GenerationType.DEFAULT), TrackingStrategy)
+    with pytest.raises(ValidationError):
+        registry.get("broken")
+
+
+def test_service_reuses_strategy_instances():
+    """Test that the service does not build a strategy per call."""
+    service = GenerationService()
+    assert service.get_strategy(GenerationType.DEFAULT) is service.get_strategy(GenerationType.DEFAULT)
+
+
+def test_lifespan_starts_registry():
+    """Test that the application lifespan warms up and shuts down the shared registry."""
+    registry = registry_module.get_strategy_registry()
+    with TestClient(app) as client:
+        assert registry.started
+        assert client.get("/api/v1/health").status_code == 200
+    assert not registry.started
@@ -0,0 +1,192 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1.routes.generation.schemas import GenerationType, OutputType, SearchType
+from app.common.schema import (
+    OutputValidationError,
+    SchemaError,
+    SchemaValidatorCache,
+    StreamingValidator,
+    compile_schema,
+    validate_json_output,
+)
+from app.main import app
+
+client = TestClient(app)
+
+CLAIMS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "claims": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "text": {"type": "string", "minLength": 1},
+                    "score": {"type": "number", "minimum": 0, "maximum": 1},
+                    "kind": {"enum": ["fact", "opinion"]}
+                },
+                "required": ["text"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["claims"]
+}
+
+
+def test_compiled_schema_accepts_valid_instance():
+    """Test that a conforming instance has no errors."""
+    validate = compile_schema(CLAIMS_SCHEMA)
+    assert validate({"claims": [{"text": "Revenue grew", "score": 0.5, "kind": "fact"}]}) == []
+
+
+def test_compiled_schema_reports_errors():
+    """Test that violations are reported with their path."""
+    validate = compile_schema(CLAIMS_SCHEMA)
+    errors = validate({"claims": [{"text": "", "score": 2, "kind": "guess", "extra": True}, "oops"]})
+
+    assert "$.claims[0].text: expected at least 1 characters" in errors
+    assert "$.claims[0].score: 2 is greater than 1" in errors
+    assert any(error.startswith("$.claims[0].kind:") for error in errors)
+    assert "$.claims[0].extra: no value is allowed" in errors
+    assert "$.claims[1]: expected object, got string" in errors
+    assert validate({}) == ["$: missing required property 'claims'"]
+
+
+def test_compiled_schema_recursive_ref():
+    """Test local $ref resolution, including recursive definitions."""
+    schema = {
+        "$defs": {
+            "node": {
+                "type": "object",
+                "properties": {"children": {"type": "array", "items": {"$ref": "#/$defs/node"}}}
+            }
+        },
+        "$ref": "#/$defs/node"
+    }
+    validate = compile_schema(schema)
+    assert validate({"children": [{"children": []}]}) == []
+    assert validate({"children": [{"children": [1]}]}) == ["$.children[0].children[0]: expected object, got integer"]
+
+
+def test_schema_cache_reuses_compilation():
+    """Test that schemas differing only in key order share one compiled validator."""
+    cache = SchemaValidatorCache(max_size=1)
+    first = cache.get({"type": "object", "required": ["a"]})
+    second = cache.get({"required": ["a"], "type": "object"})
+    assert first is second
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.get({"type": "string"})
+    assert len(cache) == 1
+
+
+def test_invalid_schema_rejected():
+    """Test that schemas which cannot be compiled are rejected."""
+    with pytest.raises(SchemaError):
+        compile_schema({"type": "whatever"})
+
+    request_data = {
+        "generation_type": GenerationType.DEFAULT,
+        "output_type": OutputType.JSON,
+        "search_type": SearchType.GLOBAL,
+        "parameters": {"content": "Test content"},
+        "output_schema": {"type": "object", "properties": {"content": {"$ref": "http://example.com/schema"}}}
+    }
+    response = client.post("/api/v1/generation/generate", json=request_data)
+    assert response.status_code == 422
+    assert "Invalid output_schema" in response.json()["detail"][0]["msg"]
+
+
+def test_validate_json_output_rejects_malformed_json():
+    """Test that malformed JSON output is reported."""
+    errors = validate_json_output("{not json", {"type": "object"})
+    assert errors and "not valid JSON" in errors[0]
+
+
+def test_unsatisfiable_output_schema_rejected():
+    """Test that a schema the strategy's output fields can never match is rejected before generation."""
+    request_data = {
+        "generation_type": GenerationType.DEFAULT,
+        "output_type": OutputType.JSON,
+        "search_type": SearchType.GLOBAL,
+        "parameters": {"content": "Test content for schema validation"},
+        "output_schema": {"type": "object", "required": ["summary"]}
+    }
+    response = client.post("/api/v1/generation/generate", json=request_data)
+    assert response.status_code == 400
+    assert "required properties are not produced: summary" in response.json()["detail"]
+
+    request_data["output_schema"] = {"type": "object", "properties": {"content": {"type": "integer"}}}
+    response = client.post("/api/v1/generation/generate", json=request_data)
+    assert response.status_code == 400
+
+    request_data["output_schema"] = {"type": "object", "properties": {"content": {"type": "string"}}, "required": ["content"]}
+    response = client.post("/api/v1/generation/generate", json=request_data)
+    assert response.status_code == 200
+
+
+def test_generated_output_validated_against_schema():
+    """Test that generated JSON content violating constraints on its values fails the request."""
+    request_data = {
+        "generation_type": GenerationType.DEFAULT,
+        "output_type": OutputType.JSON,
+        "search_type": SearchType.GLOBAL,
+        "parameters": {"content": "Test content for schema validation"},
+        "output_schema": {"type": "object", "properties": {"content": {"type": "string", "maxLength": 3}}}
+    }
+    response = client.post("/api/v1/generation/generate", json=request_data)
+    assert response.status_code == 500
+    assert "does not match output_schema" in response.json()["detail"]
+
+
+def _stream(schema, chunks):
+    validator = StreamingValidator(schema)
+    fields = []
+    for chunk in chunks:
+        fields.extend(validator.feed(chunk))
+    fields.extend(validator.close())
+    return fields
+
+
+def test_streaming_validator_emits_top_level_fields():
+    """Test that a valid document fed one character at a time yields each top-level field once complete."""
+    document = {
+        "claims": [{"text": "Revenue \"grew\" \u00e9 12%", "score": 0.5, "kind": "fact"}],
+        "count": -1.25e2,
+        "done": True,
+        "note": None,
+    }
+    text = json.dumps(document, indent=2)
+    assert _stream(CLAIMS_SCHEMA, text) == list(document.items())
+    assert _stream({"type": "array"}, ["[1, ", "2]"]) == []
+    assert _stream({"type": "number"}, ["12", "3.5"]) == []
+
+
+def test_streaming_validator_rejects_violations_early():
+    """Test that schema and syntax violations are rejected at the chunk that introduces them."""
+    prefixes = [
+        '{"claims": "',
+        '{"claims": [{"text": "a", "extra"',
+        '{"claims": [{"text": "a", "kind": "rumour"',
+        '{"claims": [{"text": ""}',
+        '{"claims": [] ,}',
+        '{"claims": []} x',
+    ]
+    for prefix in prefixes:
+        validator = StreamingValidator(CLAIMS_SCHEMA)
+        with pytest.raises(OutputValidationError):
+            validator.feed(prefix)
+
+    bounded = StreamingValidator({"type": "array", "maxItems": 2})
+    bounded.feed("[1, 2")
+    with pytest.raises(OutputValidationError, match="at most 2 items"):
+        bounded.feed(", 3")
+
+    truncated = StreamingValidator(CLAIMS_SCHEMA)
+    truncated.feed('{"claims": [')
+    with pytest.raises(OutputValidationError, match="ended before"):
+        truncated.close()
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+from app.api.v1.routes.generation.schemas import GenerationRequest, GenerationType, OutputType, SearchType
+from app.core.exceptions import ValidationError
+from app.search.bm25 import BM25Index
+from app.search.tokenizer import tokenize
+from app.services.search import SearchService
+from app.strategies.claim_discovery import ClaimDiscoveryStrategy
+from app.strategies.evidence_discovery import EvidenceDiscoveryStrategy
+
+
+@pytest.fixture
+def search_service():
+    service = SearchService(BM25Index())
+    service.index_passages("report.pdf", [
+        "Revenue increased by 12 percent in the third quarter.",
+        "The board approved a new dividend policy.",
+        "Operating costs were flat compared to last year.",
+    ])
+    service.index_passages("memo.txt", [
+        "Quarterly revenue growth was driven by cloud services.",
+        "The office will be closed on Friday.",
+    ])
+    return service
+
+
+def test_tokenize_drops_stopwords():
+    """Test that tokenization lowercases and removes stopwords."""
+    assert tokenize("The Revenue of Q3, and growth!") == ["revenue", "q3", "growth"]
+
+
+def test_bm25_ranks_matching_passages(search_service):
+    """Test that the best matching passages are ranked first."""
+    results = search_service.search("revenue increased quarter")
+    assert results[0]["file_id"] == "report.pdf"
+    assert results[0]["text"].startswith("Revenue increased")
+    assert [result["score"] for result in results] == sorted((result["score"] for result in results), reverse=True)
+    assert all("office" not in result["text"] for result in results)
+
+
+def test_bm25_top_k(search_service):
+    """Test that at most top_k passages are returned."""
+    assert len(search_service.search("revenue", top_k=1)) == 1
+    assert search_service.search("nonexistent term") == []
+
+
+def test_bm25_selected_files(search_service):
+    """Test that selected files restrict the search."""
+    results = search_service.search("revenue", SearchType.SELECTED_FILES, ["memo.txt"])
+    assert [result["file_id"] for result in results] == ["memo.txt"]
+    assert search_service.search("revenue", SearchType.SELECTED_FILES, ["unknown.txt"]) == []
+
+
+def test_bm25_large_candidate_set():
+    """Test top-k selection over more candidates than requested."""
+    index = BM25Index()
+    for number in range(200):
+        index.add(f"file-{number % 7}", f"shared term {'rare ' * (number % 5)}passage {number}")
+    results = index.search("shared rare", top_k=5)
+    assert len(results) == 5
+    assert all("rare rare rare rare" in result["text"] for result in results)
+
+
+def test_bm25_scores_stay_positive_after_removals():
+    """Test that tombstoned passages no longer count towards document frequencies."""
+    index = BM25Index()
+    removed = [index.add("old.txt", f"legacy revenue passage {number}") for number in range(20)]
+    index.add("new.txt", "revenue increased in the third quarter")
+    index.add("new.txt", "the board approved a dividend")
+    index.remove(removed)
+
+    results = index.search("revenue")
+    assert [result["file_id"] for result in results] == ["new.txt"]
+    assert results[0]["score"] > 0
+    index.compact()
+    assert index.search("revenue")[0]["score"] == pytest.approx(results[0]["score"])
+
+
+def test_strategy_fills_search_results(search_service):
+    """Test that strategies fill search_results from the search service."""
+    strategy = EvidenceDiscoveryStrategy(search_service=search_service)
+    request = GenerationRequest(
+        generation_type=GenerationType.EVIDENCE_DISCOVERY,
+        output_type=OutputType.TEXT,
+        search_type=SearchType.SELECTED_FILES,
+        parameters={"content": "Some content", "claim": "revenue growth", "file_ids": ["memo.txt"]},
+    )
+    response = asyncio.run(strategy.generate(request))
+    corpus_results = [result for result in response.search_results if result["source"] == "corpus"]
+    assert corpus_results
+    assert all(result["file_id"] == "memo.txt" for result in corpus_results)
+
+
+def test_selected_files_without_file_ids(search_service):
+    """Test that content-only selected_files requests skip the corpus search, and explicit queries need file_ids."""
+    evidence = EvidenceDiscoveryStrategy(search_service=search_service)
+    request = GenerationRequest(
+        generation_type=GenerationType.EVIDENCE_DISCOVERY,
+        output_type=OutputType.TEXT,
+        search_type=SearchType.SELECTED_FILES,
+        parameters={"content": "Revenue growth was strong.", "claim": "revenue growth"},
+    )
+    response = asyncio.run(evidence.generate(request))
+    assert [result["source"] for result in response.search_results] == ["content"]
+
+    claims = ClaimDiscoveryStrategy(search_service=search_service)
+    request = GenerationRequest(
+        generation_type=GenerationType.CLAIM_DISCOVERY,
+        output_type=OutputType.TEXT,
+        search_type=SearchType.SELECTED_FILES,
+        parameters={"content": "Revenue grew 12 percent in 2023."},
+    )
+    assert asyncio.run(claims.generate(request)).search_results == []
+
+    request.parameters["query"] = "revenue"
+    with pytest.raises(ValidationError):
+        asyncio.run(claims.generate(request))
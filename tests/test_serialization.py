@@ -0,0 +1,45 @@
+from fastapi.testclient import TestClient
+
+from app.api.v1.routes.generation.schemas import GenerationResponse
+from app.core.config import settings
+from app.main import app
+from benchmarks import serialization
+
+client = TestClient(app)
+
+REQUEST = {
+    "generation_type": "claim_discovery",
+    "output_type": "json",
+    "search_type": "global",
+    "parameters": {"content": "Revenue grew 20% in 2023 according to the annual report. Café sales doubled in 2022."},
+    "output_schema": {"type": "object", "properties": {"claims": {"type": "array"}}},
+}
+
+
+def test_fast_path_matches_framework_serialization(monkeypatch):
+    """Test that the fast response path returns the same document as response_model serialization."""
+    # The second request would otherwise report reused claims in its metadata.
+    monkeypatch.setattr(settings, "DEDUP_ENABLED", False)
+    monkeypatch.setattr(settings, "RESPONSE_FAST_PATH", True)
+    fast = client.post("/api/v1/generation/generate", json=REQUEST, headers={"Cache-Control": "no-cache"})
+    monkeypatch.setattr(settings, "RESPONSE_FAST_PATH", False)
+    framework = client.post("/api/v1/generation/generate", json=REQUEST, headers={"Cache-Control": "no-cache"})
+    assert fast.status_code == framework.status_code == 200
+    assert fast.headers["content-type"] == "application/json"
+    assert fast.json() == framework.json()
+
+
+def test_response_json_is_encoded_once():
+    """Test that a response's JSON encoding is computed once and reused."""
+    response = GenerationResponse.model_construct(
+        content="text", metadata={"claim_count": 1}, search_results=[], generation_parameters={}, output_schema=None
+    )
+    encoded = response.json_bytes()
+    assert response.json_bytes() is encoded
+    assert GenerationResponse.model_validate_json(encoded) == GenerationResponse(**dict(response))
+
+
+def test_serialization_benchmark_reports_both_paths():
+    """Test that the micro-benchmark times the framework and fast paths on identical output."""
+    report = serialization.run(requests=3, repeat=2)
+    assert report["framework_us"] > 0 and report["fast_us"] > 0 and report["fast_cached_us"] > 0
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1.routes.generation.schemas import SearchType
+from app.api.v1.routes.ingestion.dependencies import get_ingestion_service
+from app.common.chunking import chunk_text
+from app.core.exceptions import ReadOnlyIndexError
+from app.ingest import build_snapshot
+from app.main import app
+from app.search.bm25 import BM25Index
+from app.search.embedding import HashingEmbedder
+from app.services.ingestion import IngestionService
+from app.services.search import SearchService
+
+DOCUMENTS = {
+    "finance.txt": "Revenue increased by twelve percent.\n\nThe board approved a new dividend policy.",
+    "costs.txt": "Operating costs were flat.\n\nCloud services drove quarterly revenue growth.",
+    "old.txt": "This passage about revenue is removed before the snapshot.",
+}
+
+
+def _service():
+    service = SearchService(BM25Index(), HashingEmbedder(dim=64))
+    for file_id, text in DOCUMENTS.items():
+        service.sync_file(file_id, chunk_text(text, 10, 50))
+    service.remove_file("old.txt")
+    return service
+
+
+def test_snapshot_search_matches_live_index(tmp_path):
+    """Test that a snapshot returns the same results as the index it was written from."""
+    service = _service()
+    manifest = service.write_snapshot(str(tmp_path / "corpus"))
+    mapped = SearchService.open_snapshot(str(tmp_path / "corpus"))
+
+    assert manifest["documents"] == len(service.index) == len(mapped.index) == 4
+    assert mapped.files() == service.files() == {"finance.txt": 2, "costs.txt": 2}
+    for mode in ("keyword", "semantic", "hybrid"):
+        for query in ("revenue growth", "dividend policy", "unknown words"):
+            assert mapped.search(query, mode=mode) == service.search(query, mode=mode)
+    assert mapped.search("revenue", SearchType.SELECTED_FILES, ["costs.txt"]) == service.search(
+        "revenue", SearchType.SELECTED_FILES, ["costs.txt"]
+    )
+    assert mapped.search("revenue", SearchType.SELECTED_FILES, ["missing.txt"]) == []
+
+
+def test_snapshot_is_memory_mapped_and_read_only(tmp_path):
+    """Test that snapshot arrays are read-only maps and modifications are rejected."""
+    _service().write_snapshot(str(tmp_path / "corpus"))
+    mapped = SearchService.open_snapshot(str(tmp_path / "corpus"))
+
+    assert isinstance(mapped.vectors._matrix, np.memmap)
+    assert isinstance(mapped.index._doc_lengths, np.memmap)
+    assert not mapped.vectors._matrix.flags.writeable
+    with pytest.raises(ReadOnlyIndexError):
+        mapped.sync_file("new.txt", chunk_text("New passage.", 10, 50))
+    with pytest.raises(ReadOnlyIndexError):
+        mapped.remove_file("finance.txt")
+    with pytest.raises(ValueError):
+        SearchService.open_snapshot(str(tmp_path / "corpus"), embedder=HashingEmbedder(dim=32))
+
+
+def test_snapshot_replaces_previous_version(tmp_path):
+    """Test that rewriting a snapshot swaps it in while open maps keep working."""
+    directory = str(tmp_path / "corpus")
+    service = _service()
+    service.write_snapshot(directory)
+    first = SearchService.open_snapshot(directory)
+
+    service.sync_file("extra.txt", chunk_text("Extra passage on dividend growth.", 10, 50))
+    service.write_snapshot(directory)
+    second = SearchService.open_snapshot(directory)
+
+    assert len(first.index) == 4
+    assert len(second.index) == 5
+    assert first.search("dividend")[0]["file_id"] == "finance.txt"
+    assert [path.name for path in tmp_path.iterdir()] == ["corpus"]
+
+
+def test_snapshot_with_ivf(tmp_path):
+    """Test that clustered vector search survives the snapshot."""
+    service = _service()
+    service.vectors.build_ivf(nlist=2)
+    service.write_snapshot(str(tmp_path / "corpus"))
+    mapped = SearchService.open_snapshot(str(tmp_path / "corpus"))
+
+    assert mapped.vectors.is_ivf
+    assert mapped.search("revenue growth", mode="semantic") == service.search("revenue growth", mode="semantic")
+
+
+def test_build_snapshot_from_files(tmp_path):
+    """Test that the ingest command line builds a snapshot from local files."""
+    for file_id, text in DOCUMENTS.items():
+        (tmp_path / file_id).write_text(text, encoding="utf-8")
+    files = [(file_id, str(tmp_path / file_id)) for file_id in DOCUMENTS]
+
+    assert build_snapshot(files, str(tmp_path / "corpus")) > 0
+    mapped = SearchService.open_snapshot(str(tmp_path / "corpus"))
+    assert set(mapped.files()) == set(DOCUMENTS)
+    assert mapped.search("dividend")[0]["file_id"] == "finance.txt"
+
+
+def test_ingestion_api_rejects_snapshot_corpus(tmp_path):
+    """Test that uploads and removals are rejected with 409 when serving a snapshot."""
+    _service().write_snapshot(str(tmp_path / "corpus"))
+    ingestion_service = IngestionService(search_service=SearchService.open_snapshot(str(tmp_path / "corpus")))
+    app.dependency_overrides[get_ingestion_service] = lambda: ingestion_service
+    try:
+        client = TestClient(app)
+        assert client.put("/api/v1/ingestion/files/new.txt", content=b"New passage.").status_code == 409
+        assert client.delete("/api/v1/ingestion/files/finance.txt").status_code == 409
+        assert ingestion_service.jobs() == []
+    finally:
+        app.dependency_overrides.pop(get_ingestion_service, None)
@@ -0,0 +1,157 @@
+import asyncio
+
+import numpy as np
+
+from app.api.v1.routes.generation.schemas import GenerationRequest, GenerationResponse, GenerationType
+from app.common.chunking import chunk_text
+from app.search.bm25 import BM25Index
+from app.search.embedding import HashingEmbedder
+from app.services.generation import GenerationService
+from app.services.search import EMPTY_REVISION, SearchService
+from app.services.store import ResultStore
+from app.strategies.base import GenerationStrategy
+from app.strategies.registry import StrategyRegistry
+
+REQUEST = GenerationRequest(
+    generation_type=GenerationType.DEFAULT,
+    output_type="text",
+    search_type="global",
+    parameters={"content": "Stored content"},
+)
+
+
+class CountingStrategy(GenerationStrategy):
+    """Strategy that counts how often it generates."""
+    calls = 0
+
+    def validate_request(self, request) -> None:
+        pass
+
+    async def generate(self, request) -> GenerationResponse:
+        CountingStrategy.calls += 1
+        return GenerationResponse(content=f"run {CountingStrategy.calls}", metadata={}, generation_parameters={})
+
+
+class CountingEmbedder(HashingEmbedder):
+    """Hashing embedder that counts the texts it embeds."""
+
+    def __init__(self, dim):
+        super().__init__(dim)
+        self.embedded = 0
+
+    def embed(self, texts):
+        self.embedded += len(texts)
+        return super().embed(texts)
+
+
+def _service(store, strategy_class=CountingStrategy, search_service=None):
+    registry = StrategyRegistry({GenerationType.DEFAULT: strategy_class})
+    if search_service is not None:
+        registry.get(GenerationType.DEFAULT)._search_service = search_service
+    return GenerationService(registry=registry, store=store)
+
+
+def test_result_store_survives_reopen(tmp_path):
+    """Test that stored results are found by a new store on the same file, per version."""
+    path = str(tmp_path / "results.db")
+    store = ResultStore(path, max_bytes=1_000_000)
+    store.put("response", "v1", "key", b"first")
+    store.put_many("embedding", "v1", [("a", b"vector a"), ("b", b"vector b"), ("a", b"vector a")])
+    store.close()
+
+    reopened = ResultStore(path, max_bytes=1_000_000)
+    assert reopened.get("response", "v1", "key") == b"first"
+    assert reopened.get("response", "v2", "key") is None
+    assert reopened.get_many("embedding", "v1", ["a", "b", "c"]) == {"a": b"vector a", "b": b"vector b"}
+    assert len(reopened) == 3
+    assert reopened.stats()["hits"] == 3 and reopened.stats()["misses"] == 2
+
+
+def test_result_store_compacts_least_recently_used(tmp_path):
+    """Test that outgrowing the size bound evicts the least recently used results."""
+    now = [0.0]
+    store = ResultStore(str(tmp_path / "results.db"), max_bytes=900, clock=lambda: now[0])
+    for index in range(4):
+        now[0] = index * 100.0
+        store.put("response", "v1", f"key{index}", bytes(200))
+    now[0] = 500.0
+    assert store.get("response", "v1", "key0") is not None
+    now[0] = 600.0
+    store.put("response", "v1", "key4", bytes(200))
+    store.put("response", "v1", "huge", bytes(2000))
+
+    assert store.stats()["bytes"] == 800
+    assert store.get("response", "v1", "key0") is not None
+    assert store.get("response", "v1", "key1") is None
+    assert store.get("response", "v1", "key2") is not None
+    assert store.get("response", "v1", "huge") is None
+    assert store.stats()["evictions"] == 1
+
+
+def test_generation_service_reuses_stored_responses_after_restart(tmp_path):
+    """Test that stored responses skip the strategy until the strategy version changes."""
+    CountingStrategy.calls = 0
+    path = str(tmp_path / "results.db")
+    first = asyncio.run(_service(ResultStore(path, 1_000_000)).generate_content(REQUEST))
+    restarted = asyncio.run(_service(ResultStore(path, 1_000_000)).generate_content(REQUEST))
+    assert restarted.content == first.content == "run 1"
+    assert restarted.json_bytes() == first.json_bytes()
+    assert CountingStrategy.calls == 1
+
+    bypassed = asyncio.run(_service(ResultStore(path, 1_000_000)).generate_content(REQUEST, use_cache=False))
+    assert bypassed.content == "run 2"
+
+    class UpgradedStrategy(CountingStrategy):
+        version = "2"
+
+    upgraded = asyncio.run(_service(ResultStore(path, 1_000_000), UpgradedStrategy).generate_content(REQUEST))
+    assert upgraded.content == "run 3"
+
+
+def test_generation_service_keys_results_by_corpus_revision(tmp_path):
+    """Test that changing the corpus invalidates stored responses."""
+    CountingStrategy.calls = 0
+    store = ResultStore(str(tmp_path / "results.db"), 1_000_000)
+    search_service = SearchService(BM25Index(), HashingEmbedder(dim=32))
+    service = _service(store, search_service=search_service)
+
+    asyncio.run(service.generate_content(REQUEST))
+    asyncio.run(service.generate_content(REQUEST))
+    assert CountingStrategy.calls == 1
+    search_service.sync_file("a.txt", chunk_text("A new passage about revenue.", 10, 100))
+    asyncio.run(service.generate_content(REQUEST))
+    assert CountingStrategy.calls == 2
+
+
+def test_search_revision_is_reproducible():
+    """Test that the corpus revision only depends on the ingested contents and their order."""
+    first = SearchService(BM25Index(), HashingEmbedder(dim=32))
+    second = SearchService(BM25Index(), HashingEmbedder(dim=32))
+    assert first.revision == EMPTY_REVISION
+    for service in (first, second):
+        service.sync_file("a.txt", chunk_text("Alpha passage about dividends.", 10, 100))
+        service.sync_file("b.txt", chunk_text("Beta passage about costs.", 10, 100))
+    assert first.revision == second.revision != EMPTY_REVISION
+
+    revision = first.revision
+    first.sync_file("a.txt", chunk_text("Alpha passage about dividends.", 10, 100))
+    assert first.revision == revision
+    first.remove_file("b.txt")
+    assert first.revision != revision
+
+
+def test_search_service_reuses_stored_embeddings(tmp_path):
+    """Test that chunk embeddings persisted by one process are reused by the next."""
+    path = str(tmp_path / "results.db")
+    text = "Revenue grew in the cloud segment.\n\nCosts were flat.\n\nThe board approved a dividend."
+    embedder = CountingEmbedder(dim=32)
+    service = SearchService(BM25Index(), embedder, store=ResultStore(path, 1_000_000))
+    service.sync_file("a.txt", chunk_text(text, 10, 40))
+    assert embedder.embedded == 3
+
+    restarted_embedder = CountingEmbedder(dim=32)
+    restarted = SearchService(BM25Index(), restarted_embedder, store=ResultStore(path, 1_000_000))
+    restarted.sync_file("a.txt", chunk_text(text + "\n\nA new paragraph.", 10, 40))
+    assert restarted_embedder.embedded == 1
+    assert np.allclose(restarted.vectors._matrix[:3], service.vectors._matrix[:3])
+    assert restarted.search("dividend", mode="semantic")[0]["text"] == service.search("dividend", mode="semantic")[0]["text"]
@@ -0,0 +1,105 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from app.api.v1.routes.generation.schemas import (
+    GenerationRequest,
+    GenerationType,
+    OutputType,
+    SearchType,
+    StreamEventType,
+)
+from app.main import app
+
+client = TestClient(app)
+
+STREAM_REQUEST = {
+    "generation_type": GenerationType.DEFAULT,
+    "output_type": OutputType.TEXT,
+    "search_type": SearchType.GLOBAL,
+    "parameters": {
+        "content": "Test content for generation"
+    }
+}
+
+
+def test_generate_stream_ndjson():
+    """Test streaming generation as NDJSON."""
+    response = client.post("/api/v1/generation/generate/stream?format=ndjson", json=STREAM_REQUEST)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    assert events[0]["event"] == StreamEventType.SEARCH_RESULTS
+    assert events[-1]["event"] == StreamEventType.METADATA
+    assert events[-1]["data"]["metadata"]["generation_type"] == GenerationType.DEFAULT
+
+    content = "".join(event["data"] for event in events if event["event"] == StreamEventType.CONTENT)
+    assert content
+
+
+def test_generate_stream_sse():
+    """Test streaming generation as Server-Sent Events."""
+    response = client.post("/api/v1/generation/generate/stream", json=STREAM_REQUEST)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    frames = [frame for frame in response.text.split("\n\n") if frame]
+    assert frames[0].startswith("event: search_results\ndata: ")
+    assert frames[-1].startswith("event: metadata\ndata: ")
+
+
+def test_generate_stream_validation():
+    """Test that invalid requests fail before the stream starts."""
+    request_data = dict(STREAM_REQUEST, parameters={})
+
+    response = client.post("/api/v1/generation/generate/stream?format=ndjson", json=request_data)
+    assert response.status_code == 400
+    assert "Content is required" in response.json()["detail"]
+
+
+def test_strategy_stream_chunks_content(monkeypatch):
+    """Test that the default stream implementation splits content into chunks."""
+    from app.core.config import settings
+    from app.strategies.default import DefaultStrategy
+
+    monkeypatch.setattr(settings, "STREAM_CHUNK_SIZE", 4)
+    request = GenerationRequest(**STREAM_REQUEST)
+    strategy = DefaultStrategy()
+
+    async def collect():
+        return [event async for event in strategy.stream(request)]
+
+    events = asyncio.run(collect())
+    chunks = [event.data for event in events if event.event == StreamEventType.CONTENT]
+    expected = asyncio.run(strategy.generate(request)).content
+    assert all(len(chunk) <= 4 for chunk in chunks)
+    assert "".join(chunks) == expected
+
+
+def test_generate_stream_json_fields_and_early_rejection(monkeypatch):
+    """Test that JSON streams emit completed fields and fail at the first chunk violating the schema."""
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "STREAM_CHUNK_SIZE", 8)
+    request_data = {
+        "generation_type": GenerationType.CLAIM_DISCOVERY,
+        "output_type": OutputType.JSON,
+        "search_type": SearchType.GLOBAL,
+        "parameters": {"content": "Revenue grew 12 percent in 2023. Costs fell by 3 percent in 2024."},
+        "output_schema": {"type": "object", "properties": {"claims": {"type": "array"}}},
+    }
+    response = client.post("/api/v1/generation/generate/stream?format=ndjson", json=request_data)
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    fields = [event["data"] for event in events if event["event"] == StreamEventType.FIELD]
+    content = "".join(event["data"] for event in events if event["event"] == StreamEventType.CONTENT)
+    assert fields == [{"name": "claims", "value": json.loads(content)["claims"]}]
+    assert events[-1]["event"] == StreamEventType.METADATA
+
+    request_data["output_schema"] = {"type": "object", "properties": {"claims": {"type": "array", "maxItems": 0}}}
+    response = client.post("/api/v1/generation/generate/stream?format=ndjson", json=request_data)
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    assert events[-1]["event"] == StreamEventType.ERROR
+    assert "$.claims: expected at most 0 items" in events[-1]["data"]["detail"]
+    assert len([event for event in events if event["event"] == StreamEventType.CONTENT]) <= 2
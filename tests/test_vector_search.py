@@ -0,0 +1,156 @@
+import os
+import threading
+
+import numpy as np
+
+from app.api.v1.routes.generation.schemas import SearchType
+from app.common.chunking import chunk_text
+from app.core.config import settings
+from app.search.bm25 import BM25Index
+from app.search.embedding import HashingEmbedder
+from app.search.vector import VectorIndex
+from app.services.search import SearchService
+
+PASSAGES = [
+    "Revenue increased by twelve percent in the third quarter.",
+    "The board approved a new dividend policy for shareholders.",
+    "Operating costs were flat compared to the previous year.",
+    "Cloud services drove most of the quarterly revenue growth.",
+]
+
+
+def test_hashing_embedder_is_deterministic_and_normalised():
+    """Test that the hashing embedder is stable and produces unit vectors."""
+    embedder = HashingEmbedder(dim=64)
+    first = embedder.embed(PASSAGES)
+    second = HashingEmbedder(dim=64).embed(PASSAGES)
+
+    assert first.shape == (4, 64)
+    assert first.dtype == np.float32
+    assert np.array_equal(first, second)
+    assert np.allclose(np.linalg.norm(first, axis=1), 1.0)
+    assert not embedder.embed([""]).any()
+
+
+def test_vector_index_exact_search():
+    """Test exact top-k search, removal and filtering."""
+    embedder = HashingEmbedder(dim=128)
+    index = VectorIndex(128, initial_capacity=2)
+    index.add(list(range(len(PASSAGES))), embedder.embed(PASSAGES))
+
+    hits = index.search(embedder.embed([PASSAGES[1], PASSAGES[3]]), top_k=2)
+    assert hits[0][0][0] == 1
+    assert hits[1][0][0] == 3
+    assert hits[0][0][1] > hits[0][1][1]
+
+    index.remove([1])
+    assert all(doc_id != 1 for doc_id, _ in index.search(embedder.embed([PASSAGES[1]]), top_k=4)[0])
+
+    allowed = np.array([False, False, True, False])
+    assert [doc_id for doc_id, _ in index.search(embedder.embed([PASSAGES[0]]), 4, allowed=allowed)[0]] == [2]
+
+
+def test_vector_index_ivf_matches_exact_with_full_probe():
+    """Test that IVF search probing every cluster returns the exact results."""
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((500, 32)).astype(np.float32)
+    queries = rng.standard_normal((5, 32)).astype(np.float32)
+
+    index = VectorIndex(32)
+    index.add(list(range(500)), vectors)
+    exact = index.search(queries, top_k=5)
+
+    index.build_ivf(nlist=10)
+    assert index.is_ivf
+    assert [[doc for doc, _ in hits] for hits in index.search(queries, 5, nprobe=10)] == [
+        [doc for doc, _ in hits] for hits in exact
+    ]
+
+    index.add([500], vectors[:1])
+    assert index.search(vectors[:1], top_k=2, nprobe=10)[0][0][1] > 0.99
+
+
+def test_vector_index_memory_mapped(tmp_path):
+    """Test that a memory-mapped index grows its backing file."""
+    path = str(tmp_path / "vectors.f32")
+    embedder = HashingEmbedder(dim=16)
+    index = VectorIndex(16, path=path, initial_capacity=1)
+    index.add(list(range(len(PASSAGES))), embedder.embed(PASSAGES))
+    index.flush()
+
+    stored = np.memmap(path, dtype=np.float32, mode="r").reshape(-1, 16)
+    assert np.allclose(stored[:len(PASSAGES)], embedder.embed(PASSAGES))
+    assert index.search(embedder.embed([PASSAGES[2]]), top_k=1)[0][0][0] == 2
+
+
+def test_vector_index_file_is_per_process(tmp_path, monkeypatch):
+    """Test that worker processes never map the same vector index file."""
+    path = str(tmp_path / "vectors.f32")
+    monkeypatch.setattr(settings, "VECTOR_INDEX_PATH", path)
+    service = SearchService(BM25Index(), HashingEmbedder(dim=16))
+    service.index_passages("report.pdf", PASSAGES)
+
+    assert service.vectors.path == f"{path}.{os.getpid()}"
+    assert os.path.exists(service.vectors.path) and not os.path.exists(path)
+
+
+def test_search_service_modes():
+    """Test keyword, semantic and hybrid retrieval through the search service."""
+    service = SearchService(BM25Index(), HashingEmbedder(dim=128))
+    service.index_passages("report.pdf", PASSAGES[:3])
+    service.index_passages("memo.txt", PASSAGES[3:])
+
+    for mode in ("keyword", "semantic", "hybrid"):
+        results = service.search("dividend policy approved", mode=mode)
+        assert results[0]["text"] == PASSAGES[1], mode
+
+    selected = service.search("revenue growth", SearchType.SELECTED_FILES, ["memo.txt"], mode="semantic")
+    assert [result["file_id"] for result in selected] == ["memo.txt"]
+
+    batch = service.search_batch(["dividend policy", "operating costs"], top_k=1)
+    assert [results[0]["text"] for results in batch] == [PASSAGES[1], PASSAGES[2]]
+
+
+def test_search_service_compaction_keeps_vectors_aligned():
+    """Test that compaction renumbers vectors together with keyword documents."""
+    service = SearchService(BM25Index(), HashingEmbedder(dim=128))
+    service.sync_file("a.txt", chunk_text("Alpha passage about dividends.", 10, 100))
+    service.sync_file("b.txt", chunk_text("Beta passage about operating costs.", 10, 100))
+    service.sync_file("a.txt", chunk_text("Gamma passage about cloud revenue.", 10, 100))
+    assert service.index.dead_ratio == 0
+    assert len(service.vectors) == 2
+
+    assert service.search("cloud revenue", mode="semantic")[0]["file_id"] == "a.txt"
+    assert service.search("operating costs", mode="semantic")[0]["file_id"] == "b.txt"
+
+
+def test_search_is_consistent_during_compaction(monkeypatch):
+    """Test that semantic hits resolve to their own passages while another thread ingests and compacts."""
+    monkeypatch.setattr(settings, "SEARCH_COMPACT_RATIO", 0.0)
+    embedder = HashingEmbedder(dim=64)
+    service = SearchService(BM25Index(), embedder)
+    versions = [
+        "\n\n".join(f"Passage {number} of version {version} about revenue item{number}." for number in range(40))
+        for version in range(2)
+    ]
+    query = "revenue item7 version"
+    query_vector = embedder.embed([query])[0]
+    stop = threading.Event()
+
+    def ingest():
+        version = 0
+        while not stop.is_set():
+            service.sync_file("doc", chunk_text(versions[version], 10, 60))
+            service.sync_file("other", chunk_text(versions[1 - version], 10, 60))
+            version = 1 - version
+
+    writer = threading.Thread(target=ingest)
+    writer.start()
+    try:
+        for _ in range(300):
+            for result in service.search(query, mode="semantic"):
+                expected = float(embedder.embed([result["text"]])[0] @ query_vector)
+                assert abs(result["score"] - expected) < 1e-4
+    finally:
+        stop.set()
+        writer.join()
@@ -7,6 +7,33 @@ import streamlit as st
 # Constants
 API_URL = os.getenv("API_URL", "http://localhost:8000/api/v1/generation")
 
+def render_stream(request_data):
+    """Render a streamed generation progressively as NDJSON events arrive."""
+    st.subheader("Generated Content")
+    content_placeholder = st.empty()
+    content = ""
+
+    with httpx.Client(timeout=None) as client:
+        with client.stream("POST", f"{API_URL}/generate/stream", params={"format": "ndjson"}, json=request_data) as response:
+            if response.is_error:
+                response.read()
+                response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event["event"] == "search_results":
+                    st.subheader("Search Results")
+                    st.json(event["data"])
+                elif event["event"] == "content":
+                    content += event["data"]
+                    content_placeholder.write(content)
+                elif event["event"] == "metadata":
+                    st.subheader("Metadata")
+                    st.json(event["data"]["metadata"])
+                elif event["event"] == "error":
+                    st.error(f"API Error: {event['data']['detail']}")
+
 def main():
     st.title("Content Generation Service")
     st.write("Generate content based on different strategies and requirements")
@@ -51,6 +78,8 @@ def main():
         placeholder='{"key": "value"}'
     )
 
+    stream = st.checkbox("Stream response", value=True)
+
     if st.button("Generate"):
         try:
             # Prepare request data
@@ -79,6 +108,10 @@ def main():
                     st.error("Invalid additional parameters format")
                     return
 
+            if stream:
+                render_stream(request_data)
+                return
+
             # Make API request
             with httpx.Client() as client:
                 response = client.post(f"{API_URL}/generate", json=request_data)